@@ -13,6 +13,10 @@ import urllib.parse
 import sys
 import locale
 
+# Shared timing spans and sampled progress (instrumentation.py in the repo root)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from instrumentation import Progress, span
+
 # Configuration
 OUTPUT_DIR = 'output'
 os.makedirs(OUTPUT_DIR, exist_ok=True)
@@ -51,24 +55,27 @@ def get_match_links():
         
         url = "https://stats.espncricinfo.com/ci/engine/records/team/match_results.html?id=14450;type=tournament"
         print(f"Accessing URL: {url}")
-        driver.get(url)
-        
-        # Wait for table to load
-        try:
-            WebDriverWait(driver, 20).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "table.wicketTable"))
-            )
-            print("Main table loaded successfully")
-        except:
-            print("Table loading timeout, attempting to continue...")
-        #   driver.save_screenshot(os.path.join(OUTPUT_DIR, 'debug_table_not_found.png'))
+        with span('fetch', url=url):
+            driver.get(url)
+            
+            # Wait for table to load
+            try:
+                WebDriverWait(driver, 20).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, "table.wicketTable"))
+                )
+                print("Main table loaded successfully")
+            except:
+                print("Table loading timeout, attempting to continue...")
+            #   driver.save_screenshot(os.path.join(OUTPUT_DIR, 'debug_table_not_found.png'))
         
         # Additional loading time
-        time.sleep(5)
+        with span('wait'):
+            time.sleep(5)
         
         # Get page source
         html = driver.page_source
-        soup = BeautifulSoup(html, 'html.parser')
+        with span('parse'):
+            soup = BeautifulSoup(html, 'html.parser')
         
         # Save page source for debugging
         # with open(os.path.join(OUTPUT_DIR, 'debug_page.html'), 'w', encoding='utf-8') as f:
@@ -92,7 +99,6 @@ def get_match_links():
                     if scorecard and scorecard.has_attr('href'):
                         link = "https://www.espncricinfo.com" + scorecard['href']
                         links.append(link)
-                        print(f"Found match link: {link}")
         else:
             print("Error: No tables found")
         #    driver.save_screenshot(os.path.join(OUTPUT_DIR, 'debug_no_table_found.png'))
@@ -110,8 +116,6 @@ def get_match_links():
 
 def scrape_batting_summary(url):
     """Stage 2: Scrape batting summary from a match page"""
-    print(f"\nProcessing match: {url}")
-    
     options = webdriver.ChromeOptions()
     options.add_argument("--disable-blink-features=AutomationControlled")
     options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36")
@@ -122,55 +126,57 @@ def scrape_batting_summary(url):
     )
     
     try:
-        driver.get(url)
-        
-        # Wait for scorecard to load
-        WebDriverWait(driver, 20).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "table.ci-scorecard-table"))
-        )
-        
-        time.sleep(3)
+        with span('fetch', url=url):
+            driver.get(url)
+            
+            # Wait for scorecard to load
+            WebDriverWait(driver, 20).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, "table.ci-scorecard-table"))
+            )
         
-        soup = BeautifulSoup(driver.page_source, 'html.parser')
-        batting_summary = []
+        with span('wait'):
+            time.sleep(3)
         
-        # Get match info
-        teams = soup.find_all('span', class_='ds-text-title-xs')
-        if len(teams) >= 2:
-            team1 = clean_text(teams[0].get_text(strip=True)).replace(" Innings", "")
-            team2 = clean_text(teams[1].get_text(strip=True)).replace(" Innings", "")
-            match_info = f"{team1} vs {team2}"
-            print(f"Match: {match_info}")
-            
-            # Process batting tables
-            tables = soup.select('table.ci-scorecard-table')
+        with span('parse') as info:
+            soup = BeautifulSoup(driver.page_source, 'html.parser')
+            batting_summary = []
             
-            for i, table in enumerate(tables[:2]):  # Only first two innings
-                innings = team1 if i == 0 else team2
-                rows = table.select('tbody tr')
+            # Get match info
+            teams = soup.find_all('span', class_='ds-text-title-xs')
+            if len(teams) >= 2:
+                team1 = clean_text(teams[0].get_text(strip=True)).replace(" Innings", "")
+                team2 = clean_text(teams[1].get_text(strip=True)).replace(" Innings", "")
+                match_info = f"{team1} vs {team2}"
+                
+                # Process batting tables
+                tables = soup.select('table.ci-scorecard-table')
                 
-                for j, row in enumerate(rows):
-                    cols = row.find_all('td')
-                    if len(cols) >= 8:
-                        batsman = {
-                            "match": match_info,
-                            "teamInnings": innings,
-                            "battingPos": j+1,
-                            "batsmanName": clean_text(cols[0].get_text(strip=True)),
-                            "dismissal": clean_text(cols[1].get_text(strip=True)),
-                            "runs": clean_text(cols[2].get_text(strip=True)),
-                            "balls": clean_text(cols[3].get_text(strip=True)),
-                            "4s": clean_text(cols[5].get_text(strip=True)),
-                            "6s": clean_text(cols[6].get_text(strip=True)),
-                            "SR": clean_text(cols[7].get_text(strip=True))
-                        }
-                        batting_summary.append(batsman)
-                        print(f"Added batsman: {batsman['batsmanName']}")
+                for i, table in enumerate(tables[:2]):  # Only first two innings
+                    innings = team1 if i == 0 else team2
+                    rows = table.select('tbody tr')
+                    
+                    for j, row in enumerate(rows):
+                        cols = row.find_all('td')
+                        if len(cols) >= 8:
+                            batsman = {
+                                "match": match_info,
+                                "teamInnings": innings,
+                                "battingPos": j+1,
+                                "batsmanName": clean_text(cols[0].get_text(strip=True)),
+                                "dismissal": clean_text(cols[1].get_text(strip=True)),
+                                "runs": clean_text(cols[2].get_text(strip=True)),
+                                "balls": clean_text(cols[3].get_text(strip=True)),
+                                "4s": clean_text(cols[5].get_text(strip=True)),
+                                "6s": clean_text(cols[6].get_text(strip=True)),
+                                "SR": clean_text(cols[7].get_text(strip=True))
+                            }
+                            batting_summary.append(batsman)
+            info['rows'] = len(batting_summary)
         
         return batting_summary
         
     except Exception as e:
-        print(f"Error processing match: {str(e)}")
+        print(f"Error processing match {url}: {str(e)}")
         driver.save_screenshot(os.path.join(OUTPUT_DIR, f'debug_match_{url.split("/")[-1]}.png'))
         return []
     finally:
@@ -197,28 +203,31 @@ def main():
     # Stage 2: Scrape batting data
     print("\n=== Stage 2: Scraping Batting Data ===")
     all_batting = []
+    matches = match_links[:5]  # Process first 5 matches for testing
+    # One progress line every few seconds instead of one per batsman
+    progress = Progress("Batting scorecards", total=len(matches), unit='matches')
     
-    for i, link in enumerate(match_links[:5]):  # Process first 5 matches for testing
-        print(f"\nProcessing match {i+1}/{len(match_links)}: {link}")
+    for link in matches:
         batting_data = scrape_batting_summary(link)
         
         if batting_data:
             all_batting.extend(batting_data)
-            print(f"Added {len(batting_data)} batting records")
         
         # Save progress
-        try:
-            with open(os.path.join(OUTPUT_DIR, 'batting_summary.json'), 'w', encoding='utf-8') as f:
-                json.dump(all_batting, f, indent=2, ensure_ascii=False)
-        except UnicodeEncodeError:
-            print("UTF-8 encoding failed, trying ASCII fallback...", file=sys.stderr)
-            with open(os.path.join(OUTPUT_DIR, 'batting_summary_ascii.json'), 'w', encoding='utf-8') as f:
-                json.dump(all_batting, f, indent=2)
+        with span('write', rows=len(all_batting)):
+            try:
+                with open(os.path.join(OUTPUT_DIR, 'batting_summary.json'), 'w', encoding='utf-8') as f:
+                    json.dump(all_batting, f, indent=2, ensure_ascii=False)
+            except UnicodeEncodeError:
+                print("UTF-8 encoding failed, trying ASCII fallback...", file=sys.stderr)
+                with open(os.path.join(OUTPUT_DIR, 'batting_summary_ascii.json'), 'w', encoding='utf-8') as f:
+                    json.dump(all_batting, f, indent=2)
+        progress.update(note=f"{len(all_batting)} batting records")
         
         # Random delay between requests
-        delay = random.uniform(5, 15)
-        print(f"Waiting {delay:.1f} seconds...")
-        time.sleep(delay)
+        with span('wait'):
+            time.sleep(random.uniform(5, 15))
+    progress.close()
     
     print(f"\nCompleted! Collected {len(all_batting)} batting records in total")
 
@@ -9,6 +9,11 @@ from selenium.webdriver.support import expected_conditions as EC
 from bs4 import BeautifulSoup
 import time
 import random
+import sys
+
+# Shared timing spans and sampled progress (instrumentation.py in the repo root)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from instrumentation import Progress, span
 
 # Configuration
 OUTPUT_DIR = 'output'
@@ -38,14 +43,17 @@ def get_match_links():
     
     try:
         url = "https://stats.espncricinfo.com/ci/engine/records/team/match_results.html?id=14450;type=tournament"
-        driver.get(url)
-        
-        WebDriverWait(driver, 30).until(
-            EC.presence_of_element_located((By.XPATH, "//*[contains(text(), 'Match results')]"))
-        )
-        time.sleep(3)
+        with span('fetch', url=url):
+            driver.get(url)
+            
+            WebDriverWait(driver, 30).until(
+                EC.presence_of_element_located((By.XPATH, "//*[contains(text(), 'Match results')]"))
+            )
+        with span('wait'):
+            time.sleep(3)
         
-        soup = BeautifulSoup(driver.page_source, 'html.parser')
+        with span('parse'):
+            soup = BeautifulSoup(driver.page_source, 'html.parser')
         links = []
         
         # Find all scorecard links
@@ -73,52 +81,55 @@ def get_match_links():
 
 def scrape_bowling_data(url):
     """Scrape bowling data from a single match page"""
-    print(f"Processing: {url}")
     driver = get_driver()
     
     try:
-        driver.get(url)
-        WebDriverWait(driver, 30).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "table.ds-table"))
-        )
-        time.sleep(2)
-        
-        soup = BeautifulSoup(driver.page_source, 'html.parser')
-        match_data = []
+        with span('fetch', url=url):
+            driver.get(url)
+            WebDriverWait(driver, 30).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, "table.ds-table"))
+            )
+        with span('wait'):
+            time.sleep(2)
         
-        # Get match info
-        teams = [span.get_text(strip=True).replace(" Innings", "") 
-                for span in soup.select('span.ds-text-title-xs')[:2]]
-        if len(teams) != 2:
-            return []
-        
-        match_info = f"{teams[0]} vs {teams[1]}"
-        
-        # Process bowling tables (2nd and 4th tables)
-        tables = soup.select('table.ds-table')
-        for inning, table_idx in enumerate([1, 3]):  # 2nd and 4th tables contain bowling data
-            if table_idx >= len(tables):
-                continue
-                
-            for row in tables[table_idx].select('tbody tr'):
-                cols = row.find_all('td')
-                if len(cols) >= 11:
-                    match_data.append({
-                        "match": match_info,
-                        "bowlingTeam": teams[1 - inning],  # 0=team2 bowls first, 1=team1 bowls second
-                        "bowlerName": cols[0].get_text(strip=True),
-                        "overs": cols[1].get_text(strip=True),
-                        "maiden": cols[2].get_text(strip=True),
-                        "runs": cols[3].get_text(strip=True),
-                        "wickets": cols[4].get_text(strip=True),
-                        "economy": cols[5].get_text(strip=True),
-                        "0s": cols[6].get_text(strip=True),
-                        "4s": cols[7].get_text(strip=True),
-                        "6s": cols[8].get_text(strip=True),
-                        "wides": cols[9].get_text(strip=True),
-                        "noBalls": cols[10].get_text(strip=True),
-                        "matchURL": url
-                    })
+        with span('parse') as info:
+            soup = BeautifulSoup(driver.page_source, 'html.parser')
+            match_data = []
+            
+            # Get match info
+            teams = [title.get_text(strip=True).replace(" Innings", "") 
+                    for title in soup.select('span.ds-text-title-xs')[:2]]
+            if len(teams) != 2:
+                return []
+            
+            match_info = f"{teams[0]} vs {teams[1]}"
+            
+            # Process bowling tables (2nd and 4th tables)
+            tables = soup.select('table.ds-table')
+            for inning, table_idx in enumerate([1, 3]):  # 2nd and 4th tables contain bowling data
+                if table_idx >= len(tables):
+                    continue
+                    
+                for row in tables[table_idx].select('tbody tr'):
+                    cols = row.find_all('td')
+                    if len(cols) >= 11:
+                        match_data.append({
+                            "match": match_info,
+                            "bowlingTeam": teams[1 - inning],  # 0=team2 bowls first, 1=team1 bowls second
+                            "bowlerName": cols[0].get_text(strip=True),
+                            "overs": cols[1].get_text(strip=True),
+                            "maiden": cols[2].get_text(strip=True),
+                            "runs": cols[3].get_text(strip=True),
+                            "wickets": cols[4].get_text(strip=True),
+                            "economy": cols[5].get_text(strip=True),
+                            "0s": cols[6].get_text(strip=True),
+                            "4s": cols[7].get_text(strip=True),
+                            "6s": cols[8].get_text(strip=True),
+                            "wides": cols[9].get_text(strip=True),
+                            "noBalls": cols[10].get_text(strip=True),
+                            "matchURL": url
+                        })
+            info['rows'] = len(match_data)
         
         return match_data
         
@@ -140,24 +151,27 @@ def main():
     
     # Process matches and collect data
     all_bowling_data = []
+    # One progress line every few seconds instead of one block per match
+    progress = Progress("Bowling scorecards", total=len(match_links), unit='matches')
     
     for i, link in enumerate(match_links, 1):
-        print(f"\nProcessing match {i}/{len(match_links)}")
         bowling_data = scrape_bowling_data(link)
         
         if bowling_data:
             all_bowling_data.extend(bowling_data)
-            print(f"Added {len(bowling_data)} bowling records")
         
         # Save progress after every 5 matches
         if i % 5 == 0 or i == len(match_links):
             output_file = os.path.join(OUTPUT_DIR, 'bowling_data.json')
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(all_bowling_data, f, indent=2, ensure_ascii=False)
-            print(f"Saved progress ({len(all_bowling_data)} total records)")
+            with span('write', rows=len(all_bowling_data)):
+                with open(output_file, 'w', encoding='utf-8') as f:
+                    json.dump(all_bowling_data, f, indent=2, ensure_ascii=False)
+        progress.update(note=f"{len(all_bowling_data)} bowling records")
         
         # Random delay between requests
-        time.sleep(random.uniform(3, 8))
+        with span('wait'):
+            time.sleep(random.uniform(3, 8))
+    progress.close()
     
     print(f"\nCompleted! Final data saved to {output_file}")
     print(f"Total bowling records collected: {len(all_bowling_data)}")
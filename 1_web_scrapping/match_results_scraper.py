@@ -9,6 +9,11 @@ from dotenv import load_dotenv
 from bs4 import BeautifulSoup
 import time
 import random
+import sys
+
+# Shared timing spans (instrumentation.py in the repo root)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from instrumentation import span
 
 # Configuration
 OUTPUT_DIR = 'output'
@@ -42,41 +47,46 @@ def scrape_match_results():
         # Access target page
         url = "https://stats.espncricinfo.com/ci/engine/records/team/match_results.html?id=14450;type=tournament"
         print(f"Accessing: {url}")
-        driver.get(url)
-        
-        # More generic wait condition
-        WebDriverWait(driver, 30).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "table tbody tr"))
-        )
+        with span('fetch', url=url):
+            driver.get(url)
+            
+            # More generic wait condition
+            WebDriverWait(driver, 30).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, "table tbody tr"))
+            )
         
         # Add random delay to mimic human behavior
-        time.sleep(random.uniform(2, 5))
+        with span('wait'):
+            time.sleep(random.uniform(2, 5))
         
         # Parse page
-        soup = BeautifulSoup(driver.page_source, 'html.parser')
-        matches = []
-        
-        # Fixed selector - get all data rows (skip header)
-        rows = soup.select('table tbody tr')
-        print(f"Found {len(rows)} rows")
-        
-        for row in rows[1:]:  # skip
-            cols = row.find_all('td')
-            if len(cols) >= 7:
-                matches.append({
-                    'team1': cols[0].get_text(strip=True),
-                    'team2': cols[1].get_text(strip=True),
-                    'winner': cols[2].get_text(strip=True),
-                    'margin': cols[3].get_text(strip=True),
-                    'ground': cols[4].get_text(strip=True),
-                    'matchDate': cols[5].get_text(strip=True),
-                    'scorecard': cols[6].get_text(strip=True)
-                })
+        with span('parse') as info:
+            soup = BeautifulSoup(driver.page_source, 'html.parser')
+            matches = []
+            
+            # Fixed selector - get all data rows (skip header)
+            rows = soup.select('table tbody tr')
+            print(f"Found {len(rows)} rows")
+            
+            for row in rows[1:]:  # skip
+                cols = row.find_all('td')
+                if len(cols) >= 7:
+                    matches.append({
+                        'team1': cols[0].get_text(strip=True),
+                        'team2': cols[1].get_text(strip=True),
+                        'winner': cols[2].get_text(strip=True),
+                        'margin': cols[3].get_text(strip=True),
+                        'ground': cols[4].get_text(strip=True),
+                        'matchDate': cols[5].get_text(strip=True),
+                        'scorecard': cols[6].get_text(strip=True)
+                    })
+            info['rows'] = len(matches)
         
         # save results
         output_file = os.path.join(OUTPUT_DIR, 'match_results.json')
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump({'matches': matches}, f, indent=2, ensure_ascii=False)
+        with span('write', rows=len(matches)):
+            with open(output_file, 'w', encoding='utf-8') as f:
+                json.dump({'matches': matches}, f, indent=2, ensure_ascii=False)
         
         print(f"Success! Saved {len(matches)} matches to {output_file}")
         
@@ -3,6 +3,7 @@ import os
 import time
 import json
 import random
+import sys
 from dotenv import load_dotenv
 from selenium import webdriver
 from selenium.webdriver.common.by import By
@@ -10,6 +11,10 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from bs4 import BeautifulSoup
 
+# Shared timing spans and sampled progress (instrumentation.py in the repo root)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from instrumentation import Progress, span
+
 # Load credentials
 load_dotenv()
 SCRAPING_BROWSER_URL = (
@@ -38,11 +43,13 @@ def get_match_links():
     driver = setup_driver()
     links = []
     try:
-        driver.get(url)
-        WebDriverWait(driver, 15).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "table.engineTable"))
-        )
-        soup = BeautifulSoup(driver.page_source, "html.parser")
+        with span('fetch', url=url):
+            driver.get(url)
+            WebDriverWait(driver, 15).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, "table.engineTable"))
+            )
+        with span('parse'):
+            soup = BeautifulSoup(driver.page_source, "html.parser")
         rows = soup.select("table.engineTable tr.data1")
 
         for row in rows:
@@ -62,11 +69,13 @@ def get_players_from_match(match_url):
     driver = setup_driver()
     players = []
     try:
-        driver.get(match_url)
-        WebDriverWait(driver, 20).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "table.ci-scorecard-table"))
-        )
-        soup = BeautifulSoup(driver.page_source, "html.parser")
+        with span('fetch', url=match_url):
+            driver.get(match_url)
+            WebDriverWait(driver, 20).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, "table.ci-scorecard-table"))
+            )
+        with span('parse'):
+            soup = BeautifulSoup(driver.page_source, "html.parser")
 
         # Get team names
         match_info_divs = soup.find_all("div", class_="ds-text-tight-m")
@@ -119,20 +128,22 @@ def get_players_from_match(match_url):
 def get_player_profile(url):
     driver = setup_driver()
     try:
-        driver.get(url)
-        WebDriverWait(driver, 20).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "div.ds-grid"))
-        )
-        soup = BeautifulSoup(driver.page_source, "html.parser")
+        with span('fetch', url=url):
+            driver.get(url)
+            WebDriverWait(driver, 20).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, "div.ds-grid"))
+            )
+        with span('parse'):
+            soup = BeautifulSoup(driver.page_source, "html.parser")
 
         def extract(label):
             divs = soup.select("div.ds-grid > div")
             for div in divs:
                 p = div.find("p")
                 if p and p.text.strip() == label:
-                    span = div.find("span")
-                    if span:
-                        return clean_text(span.text)
+                    value = div.find("span")
+                    if value:
+                        return clean_text(value.text)
             return None
 
         description_tag = soup.select_one("div.ci-player-bio-content > p")
@@ -158,16 +169,21 @@ def main():
         players = get_players_from_match(match_url)
         print(f"Found {len(players)} players.")
 
-        for player in players:
-            print(f"Stage 3: Fetching profile for {player['name']}")
-            profile = get_player_profile(player["url"])
-            all_players.append({**player, **profile})
-
-            # Save after every player
-            with open(os.path.join(OUTPUT_DIR, "players_full_data.json"), "w", encoding="utf-8") as f:
-                json.dump(all_players, f, indent=2, ensure_ascii=False)
-
-            time.sleep(random.uniform(2, 5))  # polite delay
+        # Stage 3: one progress line every few seconds instead of one per player
+        with Progress("Stage 3: Player profiles", total=len(players), unit='players') as progress:
+            for player in players:
+                with span('player', name=player['name']):
+                    profile = get_player_profile(player["url"])
+                all_players.append({**player, **profile})
+
+                # Save after every player
+                with span('write', rows=len(all_players)):
+                    with open(os.path.join(OUTPUT_DIR, "players_full_data.json"), "w", encoding="utf-8") as f:
+                        json.dump(all_players, f, indent=2, ensure_ascii=False)
+                progress.update(note=player['name'])
+
+                with span('wait'):
+                    time.sleep(random.uniform(2, 5))  # polite delay
 
     print(f"\nCompleted: {len(all_players)} players collected.")
 
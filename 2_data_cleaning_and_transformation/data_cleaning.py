@@ -1,7 +1,14 @@
 import pandas as pd
 import json
+import os
+import sys
 
-with open('t20_wc_match_results.json') as f:
+# Timing spans for load / merge / write (instrumentation.py in the repo root);
+# set T20_TRACE=trace.json to record them
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from instrumentation import span
+
+with span('load', file='t20_wc_match_results.json'), open('t20_wc_match_results.json') as f:
     data = json.load(f)
 
 #get matches from the json
@@ -26,7 +33,7 @@ match_ids_df = pd.DataFrame.from_dict(match_ids_dict, orient='index')
 print(match_ids_df.head(10).to_string(), match_ids_df.shape)
 
 
-with open('t20_wc_batting_summary.json') as f:
+with span('load', file='t20_wc_batting_summary.json'), open('t20_wc_batting_summary.json') as f:
     data = json.load(f)
     all_records = []
     for rec in data:
@@ -39,7 +46,8 @@ print(df_batting.head(11).to_string())
 df_batting['out/not_out'] = df_batting.dismissal.apply(lambda x: "out" if len(x)>0 else "not_out")
 print(df_batting.head(11).to_string())
 
-df_batting['match_id'] = df_batting['match'].map(match_ids_dict)
+with span('merge', table='batting'):
+    df_batting['match_id'] = df_batting['match'].map(match_ids_dict)
 print(df_batting.head().to_string())
 
 df_batting.drop(columns=["dismissal"], inplace=True)
@@ -50,9 +58,10 @@ df_batting['batsmanName'] = df_batting['batsmanName'].apply(lambda x: x.replace(
 print(df_batting.head().to_string())
 print(df_batting.shape)
 
-df_batting.to_csv('fact_bating_summary.csv', index = False)
+with span('write', file='fact_bating_summary.csv'):
+    df_batting.to_csv('fact_bating_summary.csv', index = False)
 
-with open('t20_wc_bowling_summary.json') as f:
+with span('load', file='t20_wc_bowling_summary.json'), open('t20_wc_bowling_summary.json') as f:
     data = json.load(f)
     all_records = []
     for rec in data:
@@ -64,11 +73,13 @@ df_bowling = pd.DataFrame(all_records)
 print(df_bowling.shape)
 print(df_bowling.head().to_string())
 
-df_bowling['match_id'] = df_bowling['match'].map(match_ids_dict)
+with span('merge', table='bowling'):
+    df_bowling['match_id'] = df_bowling['match'].map(match_ids_dict)
 print(df_bowling.head().to_string())
-df_bowling.to_csv('fact_bowling_summary.csv', index = False)
+with span('write', file='fact_bowling_summary.csv'):
+    df_bowling.to_csv('fact_bowling_summary.csv', index = False)
 
-with open('t20_wc_player_info.json') as f:
+with span('load', file='t20_wc_player_info.json'), open('t20_wc_player_info.json') as f:
     data = json.load(f)
 df_players = pd.DataFrame(data)
 print(df_players.shape)
@@ -78,4 +89,11 @@ df_players['name'] = df_players['name'].apply(lambda x: x.replace('â€', ''))
 df_players['name'] = df_players['name'].apply(lambda x: x.replace('†', ''))
 df_players['name'] = df_players['name'].apply(lambda x: x.replace('\xa0', ''))
 print(df_players.head(10).to_string())
-df_players.to_csv('dim_players_no_images.csv', index = False)
\ No newline at end of file
+with span('write', file='dim_players_no_images.csv'):
+    df_players.to_csv('dim_players_no_images.csv', index = False)
+
+# Keep the core player dimension small: biographies and image links move to
+# the player_details/ side store, read per player on demand
+from player_store import split_players
+with span('write', file='player_details'):
+    split_players('.')
@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+"""
+Player Text and Image Side Store
+- Keeps the core player dimension (dim_players_no_images.csv) down to the
+  columns the pipeline joins on: name, team, batting and bowling style, role
+- Biographies and image links live in player_details/details.parquet,
+  sorted by name in small row groups, so one player's row is read on demand
+  (row-group statistics skip the others) instead of every loader parsing
+  every biography
+- Thumbnails are fetched and resized once, then served from
+  player_details/thumbnails/<size>/; they are keyed by the image link, so a
+  new photo gets a new thumbnail
+
+Usage:
+    python player_store.py --data-dir ../data_collection_and_cleaning_output
+    python player_store.py --data-dir ../data_collection_and_cleaning_output --player "Virat Kohli"
+"""
+
+import argparse
+import hashlib
+import io
+import os
+import time
+import urllib.request
+from functools import lru_cache
+
+import pandas as pd
+
+CORE_FILE = 'dim_players_no_images.csv'
+# The full scraped dimension, with image links; kept as the source of record
+FULL_FILE = 'dim_players.csv'
+STORE_DIR = 'player_details'
+DETAILS_FILE = 'details.parquet'
+DETAIL_COLUMNS = ['description', 'image']
+ROW_GROUP_SIZE = 64
+THUMBNAIL_SIZE = 128
+FETCH_TIMEOUT = 5
+
+# ------------------------------
+# Building the Store
+# ------------------------------
+def _write_atomic(path, write):
+    tmp = f"{path}.tmp"
+    write(tmp)
+    os.replace(tmp, path)
+
+def _detail_columns(path):
+    return [c for c in DETAIL_COLUMNS if c in pd.read_csv(path, nrows=0).columns]
+
+def split_players(data_dir='.'):
+    """Move biographies and image links from the core player dimension to the side store
+
+    Details are merged per player from the core file, the full dimension
+    and the existing store, in that order of preference, so rerunning after
+    the core file was slimmed loses nothing. Returns the store's row count.
+    """
+    store_dir = os.path.join(data_dir, STORE_DIR)
+    store = os.path.join(store_dir, DETAILS_FILE)
+    core_path = os.path.join(data_dir, CORE_FILE)
+
+    frames = []
+    for path in (core_path, os.path.join(data_dir, FULL_FILE)):
+        if os.path.exists(path) and _detail_columns(path):
+            frames.append(pd.read_csv(path, usecols=['name'] + _detail_columns(path)))
+    if os.path.exists(store):
+        frames.append(pd.read_parquet(store))
+    if not frames:
+        raise FileNotFoundError(f"No player details found in {data_dir}")
+
+    details = pd.concat(frames, ignore_index=True).reindex(columns=['name'] + DETAIL_COLUMNS)
+    details['name'] = details['name'].astype(str).str.strip()
+    # First non-empty value per player and column, in the order read above
+    details = details.groupby('name', sort=True).first().reset_index()
+    details = details.astype(object).where(details.notna(), None)
+    os.makedirs(store_dir, exist_ok=True)
+    _write_atomic(store, lambda tmp: details.to_parquet(
+        tmp, index=False, row_group_size=ROW_GROUP_SIZE))
+
+    core = pd.read_csv(core_path)
+    if set(DETAIL_COLUMNS) & set(core.columns):
+        core = core.drop(columns=DETAIL_COLUMNS, errors='ignore')
+        _write_atomic(core_path, lambda tmp: core.to_csv(tmp, index=False))
+    return len(details)
+
+# ------------------------------
+# Thumbnails
+# ------------------------------
+def fetch_image(source, base_dir='.', timeout=FETCH_TIMEOUT):
+    """Image bytes from a URL or a path relative to `base_dir`"""
+    if source.startswith(('http://', 'https://')):
+        request = urllib.request.Request(source, headers={'User-Agent': 'Mozilla/5.0'})
+        with urllib.request.urlopen(request, timeout=timeout) as resp:
+            return resp.read()
+    with open(os.path.join(base_dir, source), 'rb') as f:
+        return f.read()
+
+def make_thumbnail(data, path, size=THUMBNAIL_SIZE):
+    """Resize image bytes to fit a size x size box and save them as PNG"""
+    from PIL import Image
+    image = Image.open(io.BytesIO(data))
+    image.thumbnail((size, size), Image.LANCZOS)
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA')
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    _write_atomic(path, lambda tmp: image.save(tmp, format='PNG'))
+    return path
+
+# ------------------------------
+# Reading
+# ------------------------------
+class PlayerDetails:
+    """Biographies, image links and cached thumbnails, read per player on demand
+
+    The store is built from the data directory on first use if missing.
+    Rows are cached per player and store version.
+    """
+
+    def __init__(self, data_dir, cache_size=256):
+        self.data_dir = data_dir
+        self.store_dir = os.path.join(data_dir, STORE_DIR)
+        self.path = os.path.join(self.store_dir, DETAILS_FILE)
+        if not os.path.exists(self.path):
+            split_players(data_dir)
+        self._cached = lru_cache(maxsize=cache_size)(self._read)
+
+    def _read(self, name, mtime):
+        rows = pd.read_parquet(self.path, filters=[('name', '==', name)])
+        if rows.empty:
+            return None
+        row = rows.iloc[0]
+        return {c: (row[c] if pd.notna(row[c]) else None) for c in DETAIL_COLUMNS}
+
+    def get(self, name):
+        """{'description', 'image'} for one player, or None if unknown"""
+        return self._cached(name, os.stat(self.path).st_mtime_ns)
+
+    def description(self, name):
+        details = self.get(name)
+        return details['description'] if details else None
+
+    def thumbnail(self, name, size=THUMBNAIL_SIZE):
+        """Path of the player's cached thumbnail, made on first request
+
+        Returns None when the player has no image or it cannot be fetched
+        (for example offline); the next request tries again.
+        """
+        details = self.get(name)
+        source = details['image'] if details else None
+        if not source:
+            return None
+        key = hashlib.sha1(source.encode()).hexdigest()[:16]
+        path = os.path.join(self.store_dir, 'thumbnails', str(size), f"{key}.png")
+        if os.path.exists(path):
+            return path
+        try:
+            return make_thumbnail(fetch_image(source, self.data_dir), path, size)
+        except (OSError, ValueError):
+            return None
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build and query the player text and image store")
+    parser.add_argument('--data-dir', default='.')
+    parser.add_argument('--player', help="Show one player's details and thumbnail")
+    parser.add_argument('--size', type=int, default=THUMBNAIL_SIZE, help="Thumbnail size in pixels")
+    args = parser.parse_args(argv)
+
+    if args.player:
+        store = PlayerDetails(args.data_dir)
+        details = store.get(args.player)
+        if details is None:
+            print(f"No details for {args.player}")
+            return
+        print(f"\n=== {args.player} ===")
+        print(details['description'] or "(no biography)")
+        print(f"Image: {details['image'] or '(none)'}")
+        print(f"Thumbnail: {store.thumbnail(args.player, args.size) or '(unavailable)'}")
+        return
+
+    core_path = os.path.join(args.data_dir, CORE_FILE)
+    before = os.path.getsize(core_path)
+    players = split_players(args.data_dir)
+    start = time.perf_counter()
+    core = pd.read_csv(core_path)
+    load_ms = (time.perf_counter() - start) * 1000
+    store = os.path.join(args.data_dir, STORE_DIR, DETAILS_FILE)
+    print(f"\nSide store: {players} players, {os.path.getsize(store) / 1024:.1f} KB ({store})")
+    print(f"Core dimension: {len(core)} rows, {before / 1024:.1f} KB -> "
+          f"{os.path.getsize(core_path) / 1024:.1f} KB, loads in {load_ms:.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,315 @@
+# -*- coding: utf-8 -*-
+"""
+Pluggable DataFrame Backends for the Analysis Layer
+- Eager pandas backend (default, matches the original scripts exactly)
+- Lazy, multi-threaded Polars backend with projection and predicate pushdown
+- Reads CSV or Parquet sources; convert_to_parquet() builds the columnar copies
+
+Every backend works on its own native frame type (pandas DataFrame or Polars
+LazyFrame). Aggregations are executed by the backend and only the small
+result tables are returned as pandas, so the printing, plotting and
+resampling code downstream is shared.
+"""
+
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+NUMERIC_FIX = r'(\d+\.\d+)\.\d+'   # e.g. "12.50.1" -> "12.50"
+
+# Predicate operators understood by both backends:
+#   (column, 'contains', text), (column, '>=', value), (column, '==', value),
+#   (column, 'notnull', None)
+
+# ------------------------------
+# Shared Helpers
+# ------------------------------
+def _normalize(name):
+    return str(name).strip().lower()
+
+def _source_columns(path):
+    """Raw column names of a CSV or Parquet file without reading the data"""
+    if path.endswith('.parquet'):
+        import pyarrow.parquet as pq
+        return pq.read_schema(path).names
+    return list(pd.read_csv(path, nrows=0).columns)
+
+def safe_numeric_conversion(series):
+    """Convert series to numeric with advanced cleaning"""
+    if series.dtype == object:
+        series = series.astype(str).apply(
+            lambda x: re.sub(NUMERIC_FIX, r'\1', x) if pd.notna(x) else x
+        )
+    return pd.to_numeric(series, errors='coerce')
+
+def _finish_groups(result, key, order):
+    """Put a collected aggregate into pandas groupby layout"""
+    return result.set_index(key).sort_index()[order]
+
+def convert_to_parquet(data_dir, out_dir=None):
+    """Write Parquet copies of every CSV in data_dir (raw, uncleaned)"""
+    out_dir = out_dir or data_dir
+    os.makedirs(out_dir, exist_ok=True)
+    written = []
+    for name in sorted(os.listdir(data_dir)):
+        if not name.endswith('.csv'):
+            continue
+        df = pd.read_csv(os.path.join(data_dir, name), low_memory=False)
+        for col in df.columns[df.dtypes == object]:
+            df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+        path = os.path.join(out_dir, name[:-4] + '.parquet')
+        df.to_parquet(path, index=False)
+        written.append(path)
+    return written
+
+# ------------------------------
+# Pandas Backend (eager)
+# ------------------------------
+class PandasBackend:
+    """Eager pandas implementation; the reference for all results"""
+
+    name = 'pandas'
+
+    def scan(self, path, renames=None, columns=None):
+        """Load a table with lower-cased, renamed columns (optionally projected)"""
+        renames = renames or {}
+        if columns is not None:
+            wanted = set(columns)
+            keep = [c for c in _source_columns(path)
+                    if renames.get(_normalize(c), _normalize(c)) in wanted]
+        else:
+            keep = None
+        if path.endswith('.parquet'):
+            df = pd.read_parquet(path, columns=keep)
+            # Match read_csv, which marks missing text as NaN rather than None
+            for col in df.columns[df.dtypes == object]:
+                df[col] = df[col].where(df[col].notna(), np.nan)
+        else:
+            df = pd.read_csv(path, usecols=keep)
+        df.columns = df.columns.str.strip().str.lower()
+        return df.rename(columns=renames)
+
+    def columns(self, frame):
+        return list(frame.columns)
+
+    def to_numeric(self, frame, columns, fix_versions=False, clip=None):
+        """Coerce columns to numbers (in place), optionally repairing '1.2.3' values"""
+        for col in columns:
+            if col not in frame.columns:
+                continue
+            if fix_versions:
+                series = safe_numeric_conversion(frame[col])
+            else:
+                series = pd.to_numeric(frame[col], errors='coerce')
+            if clip is not None:
+                series = series.clip(*clip)
+            frame[col] = series
+        return frame
+
+    def strip(self, frame, columns):
+        """Strip surrounding whitespace from text columns (in place)"""
+        for col in columns:
+            frame[col] = frame[col].str.strip()
+        return frame
+
+    def merge_left(self, left, right, left_on, right_on, right_columns):
+        """Left join that keeps left row order and drops the right key"""
+        return pd.merge(
+            left,
+            right[[right_on] + right_columns],
+            left_on=left_on,
+            right_on=right_on,
+            how='left'
+        ).drop(columns=right_on)
+
+    def _mask(self, frame, where):
+        column, op, value = where
+        if op == 'contains':
+            return frame[column].str.contains(value, na=False)
+        if op == '>=':
+            return frame[column] >= value
+        if op == '==':
+            return frame[column] == value
+        if op == 'notnull':
+            return frame[column].notna()
+        raise ValueError(f"Unsupported predicate: {op}")
+
+    def select(self, frame, columns, where=None):
+        """Rows (in source order) of the given columns as a pandas DataFrame"""
+        if where is not None:
+            frame = frame[self._mask(frame, where)]
+        return frame[columns]
+
+    def group_agg(self, frame, key, aggs):
+        """Aggregate by key; aggs is a list of (column, func, output_name)"""
+        return frame.groupby(key).agg(**{out: (col, func) for col, func, out in aggs})
+
+    def team_win_rates(self, matches):
+        """Matches, wins and win rate per team, in order of first appearance"""
+        appearances = pd.concat([matches['team1'], matches['team2']])
+        teams = appearances.unique()
+        both = matches['team1'] == matches['team2']
+        totals = appearances.value_counts().sub(
+            matches.loc[both, 'team1'].value_counts(), fill_value=0)
+        wins = matches['winner'].value_counts()
+        result = pd.DataFrame({
+            'Team': teams,
+            'Matches': totals.reindex(teams).fillna(0).astype('int64').to_numpy(),
+            'Wins': wins.reindex(teams).fillna(0).astype('int64').to_numpy()
+        })
+        result['WinRate'] = (result['Wins'] / result['Matches']).where(result['Matches'] > 0, 0)
+        return result
+
+    def collect(self, frame):
+        return frame
+
+# ------------------------------
+# Polars Backend (lazy)
+# ------------------------------
+class PolarsBackend:
+    """Lazy Polars implementation; queries run multi-threaded on collect"""
+
+    name = 'polars'
+
+    def __init__(self):
+        try:
+            import polars as pl
+        except ImportError as e:
+            raise ImportError(
+                "The polars backend requires the 'polars' package (pip install polars)"
+            ) from e
+        self.pl = pl
+
+    def scan(self, path, renames=None, columns=None):
+        pl = self.pl
+        renames = renames or {}
+        if path.endswith('.parquet'):
+            lf = pl.scan_parquet(path)
+        else:
+            # CSV is row-oriented: parse it once rather than on every collect()
+            try:
+                lf = pl.read_csv(path, infer_schema_length=10000).lazy()
+            except pl.exceptions.ComputeError:
+                # A late row did not fit the inferred types; infer from all rows
+                lf = pl.read_csv(path, infer_schema_length=None).lazy()
+        mapping = {c: renames.get(_normalize(c), _normalize(c))
+                   for c in lf.collect_schema().names()}
+        lf = lf.rename(mapping)
+        if columns is not None:
+            lf = lf.select([c for c in mapping.values() if c in set(columns)])
+        return lf
+
+    def columns(self, frame):
+        return frame.collect_schema().names()
+
+    def to_numeric(self, frame, columns, fix_versions=False, clip=None):
+        pl = self.pl
+        schema = frame.collect_schema()
+        exprs = []
+        for col in columns:
+            if col not in schema:
+                continue
+            expr = pl.col(col)
+            if schema[col] == pl.String:
+                expr = expr.str.strip_chars()
+                if fix_versions:
+                    expr = expr.str.replace(NUMERIC_FIX, '${1}')
+                expr = expr.cast(pl.Float64, strict=False)
+            if clip is not None:
+                expr = expr.clip(*clip)
+            exprs.append(expr.alias(col))
+        return frame.with_columns(exprs) if exprs else frame
+
+    def strip(self, frame, columns):
+        pl = self.pl
+        return frame.with_columns([pl.col(c).str.strip_chars() for c in columns])
+
+    def merge_left(self, left, right, left_on, right_on, right_columns):
+        right = right.select([right_on] + right_columns)
+        return left.join(right, left_on=left_on, right_on=right_on,
+                         how='left', maintain_order='left_right')
+
+    def _expr(self, where):
+        pl = self.pl
+        column, op, value = where
+        if op == 'contains':
+            return pl.col(column).str.contains(value, literal=True).fill_null(False)
+        if op == '>=':
+            return pl.col(column) >= value
+        if op == '==':
+            return pl.col(column) == value
+        if op == 'notnull':
+            return pl.col(column).is_not_null()
+        raise ValueError(f"Unsupported predicate: {op}")
+
+    def select(self, frame, columns, where=None):
+        if where is not None:
+            frame = frame.filter(self._expr(where))
+        return frame.select(columns).collect().to_pandas()
+
+    def group_agg(self, frame, key, aggs):
+        pl = self.pl
+        funcs = {
+            'sum': lambda c: pl.col(c).sum(),
+            'mean': lambda c: pl.col(c).mean(),
+            'count': lambda c: pl.col(c).count().cast(pl.Int64),   # int64 like pandas, not UInt32
+            'median': lambda c: pl.col(c).median(),
+            'min': lambda c: pl.col(c).min(),
+            'max': lambda c: pl.col(c).max()
+        }
+        exprs = [funcs[func](col).alias(out) for col, func, out in aggs]
+        result = (frame.filter(pl.col(key).is_not_null())
+                  .group_by(key).agg(exprs).collect().to_pandas())
+        return _finish_groups(result, key, [out for _, _, out in aggs])
+
+    def team_win_rates(self, matches):
+        pl = self.pl
+        games = matches.select(['team1', 'team2', 'winner'])
+        appearances = pl.concat([
+            games.select(pl.col('team1').alias('Team'), pl.lit(0).alias('side')),
+            games.filter(pl.col('team2') != pl.col('team1'))
+                 .select(pl.col('team2').alias('Team'), pl.lit(1).alias('side'))
+        ]).with_row_index('order')
+        totals = (appearances.group_by('Team')
+                  .agg(pl.len().alias('Matches'), pl.col('order').min()))
+        wins = (games.group_by('winner').agg(pl.len().alias('Wins'))
+                .rename({'winner': 'Team'}))
+        result = (totals.join(wins, on='Team', how='left')
+                  .with_columns(pl.col('Wins').fill_null(0))
+                  .sort('order')
+                  .select(['Team', 'Matches', 'Wins'])
+                  .collect().to_pandas())
+        result['Matches'] = result['Matches'].astype('int64')
+        result['Wins'] = result['Wins'].astype('int64')
+        result['WinRate'] = (result['Wins'] / result['Matches']).where(result['Matches'] > 0, 0)
+        return result
+
+    def collect(self, frame):
+        return frame.collect().to_pandas()
+
+BACKENDS = {
+    'pandas': PandasBackend,
+    'polars': PolarsBackend
+}
+
+_instances = {}
+
+def get_backend(backend=None):
+    """Resolve a backend instance from a name, an instance or None (pandas)"""
+    if backend is None:
+        backend = 'pandas'
+    if isinstance(backend, str):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend: {backend} (choose from {', '.join(BACKENDS)})")
+        if backend not in _instances:
+            _instances[backend] = BACKENDS[backend]()
+        return _instances[backend]
+    return backend
+
+def backend_of(frame):
+    """Backend that owns a native frame (Polars frames -> polars, else pandas)"""
+    if type(frame).__module__.startswith('polars'):
+        return get_backend('polars')
+    return get_backend('pandas')
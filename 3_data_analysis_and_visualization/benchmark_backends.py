@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""
+Backend Benchmark on Synthetic Data
+- Generates large synthetic match, player, batting and bowling tables
+- Times load + preprocess + aggregation for each backend and file format
+- Verifies every backend returns the same tables as pandas
+
+Usage:
+    python benchmark_backends.py --rows 2000000 --players 20000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..', '4_predictive_model'))
+
+import cricket_analysis_2 as analysis
+import predict
+from backends import BACKENDS, backend_of, convert_to_parquet
+
+# ------------------------------
+# Synthetic Data
+# ------------------------------
+def make_synthetic_data(out_dir, n_rows, n_players, n_teams=40, seed=0):
+    """Write synthetic CSV tables with the same headers as the cleaned data"""
+    rng = np.random.default_rng(seed)
+    teams = np.array([f"Team {i}" for i in range(n_teams)])
+    names = np.array([f"Player {i}" for i in range(n_players)])
+    n_matches = max(n_rows // 22, 1)
+    match_ids = np.array([f"T20I # {i}" for i in range(n_matches)])
+
+    t1 = rng.integers(0, n_teams, n_matches)
+    t2 = (t1 + rng.integers(1, n_teams, n_matches)) % n_teams
+    winner = np.where(rng.random(n_matches) < 0.5, teams[t1], teams[t2])
+    pd.DataFrame({
+        'team1': teams[t1], 'team2': teams[t2], 'winner': winner,
+        'margin': '10 runs', 'ground': 'Ground', 'matchDate': 'Oct 16, 2022',
+        'match_id': match_ids
+    }).to_csv(os.path.join(out_dir, 'dim_match_summary.csv'), index=False)
+
+    styles = np.array(['Left hand Bat', 'Right hand Bat'])
+    roles = np.array(['Top order Batter', 'Bowler', 'Allrounder', 'Wicketkeeper Batter'])
+    pd.DataFrame({
+        'name': names,
+        'team': teams[rng.integers(0, n_teams, n_players)],
+        'battingStyle': styles[rng.integers(0, 2, n_players)],
+        'bowlingStyle': 'Right arm Medium',
+        'playingRole': roles[rng.integers(0, len(roles), n_players)]
+    }).to_csv(os.path.join(out_dir, 'dim_players_no_images.csv'), index=False)
+
+    balls = rng.integers(1, 60, n_rows)
+    runs = rng.binomial(balls * 2, 0.6)
+    sr = np.round(runs / balls * 100, 2).astype(str)
+    sr[rng.random(n_rows) < 0.001] = '-'
+    pd.DataFrame({
+        'match': 'A Vs B',
+        'teamInnings': teams[rng.integers(0, n_teams, n_rows)],
+        'battingPos': rng.integers(1, 12, n_rows),
+        'batsmanName': names[rng.integers(0, n_players, n_rows)],
+        'runs': runs, 'balls': balls,
+        '4s': rng.binomial(balls, 0.1), '6s': rng.binomial(balls, 0.04),
+        'SR': sr,
+        'out/not_out': np.where(rng.random(n_rows) < 0.8, 'out', 'not_out'),
+        'match_id': match_ids[rng.integers(0, n_matches, n_rows)]
+    }).to_csv(os.path.join(out_dir, 'fact_batting_summary.csv'), index=False)
+
+    n_bowl = n_rows * 3 // 4
+    overs = rng.integers(1, 5, n_bowl)
+    conceded = rng.integers(0, 60, n_bowl)
+    pd.DataFrame({
+        'match': 'A Vs B',
+        'bowlingTeam': teams[rng.integers(0, n_teams, n_bowl)],
+        'bowlerName': names[rng.integers(0, n_players, n_bowl)],
+        'overs': overs, 'maiden': 0, 'runs': conceded,
+        'wickets': rng.integers(0, 5, n_bowl),
+        'economy': np.round(conceded / overs, 2),
+        '0s': 0, '4s': 0, '6s': 0, 'wides': 0, 'noBalls': 0,
+        'match_id': match_ids[rng.integers(0, n_matches, n_bowl)]
+    }).to_csv(os.path.join(out_dir, 'fact_bowling_summary.csv'), index=False)
+
+# ------------------------------
+# Workload
+# ------------------------------
+def run_workload(data_dir, backend, fmt):
+    """Load, preprocess and aggregate; return the result tables"""
+    path = lambda name: os.path.join(data_dir, f"{name}.{fmt}")
+    matches = analysis.load_match_data(path('dim_match_summary'), backend)
+    players = analysis.load_player_data(path('dim_players_no_images'), backend,
+                                        columns=['name', 'battingstyle', 'bowlingstyle', 'playingrole'])
+    batting = analysis.load_batting_data(path('fact_batting_summary'), backend)
+    bowling = analysis.load_bowling_data(path('fact_bowling_summary'), backend)
+    matches, batting, bowling = analysis.preprocess_data(matches, players, batting, bowling)
+
+    b = backend_of(batting)
+    results = {
+        'win_rates': b.team_win_rates(matches),
+        'batting_stats': b.group_agg(batting, 'batsmanname', [
+            ('runs', 'sum', 'runs'), ('sr', 'mean', 'sr'),
+            ('4s', 'sum', '4s'), ('6s', 'sum', '6s')]),
+        'bowling_stats': b.group_agg(bowling, 'bowlername', [
+            ('economy', 'mean', 'economy'), ('wickets', 'sum', 'wickets'),
+            ('overs', 'sum', 'overs')]),
+        'left_sr': b.select(batting, ['sr'], where=('battingstyle', 'contains', 'Left'))
+    }
+
+    model_batting = predict.load_batting_data(path('fact_batting_summary'), backend)
+    model_bowling = predict.load_bowling_data(path('fact_bowling_summary'), backend)
+    results['batting_features'], results['bowling_features'] = predict.create_features(
+        model_batting, model_bowling)
+    return results
+
+def check_equal(reference, other):
+    for name, expected in reference.items():
+        got = other[name]
+        pd.testing.assert_frame_equal(
+            expected.reset_index(drop=True) if name == 'left_sr' else expected,
+            got.reset_index(drop=True) if name == 'left_sr' else got,
+            check_exact=False, rtol=1e-9
+        )
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark analysis backends")
+    parser.add_argument('--rows', type=int, default=1_000_000, help="Batting rows")
+    parser.add_argument('--players', type=int, default=10_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--backends', nargs='+', default=list(BACKENDS))
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        print(f"Generating {args.rows:,} batting rows for {args.players:,} players...")
+        make_synthetic_data(data_dir, args.rows, args.players)
+        convert_to_parquet(data_dir)
+
+        reference = None
+        print(f"\n{'backend':>8} {'format':>8} {'best (s)':>10} {'mean (s)':>10}  result")
+        for fmt in ['csv', 'parquet']:
+            for name in args.backends:
+                times = []
+                for _ in range(args.repeat):
+                    start = time.perf_counter()
+                    results = run_workload(data_dir, name, fmt)
+                    times.append(time.perf_counter() - start)
+                if reference is None:
+                    reference = results
+                    status = 'reference'
+                else:
+                    check_equal(reference, results)
+                    status = 'identical'
+                print(f"{name:>8} {fmt:>8} {min(times):>10.3f} {np.mean(times):>10.3f}  {status}")
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,9 @@ T20 Cricket Data Analysis Pipeline (Fixed Version)
 - Complete statistical analysis
 """
 
+import os
+import sys
+
 import pandas as pd
 import numpy as np
 import seaborn as sns
@@ -104,7 +107,9 @@ def analyze_team_performance(matches):
             'WinRate': f"{(wins/total)*100:.1f}%"
         })
     
-    print(pd.DataFrame(results).sort_values('Wins', ascending=False).to_string(index=False))
+    win_df = pd.DataFrame(results).sort_values('Wins', ascending=False)
+    print(win_df.to_string(index=False))
+    return win_df
 
 def analyze_batting(batting):
     """Analyze batting stats"""
@@ -117,6 +122,7 @@ def analyze_batting(batting):
     }).sort_values('sr', ascending=False)
     
     print(top_batsmen.head(10).to_string())
+    return top_batsmen
 
 def analyze_bowling(bowling):
     """Analyze bowling stats"""
@@ -128,20 +134,21 @@ def analyze_bowling(bowling):
     }).sort_values('economy')
     
     print(top_bowlers.head(10).to_string())
+    return top_bowlers
 
 # ------------------------------
 # Main Execution
 # ------------------------------
-def main():
+def main(data_dir='.'):
     print("Starting T20 Analysis...")
     
     try:
         # Load data
         print("Loading files...")
-        matches = load_match_data('dim_match_summary.csv')
-        players = load_player_data('dim_players_no_images.csv')
-        batting = load_batting_data('fact_batting_summary.csv')
-        bowling = load_bowling_data('fact_bowling_summary.csv')
+        matches = load_match_data(os.path.join(data_dir, 'dim_match_summary.csv'))
+        players = load_player_data(os.path.join(data_dir, 'dim_players_no_images.csv'))
+        batting = load_batting_data(os.path.join(data_dir, 'fact_batting_summary.csv'))
+        bowling = load_bowling_data(os.path.join(data_dir, 'fact_bowling_summary.csv'))
         
         # Process data
         print("Processing data...")
@@ -155,8 +162,9 @@ def main():
         print("\nAnalysis completed successfully!")
         
     except Exception as e:
-        print(f"\nERROR: {str(e)}")
+        print(f"\nERROR: {type(e).__name__}: {str(e)}")
         print("Check: 1) File paths 2) CSV formats 3) Column names")
+        raise
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main(sys.argv[1] if len(sys.argv) > 1 else '.')
\ No newline at end of file
@@ -6,140 +6,137 @@ T20 Cricket Data Analysis Pipeline
 - Advanced visualizations
 """
 
-import pandas as pd
+import os
+import sys
+
 import numpy as np
-import seaborn as sns
-import matplotlib.pyplot as plt
 from scipy.stats import ttest_ind, spearmanr
+from backends import get_backend, backend_of
+from figure_pipeline import figure_job, render_figures, report_render
+from resampling import bootstrap_diff_ci, permutation_test, spearman_resample, compare_groups
 
 # ------------------------------
 # Data Loading Functions
 # ------------------------------
-def load_match_data(filepath):
+# Loaders return native frames of the chosen backend ('pandas' by default,
+# or 'polars' for lazy scans of CSV/Parquet files). `columns` projects the
+# table down to the listed (normalized) columns at read time.
+
+PLAYER_RENAMES = {
+    'dbdb': 'name',
+    'ibdb': 'team',
+    'dbstringstyle': 'battingstyle',
+    'boolingstyle': 'bowlingstyle'
+}
+
+BATTING_RENAMES = {
+    '45': '4s',
+    '65': '6s',
+    'out/not_out': 'dismissal'
+}
+
+def load_match_data(filepath, backend=None, columns=None):
     """Load and clean match summary data"""
-    df = pd.read_csv(filepath)
-    df.columns = df.columns.str.strip().str.lower()
-    return df
+    return get_backend(backend).scan(filepath, columns=columns)
 
-def load_player_data(filepath):
+def load_player_data(filepath, backend=None, columns=None):
     """Load and standardize player data"""
-    df = pd.read_csv(filepath)
-    df.columns = df.columns.str.strip().str.lower()
-    return df.rename(columns={
-        'dbdb': 'name',
-        'ibdb': 'team',
-        'dbstringstyle': 'battingstyle',
-        'boolingstyle': 'bowlingstyle'
-    })
-
-def load_batting_data(filepath):
+    return get_backend(backend).scan(filepath, renames=PLAYER_RENAMES, columns=columns)
+
+def load_batting_data(filepath, backend=None, columns=None):
     """Load and clean batting performance data"""
-    df = pd.read_csv(filepath)
-    df.columns = df.columns.str.strip().str.lower()
-    return df.rename(columns={
-        '45': '4s',
-        '65': '6s',
-        'out/not_out': 'dismissal'
-    })
-
-def load_bowling_data(filepath):
+    return get_backend(backend).scan(filepath, renames=BATTING_RENAMES, columns=columns)
+
+def load_bowling_data(filepath, backend=None, columns=None):
     """Load and clean bowling performance data"""
-    df = pd.read_csv(filepath)
-    df.columns = df.columns.str.strip().str.lower()
-    return df
+    return get_backend(backend).scan(filepath, columns=columns)
 
 # ------------------------------
 # Data Processing (ETL)
 # ------------------------------
 def preprocess_data(matches, players, batting, bowling):
     """Clean, merge and transform all datasets"""
+    backend = backend_of(batting)
+    
     # Clean player names
-    players['name'] = players['name'].str.strip()
-    batting['batsmanname'] = batting['batsmanname'].str.strip()
-    bowling['bowlername'] = bowling['bowlername'].str.strip()
+    players = backend.strip(players, ['name'])
+    batting = backend.strip(batting, ['batsmanname'])
+    bowling = backend.strip(bowling, ['bowlername'])
     
     # Convert numeric fields
-    batting['sr'] = pd.to_numeric(batting['sr'], errors='coerce')
-    bowling['economy'] = pd.to_numeric(bowling['economy'], errors='coerce')
+    batting = backend.to_numeric(batting, ['sr'])
+    bowling = backend.to_numeric(bowling, ['economy'])
     
     # Merge batting data with player info
-    batting_merged = pd.merge(
-        batting,
-        players[['name', 'battingstyle', 'playingrole']],
-        left_on='batsmanname',
-        right_on='name',
-        how='left'
-    ).drop(columns='name')
+    batting_merged = backend.merge_left(
+        batting, players, 'batsmanname', 'name', ['battingstyle', 'playingrole']
+    )
     
     # Merge bowling data with player info
-    bowling_merged = pd.merge(
-        bowling,
-        players[['name', 'bowlingstyle', 'playingrole']],
-        left_on='bowlername',
-        right_on='name',
-        how='left'
-    ).drop(columns='name')
+    bowling_merged = backend.merge_left(
+        bowling, players, 'bowlername', 'name', ['bowlingstyle', 'playingrole']
+    )
     
     return matches, batting_merged, bowling_merged
 
 # ------------------------------
 # Analysis Functions
 # ------------------------------
-def analyze_team_performance(matches):
-    """Calculate and visualize team performance metrics"""
+def _queue_or_render(job, figures):
+    """Queue a figure job for batch rendering, or render it right away"""
+    if figures is not None:
+        figures.append(job)
+    else:
+        print()
+        report_render(render_figures([job], n_jobs=1))
+
+def analyze_team_performance(matches, figures=None):
+    """Calculate and visualize team performance metrics
+
+    If a `figures` list is given the plot job is queued on it for batch
+    rendering; otherwise it is rendered immediately.
+    """
     print("\n=== TEAM PERFORMANCE ANALYSIS ===")
     
     # Calculate win rates for all teams
-    all_teams = pd.concat([matches['team1'], matches['team2']]).unique()
-    results = []
-    
-    for team in all_teams:
-        total = ((matches['team1'] == team) | (matches['team2'] == team)).sum()
-        wins = (matches['winner'] == team).sum()
-        results.append({
-            'Team': team,
-            'Matches': total,
-            'Wins': wins,
-            'WinRate': wins/total if total > 0 else 0
-        })
-    
-    # Create and display results dataframe
-    win_df = pd.DataFrame(results).sort_values('WinRate', ascending=False)
+    win_df = backend_of(matches).team_win_rates(matches)
+    
+    # Display results dataframe
+    win_df = win_df.sort_values('WinRate', ascending=False)
     print(win_df.to_string(index=False))
     
     # Visualize team performance
-    plt.figure(figsize=(12, 6))
-    sns.barplot(data=win_df, x='Team', y='WinRate')
-    plt.title('Team Win Rates')
-    plt.ylabel('Win Rate')
-    plt.xticks(rotation=45)
-    plt.tight_layout()
-    plt.savefig('team_win_rates.png', dpi=300)
-    plt.close()
-    print("\nSaved team_win_rates.png")
-
-def analyze_batting_performance(batting):
+    job = figure_job(
+        'team_win_rates.png', 'bar', win_df[['Team', 'WinRate']].reset_index(drop=True),
+        x='Team', y='WinRate', title='Team Win Rates', ylabel='Win Rate'
+    )
+    _queue_or_render(job, figures)
+    return win_df
+
+def analyze_batting_performance(batting, n_resamples=10000):
     """Analyze and visualize batting statistics"""
     print("\n=== BATTING PERFORMANCE ANALYSIS ===")
     
-    # Top batsmen by strike rate (min 30 runs)
-    qualified = batting.groupby('batsmanname')['runs'].sum() >= 30
-    top_batsmen = batting[batting['batsmanname'].isin(qualified[qualified].index)]
+    backend = backend_of(batting)
+    columns = backend.columns(batting)
     
-    batting_stats = top_batsmen.groupby('batsmanname').agg({
-        'runs': 'sum',
-        'sr': 'mean',
-        '4s': 'sum',
-        '6s': 'sum'
-    }).sort_values('sr', ascending=False)
+    # Top batsmen by strike rate (min 30 runs)
+    batting_stats = backend.group_agg(batting, 'batsmanname', [
+        ('runs', 'sum', 'runs'),
+        ('sr', 'mean', 'sr'),
+        ('4s', 'sum', '4s'),
+        ('6s', 'sum', '6s')
+    ])
+    batting_stats = batting_stats[batting_stats['runs'] >= 30].sort_values('sr', ascending=False)
     
     print("\nTop Batsmen by Strike Rate (min 30 runs):")
     print(batting_stats.head(10).to_string())
+    results = {'batting_stats': batting_stats}
     
     # Left vs Right handed batsmen comparison
-    if 'battingstyle' in batting.columns:
-        left_hand = batting[batting['battingstyle'].str.contains('Left', na=False)]['sr'].dropna()
-        right_hand = batting[batting['battingstyle'].str.contains('Right', na=False)]['sr'].dropna()
+    if 'battingstyle' in columns:
+        left_hand = backend.select(batting, ['sr'], where=('battingstyle', 'contains', 'Left'))['sr'].dropna()
+        right_hand = backend.select(batting, ['sr'], where=('battingstyle', 'contains', 'Right'))['sr'].dropna()
         
         if len(left_hand) > 1 and len(right_hand) > 1:
             t_stat, p_value = ttest_ind(left_hand, right_hand)
@@ -147,20 +144,52 @@ def analyze_batting_performance(batting):
             print(f"Left-handed mean SR: {left_hand.mean():.2f}")
             print(f"Right-handed mean SR: {right_hand.mean():.2f}")
             print(f"T-test p-value: {p_value:.4f}")
+            
+            # Resampling robustness check
+            diff = bootstrap_diff_ci(left_hand, right_hand, n_resamples=n_resamples)
+            perm = permutation_test(left_hand, right_hand, n_resamples=n_resamples)
+            print(f"Bootstrap 95% CI (Left - Right): "
+                  f"[{diff['ci_low']:.2f}, {diff['ci_high']:.2f}]")
+            print(f"Permutation p-value: {perm['p_value']:.4f}")
+            results['handedness'] = {
+                'left_mean_sr': left_hand.mean(),
+                'right_mean_sr': right_hand.mean(),
+                'ttest_p_value': p_value,
+                'bootstrap_diff': diff,
+                'permutation_p_value': perm['p_value']
+            }
+    
+    # Strike rate by playing role vs all other batsmen
+    if 'playingrole' in columns:
+        role_sr = compare_groups(backend.select(batting, ['playingrole', 'sr']),
+                                 'sr', 'playingrole', n_resamples=n_resamples // 2)
+        if not role_sr.empty:
+            print("\nStrike Rate by Playing Role (bootstrap 95% CI vs rest):")
+            print(role_sr.round(3).to_string(index=False))
+        results['role_sr'] = role_sr
+    
+    return results
 
-def analyze_bowling_performance(bowling):
-    """Analyze and visualize bowling statistics"""
+def analyze_bowling_performance(bowling, figures=None, n_resamples=10000, k=20):
+    """Analyze and visualize bowling statistics
+
+    If a `figures` list is given the plot job is queued on it for batch
+    rendering; otherwise it is rendered immediately.
+    """
     print("\n=== BOWLING PERFORMANCE ANALYSIS ===")
     
+    backend = backend_of(bowling)
+    
     # Full economy rate rankings
-    bowling_stats = bowling.groupby('bowlername').agg({
-        'economy': 'mean',
-        'wickets': 'sum',
-        'overs': 'sum'
-    }).sort_values('economy')
+    bowling_stats = backend.group_agg(bowling, 'bowlername', [
+        ('economy', 'mean', 'economy'),
+        ('wickets', 'sum', 'wickets'),
+        ('overs', 'sum', 'overs')
+    ]).sort_values('economy')
     
-    print("\nBowling Economy Rankings (All Bowlers):")
-    print(bowling_stats.to_string())
+    print(f"\nBowling Economy Rankings (Top {min(k, len(bowling_stats))} "
+          f"of {len(bowling_stats)} Bowlers):")
+    print(bowling_stats.head(k).to_string())
     
     # Detailed economy statistics
     economy = bowling_stats['economy']
@@ -170,59 +199,77 @@ def analyze_bowling_performance(bowling):
     print(f"Standard Deviation: {economy.std():.2f}")
     print(f"25th Percentile: {np.percentile(economy, 25):.2f}")
     print(f"75th Percentile: {np.percentile(economy, 75):.2f}")
+    results = {
+        'bowling_stats': bowling_stats,
+        'economy_summary': economy.describe()
+    }
     
-    # Economy distribution visualization
-    plt.figure(figsize=(12, 6))
-    sns.boxplot(x=bowling['economy'], whis=1.5)
-    plt.title('Bowling Economy Rate Distribution')
-    plt.xlabel('Economy Rate')
-    plt.savefig('bowling_economy.png', dpi=300)
-    plt.close()
-    print("\nSaved bowling_economy.png")
+    # Economy distribution visualization (per-innings values)
+    innings = backend.select(bowling, ['wickets', 'economy'])
+    job = figure_job(
+        'bowling_economy.png', 'box', innings[['economy']].reset_index(drop=True),
+        x='economy', title='Bowling Economy Rate Distribution', xlabel='Economy Rate'
+    )
+    _queue_or_render(job, figures)
     
     # Wickets vs Economy correlation
-    if len(bowling) > 1:
-        corr, p_value = spearmanr(bowling['wickets'], bowling['economy'])
+    if len(innings) > 1:
+        corr, p_value = spearmanr(innings['wickets'], innings['economy'])
         print("\nWickets vs Economy Correlation Analysis:")
         print(f"Spearman's rho: {corr:.2f}")
         print(f"P-value: {p_value:.4f}")
+        
+        robust = spearman_resample(innings['wickets'], innings['economy'],
+                                   n_resamples=n_resamples)
+        print(f"Bootstrap 95% CI: [{robust['ci_low']:.2f}, {robust['ci_high']:.2f}]")
+        print(f"Permutation p-value: {robust['p_value']:.4f}")
+        results['wickets_economy_corr'] = dict(robust, spearman_p_value=p_value)
+    
+    return results
 
 # ------------------------------
 # Main Execution
 # ------------------------------
-def main():
+def main(data_dir='.', backend=None):
     print("Starting T20 Cricket Data Analysis Pipeline...")
     
     try:
         # Load data
         print("\n[1/4] Loading data files...")
-        matches = load_match_data('dim_match_summary.csv')
-        players = load_player_data('dim_players_no_images.csv')
-        batting = load_batting_data('fact_batting_summary.csv')
-        bowling = load_bowling_data('fact_bowling_summary.csv')
+        matches = load_match_data(os.path.join(data_dir, 'dim_match_summary.csv'), backend)
+        players = load_player_data(os.path.join(data_dir, 'dim_players_no_images.csv'), backend,
+                                   columns=['name', 'battingstyle', 'bowlingstyle', 'playingrole'])
+        batting = load_batting_data(os.path.join(data_dir, 'fact_batting_summary.csv'), backend)
+        bowling = load_bowling_data(os.path.join(data_dir, 'fact_bowling_summary.csv'), backend)
         
         # Process data
         print("[2/4] Processing and merging data...")
         matches, batting, bowling = preprocess_data(matches, players, batting, bowling)
         
         # Perform analysis
+        figures = []
         print("[3/4] Analyzing team performance...")
-        analyze_team_performance(matches)
+        analyze_team_performance(matches, figures)
         
         print("[4/4] Analyzing player performance...")
         analyze_batting_performance(batting)
-        analyze_bowling_performance(bowling)
+        analyze_bowling_performance(bowling, figures)
+        
+        # Render all queued figures in parallel, skipping unchanged ones
+        print("\nRendering figures...")
+        report_render(render_figures(figures))
         
         print("\nAnalysis completed successfully!")
         print("Visualizations saved to current directory.")
         
     except Exception as e:
-        print(f"\nERROR: {str(e)}")
+        print(f"\nERROR: {type(e).__name__}: {str(e)}")
         print("\nTroubleshooting steps:")
-        print("1. Verify all CSV files exist in working directory")
+        print("1. Verify all CSV files exist in the data directory")
         print("2. Check CSV files have correct column headers")
         print("3. Ensure required packages are installed")
         print("4. Validate data formats in CSV files")
+        raise
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main(sys.argv[1] if len(sys.argv) > 1 else '.')
\ No newline at end of file
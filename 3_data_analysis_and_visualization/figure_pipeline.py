@@ -0,0 +1,277 @@
+# -*- coding: utf-8 -*-
+"""
+Cache-Aware Figure Rendering Pipeline
+- Renders figure jobs in a process pool using the Agg backend
+- Skips figures whose input data hash and plot parameters are unchanged
+- Batch job builders for per-team and per-player charts
+"""
+
+import hashlib
+import json
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from instrumentation import span
+
+MANIFEST_FILE = '.figure_manifest.json'
+DEFAULT_DPI = 300
+
+# ------------------------------
+# Plot Functions
+# ------------------------------
+# Each plotter receives the job data plus its params and draws onto the
+# current pyplot figure; saving and closing is handled by the pipeline.
+
+def plot_bar(data, x, y, title, ylabel=None, xlabel=None, rotation=45, figsize=(12, 6)):
+    """Bar chart (e.g. team win rates)"""
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    plt.figure(figsize=figsize)
+    sns.barplot(data=data, x=x, y=y)
+    plt.title(title)
+    if ylabel:
+        plt.ylabel(ylabel)
+    if xlabel:
+        plt.xlabel(xlabel)
+    plt.xticks(rotation=rotation)
+    plt.tight_layout()
+
+def plot_box(data, x, title, xlabel=None, whis=1.5, figsize=(12, 6)):
+    """Horizontal box plot of one column (e.g. bowling economy)"""
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    plt.figure(figsize=figsize)
+    sns.boxplot(x=data[x], whis=whis)
+    plt.title(title)
+    if xlabel:
+        plt.xlabel(xlabel)
+
+def plot_cluster_panels(data, panels, figsize=(15, 6)):
+    """Side-by-side cluster scatter plots, one panel per dataset"""
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    plt.figure(figsize=figsize)
+    for i, panel in enumerate(panels, start=1):
+        plt.subplot(1, len(panels), i)
+        sns.scatterplot(data=data[panel['data']],
+                        x=panel['x'], y=panel['y'],
+                        hue='cluster', palette=panel.get('palette', 'viridis'), s=100)
+        plt.title(panel['title'], fontsize=14)
+    plt.tight_layout()
+
+def plot_line(data, x, y, title, ylabel=None, xlabel=None, figsize=(10, 4)):
+    """Line chart with markers (e.g. runs per innings for one player)"""
+    import matplotlib.pyplot as plt
+    plt.figure(figsize=figsize)
+    plt.plot(range(len(data)), data[y], marker='o')
+    plt.xticks(range(len(data)), data[x], rotation=45, ha='right')
+    plt.title(title)
+    if ylabel:
+        plt.ylabel(ylabel)
+    if xlabel:
+        plt.xlabel(xlabel)
+    plt.tight_layout()
+
+def plot_stacked_results(data, x, columns, title, figsize=(10, 5)):
+    """Stacked bar chart of result counts (e.g. wins/losses by opponent)"""
+    import matplotlib.pyplot as plt
+    ax = data.set_index(x)[columns].plot(kind='bar', stacked=True, figsize=figsize)
+    ax.set_title(title)
+    ax.set_ylabel('Matches')
+    plt.xticks(rotation=45, ha='right')
+    plt.tight_layout()
+
+PLOTTERS = {
+    'bar': plot_bar,
+    'box': plot_box,
+    'cluster_panels': plot_cluster_panels,
+    'line': plot_line,
+    'stacked_results': plot_stacked_results
+}
+
+# ------------------------------
+# Job Fingerprinting
+# ------------------------------
+def figure_job(filename, plot, data, dpi=DEFAULT_DPI, bbox_inches=None, **params):
+    """Describe one figure: output file, plotter name, input data and params"""
+    if plot not in PLOTTERS:
+        raise ValueError(f"Unknown plot type: {plot}")
+    return {
+        'filename': filename,
+        'plot': plot,
+        'data': data,
+        'params': params,
+        'dpi': dpi,
+        'bbox_inches': bbox_inches
+    }
+
+def _hash_frame(df, digest):
+    """Feed a DataFrame's columns, dtypes and values into a hash"""
+    digest.update(json.dumps([str(c) for c in df.columns]).encode())
+    digest.update(json.dumps([str(t) for t in df.dtypes]).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+
+def job_fingerprint(job):
+    """Stable hash of a job's input data, plotter and parameters"""
+    digest = hashlib.sha256()
+    data = job['data']
+    if isinstance(data, dict):
+        for key in sorted(data):
+            digest.update(str(key).encode())
+            _hash_frame(data[key], digest)
+    else:
+        _hash_frame(data, digest)
+    digest.update(json.dumps({
+        'plot': job['plot'],
+        'params': job['params'],
+        'dpi': job['dpi'],
+        'bbox_inches': job['bbox_inches']
+    }, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+def _load_manifest(output_dir):
+    path = os.path.join(output_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _save_manifest(output_dir, manifest):
+    path = os.path.join(output_dir, MANIFEST_FILE)
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+# ------------------------------
+# Rendering
+# ------------------------------
+def _render_job(job, output_dir):
+    """Render one job to disk with the Agg backend (runs in worker processes)"""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    path = os.path.join(output_dir, job['filename'])
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    root, ext = os.path.splitext(path)
+    tmp = f"{root}.tmp{ext}"
+    try:
+        PLOTTERS[job['plot']](job['data'], **job['params'])
+        plt.savefig(tmp, dpi=job['dpi'], bbox_inches=job['bbox_inches'])
+    finally:
+        plt.close('all')
+    os.replace(tmp, path)
+    return job['filename']
+
+def render_figures(jobs, output_dir='.', n_jobs=None, force=False):
+    """Render figure jobs, skipping those whose fingerprint is unchanged
+
+    Returns a dict with the lists of 'rendered' and 'skipped' filenames.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = _load_manifest(output_dir)
+
+    pending = []
+    skipped = []
+    for job in jobs:
+        key = job_fingerprint(job)
+        path = os.path.join(output_dir, job['filename'])
+        if not force and manifest.get(job['filename']) == key and os.path.exists(path):
+            skipped.append(job['filename'])
+        else:
+            pending.append((job, key))
+
+    if n_jobs is None:
+        n_jobs = os.cpu_count() or 1
+    n_jobs = max(1, min(n_jobs, len(pending)))
+
+    rendered = []
+    with span('render', figures=len(pending), skipped=len(skipped), workers=n_jobs):
+        if n_jobs == 1:
+            for job, key in pending:
+                rendered.append(_render_job(job, output_dir))
+                manifest[job['filename']] = key
+        elif pending:
+            with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+                futures = [(pool.submit(_render_job, job, output_dir), job, key)
+                           for job, key in pending]
+                for future, job, key in futures:
+                    rendered.append(future.result())
+                    manifest[job['filename']] = key
+
+    if rendered:
+        _save_manifest(output_dir, manifest)
+    return {'rendered': rendered, 'skipped': skipped}
+
+def _name_list(names, limit):
+    shown = ', '.join(names[:limit])
+    return shown + (f" and {len(names) - limit} more" if len(names) > limit else '')
+
+def report_render(result, limit=10):
+    """Print a short summary of a render_figures result (at most `limit` names per line)"""
+    rendered = result['rendered']
+    if len(rendered) > limit:
+        print(f"Saved {len(rendered)} figures: {_name_list(rendered, limit)}")
+    else:
+        for name in rendered:
+            print(f"Saved {name}")
+    if result['skipped']:
+        print(f"Unchanged, skipped: {_name_list(result['skipped'], limit)}")
+
+# ------------------------------
+# Batch Job Builders
+# ------------------------------
+def _slug(text):
+    return re.sub(r'[^A-Za-z0-9]+', '_', str(text)).strip('_').lower()
+
+def team_chart_jobs(matches, teams=None, subdir='teams', dpi=150):
+    """One wins/losses-by-opponent chart per team"""
+    home = matches[['team1', 'team2', 'winner']].rename(
+        columns={'team1': 'team', 'team2': 'opponent'})
+    away = matches[['team2', 'team1', 'winner']].rename(
+        columns={'team2': 'team', 'team1': 'opponent'})
+    games = pd.concat([home, away], ignore_index=True)
+    games['Won'] = (games['winner'] == games['team']).astype(int)
+    games['Lost'] = (games['winner'] == games['opponent']).astype(int)
+    games['No Result'] = 1 - games['Won'] - games['Lost']
+    summary = games.groupby(['team', 'opponent'])[['Won', 'Lost', 'No Result']].sum()
+
+    jobs = []
+    for team in (teams if teams is not None else summary.index.get_level_values(0).unique()):
+        if team not in summary.index.get_level_values(0):
+            continue
+        data = summary.loc[team].reset_index()
+        jobs.append(figure_job(
+            os.path.join(subdir, f"{_slug(team)}.png"), 'stacked_results', data,
+            dpi=dpi, x='opponent', columns=['Won', 'Lost', 'No Result'],
+            title=f"{team} Results by Opponent"
+        ))
+    return jobs
+
+def player_chart_jobs(batting, players=None, min_innings=2, subdir='players', dpi=150):
+    """One runs-per-innings chart per batsman"""
+    innings = batting[['batsmanname', 'match', 'runs']].copy()
+    innings['runs'] = pd.to_numeric(innings['runs'], errors='coerce')
+    counts = innings.groupby('batsmanname').size()
+    names = counts[counts >= min_innings].index
+    if players is not None:
+        names = [n for n in players if n in set(names)]
+
+    jobs = []
+    for name, data in innings[innings['batsmanname'].isin(names)].groupby('batsmanname'):
+        jobs.append(figure_job(
+            os.path.join(subdir, f"{_slug(name)}.png"), 'line',
+            data[['match', 'runs']].reset_index(drop=True),
+            dpi=dpi, x='match', y='runs', title=f"{name} - Runs per Innings",
+            ylabel='Runs'
+        ))
+    return jobs
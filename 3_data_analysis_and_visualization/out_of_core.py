@@ -0,0 +1,304 @@
+# -*- coding: utf-8 -*-
+"""
+Out-of-Core Aggregation for Large Fact Tables
+- Streams fact_batting_summary / fact_bowling_summary in chunks (CSV or Parquet)
+- Merges partial aggregates (sums, counts, sums of squares) per player
+- Mergeable quantile sketches for per-innings distributions
+- Reports top-K tables instead of full dumps
+
+Only the per-player aggregate (one row per player) is held in memory, so
+memory use is bounded by the number of players, not the number of innings.
+"""
+
+import math
+import os
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+from scipy.stats import ttest_ind_from_stats
+
+from backends import get_backend
+
+DEFAULT_CHUNKSIZE = 250_000
+
+# ------------------------------
+# Chunked Readers
+# ------------------------------
+def iter_chunks(path, chunksize=DEFAULT_CHUNKSIZE, renames=None, columns=None):
+    """Yield cleaned-header pandas chunks of a CSV or Parquet file"""
+    renames = renames or {}
+    normalize = lambda c: renames.get(str(c).strip().lower(), str(c).strip().lower())
+    wanted = set(columns) if columns is not None else None
+
+    if path.endswith('.parquet'):
+        import pyarrow.parquet as pq
+        source = pq.ParquetFile(path)
+        keep = [c for c in source.schema_arrow.names if wanted is None or normalize(c) in wanted]
+        batches = (b.to_pandas() for b in source.iter_batches(batch_size=chunksize, columns=keep))
+    else:
+        usecols = (lambda c: normalize(c) in wanted) if wanted is not None else None
+        batches = pd.read_csv(path, chunksize=chunksize, usecols=usecols)
+
+    for chunk in batches:
+        chunk.columns = [normalize(c) for c in chunk.columns]
+        yield chunk
+
+# ------------------------------
+# Mergeable Aggregates
+# ------------------------------
+def partial_aggregate(chunk, key, sums=(), moments=()):
+    """Per-key sums and counts for one chunk
+
+    `sums` columns get <col>_sum; `moments` columns also get <col>_count and
+    <col>_sumsq so means and variances can be recovered after merging.
+    """
+    chunk = chunk[chunk[key].notna()]
+    spec = {}
+    for col in sums:
+        spec[f'{col}_sum'] = (col, 'sum')
+    for col in moments:
+        chunk = chunk.assign(**{f'{col}__sq': chunk[col] ** 2})
+        spec[f'{col}_sum'] = (col, 'sum')
+        spec[f'{col}_count'] = (col, 'count')
+        spec[f'{col}_sumsq'] = (f'{col}__sq', 'sum')
+    spec['rows'] = (key, 'size')
+    return chunk.groupby(key).agg(**spec)
+
+def merge_partials(running, partial):
+    """Combine two partial aggregates (sums and counts add)"""
+    if running is None:
+        return partial
+    return running.add(partial, fill_value=0)
+
+def finalize(aggregate, moments=()):
+    """Turn merged sums into means and sample variances"""
+    result = aggregate.copy()
+    # Aligning partials introduces floats; restore integer sums and counts
+    for col in result.columns:
+        values = result[col]
+        if values.notna().all() and (values % 1 == 0).all():
+            result[col] = values.astype('int64')
+    for col in moments:
+        n = result[f'{col}_count']
+        mean = result[f'{col}_sum'] / n.where(n > 0)
+        result[f'{col}_mean'] = mean
+        result[f'{col}_var'] = ((result[f'{col}_sumsq'] - n * mean ** 2) /
+                                (n - 1).where(n > 1))
+    return result.sort_index()
+
+class QuantileSketch:
+    """Mergeable quantile sketch with relative accuracy (DDSketch-style)
+
+    Values are counted in logarithmic buckets so every quantile estimate is
+    within `relative_accuracy` of a true sample value. Sketches built on
+    separate chunks combine exactly with merge().
+    """
+
+    def __init__(self, relative_accuracy=0.01, min_value=1e-9):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.min_value = min_value
+        self.positive = Counter()
+        self.negative = Counter()
+        self.zero_count = 0
+        self.count = 0
+
+    def _indices(self, values):
+        return np.ceil(np.log(values) / self.log_gamma).astype(np.int64)
+
+    def add(self, values):
+        values = np.asarray(pd.to_numeric(pd.Series(values), errors='coerce'), dtype=float)
+        values = values[np.isfinite(values)]
+        self.count += len(values)
+        small = np.abs(values) <= self.min_value
+        self.zero_count += int(small.sum())
+        for store, part in ((self.positive, values[~small & (values > 0)]),
+                            (self.negative, -values[~small & (values < 0)])):
+            if len(part):
+                idx, counts = np.unique(self._indices(part), return_counts=True)
+                store.update(dict(zip(idx.tolist(), counts.tolist())))
+        return self
+
+    def merge(self, other):
+        if abs(other.gamma - self.gamma) > 1e-12:
+            raise ValueError("Cannot merge sketches with different accuracy")
+        self.positive.update(other.positive)
+        self.negative.update(other.negative)
+        self.zero_count += other.zero_count
+        self.count += other.count
+        return self
+
+    def _value(self, index):
+        return 2 * self.gamma ** index / (self.gamma + 1)
+
+    def quantile(self, q):
+        if self.count == 0:
+            return np.nan
+        rank = q * (self.count - 1)
+        seen = 0
+        for index in sorted(self.negative, reverse=True):
+            seen += self.negative[index]
+            if seen > rank:
+                return -self._value(index)
+        seen += self.zero_count
+        if seen > rank:
+            return 0.0
+        for index in sorted(self.positive):
+            seen += self.positive[index]
+            if seen > rank:
+                return self._value(index)
+        return self._value(max(self.positive)) if self.positive else 0.0
+
+    def summary(self, quantiles=(0.25, 0.5, 0.75)):
+        return {f'p{int(q * 100)}': self.quantile(q) for q in quantiles}
+
+def top_k(stats, column, k=10, ascending=False):
+    """Top-K rows by a column (ascending=True for lowest values first)"""
+    if ascending:
+        return stats.nsmallest(k, column)
+    return stats.nlargest(k, column)
+
+# ------------------------------
+# Streaming Analyses
+# ------------------------------
+def _style_map(players_path, column):
+    """Name -> style lookup from the (small) player dimension"""
+    if players_path is None or not os.path.exists(players_path):
+        return None
+    players = get_backend('pandas').scan(players_path, columns=['name', column])
+    players['name'] = players['name'].str.strip()
+    return players.drop_duplicates('name').set_index('name')[column]
+
+def stream_batting(path, players_path=None, chunksize=DEFAULT_CHUNKSIZE):
+    """Stream the batting fact table into per-batsman and per-hand aggregates"""
+    backend = get_backend('pandas')
+    styles = _style_map(players_path, 'battingstyle')
+
+    per_player = None
+    per_hand = None
+    sr_sketch = QuantileSketch()
+    rows = 0
+    for chunk in iter_chunks(path, chunksize, renames={'45': '4s', '65': '6s'},
+                             columns=['batsmanname', 'runs', 'sr', '4s', '6s']):
+        rows += len(chunk)
+        backend.strip(chunk, ['batsmanname'])
+        backend.to_numeric(chunk, ['runs', 'sr', '4s', '6s'])
+        per_player = merge_partials(per_player, partial_aggregate(
+            chunk, 'batsmanname', sums=['runs', '4s', '6s'], moments=['sr']))
+        sr_sketch.add(chunk['sr'])
+
+        if styles is not None:
+            style = chunk['batsmanname'].map(styles).fillna('')
+            hand = np.select([style.str.contains('Left'), style.str.contains('Right')],
+                             ['Left', 'Right'], default='')
+            chunk = chunk.assign(hand=hand)
+            per_hand = merge_partials(per_hand, partial_aggregate(
+                chunk[chunk['hand'] != ''], 'hand', moments=['sr']))
+
+    return {
+        'rows': rows,
+        'per_player': finalize(per_player, moments=['sr']) if per_player is not None else None,
+        'per_hand': finalize(per_hand, moments=['sr']) if per_hand is not None else None,
+        'sr_sketch': sr_sketch
+    }
+
+def stream_bowling(path, chunksize=DEFAULT_CHUNKSIZE):
+    """Stream the bowling fact table into per-bowler aggregates"""
+    backend = get_backend('pandas')
+    per_player = None
+    economy_sketch = QuantileSketch()
+    rows = 0
+    for chunk in iter_chunks(path, chunksize,
+                             columns=['bowlername', 'economy', 'wickets', 'overs']):
+        rows += len(chunk)
+        backend.strip(chunk, ['bowlername'])
+        backend.to_numeric(chunk, ['economy', 'wickets', 'overs'])
+        per_player = merge_partials(per_player, partial_aggregate(
+            chunk, 'bowlername', sums=['wickets', 'overs'], moments=['economy']))
+        economy_sketch.add(chunk['economy'])
+
+    return {
+        'rows': rows,
+        'per_player': finalize(per_player, moments=['economy']) if per_player is not None else None,
+        'economy_sketch': economy_sketch
+    }
+
+def analyze_batting_out_of_core(path, players_path=None, chunksize=DEFAULT_CHUNKSIZE,
+                                k=10, min_runs=30):
+    """Chunked counterpart of cricket_analysis_2.analyze_batting_performance"""
+    print("\n=== BATTING PERFORMANCE ANALYSIS (chunked) ===")
+    streamed = stream_batting(path, players_path, chunksize)
+    agg = streamed['per_player']
+    print(f"Streamed {streamed['rows']:,} innings for {len(agg):,} batsmen")
+
+    stats = pd.DataFrame({
+        'runs': agg['runs_sum'],
+        'sr': agg['sr_mean'],
+        '4s': agg['4s_sum'],
+        '6s': agg['6s_sum']
+    })
+    qualified = stats[stats['runs'] >= min_runs]
+    print(f"\nTop {k} Batsmen by Strike Rate (min {min_runs} runs):")
+    print(top_k(qualified, 'sr', k).to_string())
+
+    sketch = streamed['sr_sketch'].summary()
+    print("\nPer-Innings Strike Rate Quantiles (sketch):")
+    print(", ".join(f"{name}: {value:.2f}" for name, value in sketch.items()))
+
+    results = {'batting_stats': stats, 'sr_quantiles': sketch}
+    hands = streamed['per_hand']
+    if hands is not None and {'Left', 'Right'} <= set(hands.index):
+        left, right = hands.loc['Left'], hands.loc['Right']
+        if left['sr_count'] > 1 and right['sr_count'] > 1:
+            _, p_value = ttest_ind_from_stats(
+                left['sr_mean'], math.sqrt(left['sr_var']), left['sr_count'],
+                right['sr_mean'], math.sqrt(right['sr_var']), right['sr_count']
+            )
+            print("\nLeft vs Right Handed Batting SR Comparison:")
+            print(f"Left-handed mean SR: {left['sr_mean']:.2f}")
+            print(f"Right-handed mean SR: {right['sr_mean']:.2f}")
+            print(f"T-test p-value: {p_value:.4f}")
+            results['handedness'] = {
+                'left_mean_sr': left['sr_mean'],
+                'right_mean_sr': right['sr_mean'],
+                'ttest_p_value': p_value
+            }
+    return results
+
+def analyze_bowling_out_of_core(path, chunksize=DEFAULT_CHUNKSIZE, k=10):
+    """Chunked counterpart of cricket_analysis_2.analyze_bowling_performance"""
+    print("\n=== BOWLING PERFORMANCE ANALYSIS (chunked) ===")
+    streamed = stream_bowling(path, chunksize)
+    agg = streamed['per_player']
+    print(f"Streamed {streamed['rows']:,} spells for {len(agg):,} bowlers")
+
+    stats = pd.DataFrame({
+        'economy': agg['economy_mean'],
+        'wickets': agg['wickets_sum'],
+        'overs': agg['overs_sum']
+    })
+    print(f"\nMost Economical {k} Bowlers:")
+    print(top_k(stats, 'economy', k, ascending=True).to_string())
+    print(f"\nTop {k} Wicket Takers:")
+    print(top_k(stats, 'wickets', k).to_string())
+
+    # Per-bowler means fit in memory, so these statistics are exact
+    economy = stats['economy'].dropna()
+    print("\nEconomy Rate Statistics:")
+    print(f"Mean: {economy.mean():.2f}")
+    print(f"Median: {economy.median():.2f}")
+    print(f"Standard Deviation: {economy.std():.2f}")
+    print(f"25th Percentile: {np.percentile(economy, 25):.2f}")
+    print(f"75th Percentile: {np.percentile(economy, 75):.2f}")
+
+    sketch = streamed['economy_sketch'].summary()
+    print("\nPer-Spell Economy Quantiles (sketch):")
+    print(", ".join(f"{name}: {value:.2f}" for name, value in sketch.items()))
+
+    return {
+        'bowling_stats': stats,
+        'economy_summary': economy.describe(),
+        'economy_quantiles': sketch
+    }
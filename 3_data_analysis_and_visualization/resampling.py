@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+"""
+Vectorized Resampling Utilities
+- Bootstrap confidence intervals computed as batched NumPy array operations
+- Permutation tests for two-group comparisons and rank correlation
+- Optional process-pool parallelism for very large resample counts
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy.stats import rankdata
+
+# Upper bound on the number of cells (resamples x observations) held in
+# memory at once; larger jobs are processed in batches of this size.
+MAX_BATCH_CELLS = 4_000_000
+
+# ------------------------------
+# Batched Statistic Kernels
+# ------------------------------
+def _row_stat(samples, stat):
+    """Apply a statistic to every row of a 2-D resample matrix"""
+    if stat == 'mean':
+        return samples.mean(axis=1)
+    if stat == 'median':
+        return np.median(samples, axis=1)
+    if stat == 'std':
+        return samples.std(axis=1, ddof=1)
+    raise ValueError(f"Unsupported statistic: {stat}")
+
+def _row_pearson(x, y):
+    """Row-wise Pearson correlation of two 2-D arrays"""
+    x = x - x.mean(axis=1, keepdims=True)
+    y = y - y.mean(axis=1, keepdims=True)
+    num = (x * y).sum(axis=1)
+    den = np.sqrt((x * x).sum(axis=1) * (y * y).sum(axis=1))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return num / den
+
+def _batch_sizes(n_resamples, n_obs):
+    """Split a resample count into batches that respect MAX_BATCH_CELLS"""
+    per_batch = max(1, MAX_BATCH_CELLS // max(n_obs, 1))
+    sizes = [per_batch] * (n_resamples // per_batch)
+    if n_resamples % per_batch:
+        sizes.append(n_resamples % per_batch)
+    return sizes
+
+# ------------------------------
+# Worker Functions (module level so they can be pickled)
+# ------------------------------
+def _bootstrap_diff_worker(a, b, stat, n_resamples, seed):
+    """Bootstrap distribution of stat(a) - stat(b)"""
+    rng = np.random.default_rng(seed)
+    out = []
+    for size in _batch_sizes(n_resamples, len(a) + len(b)):
+        idx_a = rng.integers(0, len(a), size=(size, len(a)))
+        idx_b = rng.integers(0, len(b), size=(size, len(b)))
+        out.append(_row_stat(a[idx_a], stat) - _row_stat(b[idx_b], stat))
+    return np.concatenate(out)
+
+def _bootstrap_stat_worker(a, stat, n_resamples, seed):
+    """Bootstrap distribution of stat(a)"""
+    rng = np.random.default_rng(seed)
+    out = []
+    for size in _batch_sizes(n_resamples, len(a)):
+        idx = rng.integers(0, len(a), size=(size, len(a)))
+        out.append(_row_stat(a[idx], stat))
+    return np.concatenate(out)
+
+def _permutation_diff_worker(a, b, stat, n_resamples, seed):
+    """Null distribution of stat(a) - stat(b) under random group labels"""
+    rng = np.random.default_rng(seed)
+    pooled = np.concatenate([a, b])
+    n_a = len(a)
+    out = []
+    for size in _batch_sizes(n_resamples, len(pooled)):
+        shuffled = rng.permuted(np.broadcast_to(pooled, (size, len(pooled))), axis=1)
+        out.append(_row_stat(shuffled[:, :n_a], stat) - _row_stat(shuffled[:, n_a:], stat))
+    return np.concatenate(out)
+
+def _bootstrap_spearman_worker(x, y, n_resamples, seed):
+    """Bootstrap distribution of Spearman's rho over resampled pairs"""
+    rng = np.random.default_rng(seed)
+    out = []
+    for size in _batch_sizes(n_resamples, 2 * len(x)):
+        idx = rng.integers(0, len(x), size=(size, len(x)))
+        out.append(_row_pearson(rankdata(x[idx], axis=1), rankdata(y[idx], axis=1)))
+    return np.concatenate(out)
+
+def _permutation_spearman_worker(rx, ry, n_resamples, seed):
+    """Null distribution of Spearman's rho; ranks are fixed under permutation"""
+    rng = np.random.default_rng(seed)
+    out = []
+    for size in _batch_sizes(n_resamples, len(rx)):
+        shuffled = rng.permuted(np.broadcast_to(ry, (size, len(ry))), axis=1)
+        out.append(_row_pearson(np.broadcast_to(rx, shuffled.shape), shuffled))
+    return np.concatenate(out)
+
+# ------------------------------
+# Parallel Dispatch
+# ------------------------------
+def _run(worker, args, n_resamples, seed, n_jobs):
+    """Run a worker serially or split across a process pool"""
+    if n_jobs is None or n_jobs < 0:
+        n_jobs = os.cpu_count() or 1
+    n_jobs = max(1, min(n_jobs, n_resamples))
+
+    seeds = np.random.SeedSequence(seed).spawn(n_jobs)
+    counts = [n_resamples // n_jobs + (i < n_resamples % n_jobs) for i in range(n_jobs)]
+
+    if n_jobs == 1:
+        return worker(*args, counts[0], seeds[0])
+
+    with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+        futures = [pool.submit(worker, *args, count, s) for count, s in zip(counts, seeds)]
+        return np.concatenate([f.result() for f in futures])
+
+def _clean(values):
+    """Convert to a float array and drop missing values"""
+    values = np.asarray(pd.to_numeric(pd.Series(values), errors='coerce'), dtype=float)
+    return values[~np.isnan(values)]
+
+def _interval(dist, ci):
+    """Percentile confidence interval of a resampled distribution"""
+    alpha = (1 - ci) / 2
+    low, high = np.nanpercentile(dist, [100 * alpha, 100 * (1 - alpha)])
+    return float(low), float(high)
+
+def _p_value(null, observed):
+    """Two-sided permutation p-value with the +1 correction"""
+    extreme = np.sum(np.abs(null) >= abs(observed) - 1e-12)
+    return (extreme + 1) / (len(null) + 1)
+
+# ------------------------------
+# Public API
+# ------------------------------
+def bootstrap_ci(values, stat='mean', n_resamples=10000, ci=0.95, seed=42, n_jobs=1):
+    """Bootstrap confidence interval for a single-sample statistic"""
+    a = _clean(values)
+    if len(a) < 2:
+        return {'estimate': np.nan, 'ci_low': np.nan, 'ci_high': np.nan, 'n': len(a)}
+    dist = _run(_bootstrap_stat_worker, (a, stat), n_resamples, seed, n_jobs)
+    low, high = _interval(dist, ci)
+    return {
+        'estimate': float(_row_stat(a[None, :], stat)[0]),
+        'ci_low': low,
+        'ci_high': high,
+        'n': len(a)
+    }
+
+def bootstrap_diff_ci(group_a, group_b, stat='mean', n_resamples=10000,
+                      ci=0.95, seed=42, n_jobs=1):
+    """Bootstrap confidence interval for stat(group_a) - stat(group_b)"""
+    a, b = _clean(group_a), _clean(group_b)
+    if len(a) < 2 or len(b) < 2:
+        return {'estimate': np.nan, 'ci_low': np.nan, 'ci_high': np.nan,
+                'n_a': len(a), 'n_b': len(b)}
+    dist = _run(_bootstrap_diff_worker, (a, b, stat), n_resamples, seed, n_jobs)
+    low, high = _interval(dist, ci)
+    observed = _row_stat(a[None, :], stat)[0] - _row_stat(b[None, :], stat)[0]
+    return {
+        'estimate': float(observed),
+        'ci_low': low,
+        'ci_high': high,
+        'n_a': len(a),
+        'n_b': len(b)
+    }
+
+def permutation_test(group_a, group_b, stat='mean', n_resamples=10000, seed=42, n_jobs=1):
+    """Two-sided permutation test for a difference in a group statistic"""
+    a, b = _clean(group_a), _clean(group_b)
+    if len(a) < 2 or len(b) < 2:
+        return {'observed': np.nan, 'p_value': np.nan}
+    observed = _row_stat(a[None, :], stat)[0] - _row_stat(b[None, :], stat)[0]
+    null = _run(_permutation_diff_worker, (a, b, stat), n_resamples, seed, n_jobs)
+    return {'observed': float(observed), 'p_value': float(_p_value(null, observed))}
+
+def spearman_resample(x, y, n_resamples=10000, ci=0.95, seed=42, n_jobs=1):
+    """Spearman's rho with a bootstrap interval and a permutation p-value"""
+    pairs = pd.DataFrame({
+        'x': pd.to_numeric(pd.Series(x).reset_index(drop=True), errors='coerce'),
+        'y': pd.to_numeric(pd.Series(y).reset_index(drop=True), errors='coerce')
+    }).dropna()
+    if len(pairs) < 3:
+        return {'rho': np.nan, 'ci_low': np.nan, 'ci_high': np.nan, 'p_value': np.nan}
+
+    x, y = pairs['x'].to_numpy(float), pairs['y'].to_numpy(float)
+    rx, ry = rankdata(x), rankdata(y)
+    rho = float(_row_pearson(rx[None, :], ry[None, :])[0])
+
+    boot = _run(_bootstrap_spearman_worker, (x, y), n_resamples, seed, n_jobs)
+    null = _run(_permutation_spearman_worker, (rx, ry), n_resamples, seed, n_jobs)
+    low, high = _interval(boot, ci)
+    return {'rho': rho, 'ci_low': low, 'ci_high': high,
+            'p_value': float(_p_value(null, rho))}
+
+def compare_groups(df, value_col, group_col, stat='mean', n_resamples=5000,
+                   ci=0.95, seed=42, n_jobs=1, min_size=5):
+    """Compare each group against all other rows (e.g. by role, team or style)"""
+    data = df[[group_col, value_col]].copy()
+    data[value_col] = pd.to_numeric(data[value_col], errors='coerce')
+    data = data.dropna()
+
+    results = []
+    for group, mask in data.groupby(group_col).groups.items():
+        inside = data.loc[mask, value_col]
+        outside = data.loc[data.index.difference(mask), value_col]
+        if len(inside) < min_size or len(outside) < min_size:
+            continue
+        diff = bootstrap_diff_ci(inside, outside, stat, n_resamples, ci, seed, n_jobs)
+        perm = permutation_test(inside, outside, stat, n_resamples, seed, n_jobs)
+        results.append({
+            group_col: group,
+            'n': len(inside),
+            stat: _row_stat(inside.to_numpy(float)[None, :], stat)[0],
+            'diff_vs_rest': diff['estimate'],
+            'ci_low': diff['ci_low'],
+            'ci_high': diff['ci_high'],
+            'p_value': perm['p_value']
+        })
+
+    if not results:
+        return pd.DataFrame(columns=[group_col, 'n', stat, 'diff_vs_rest',
+                                     'ci_low', 'ci_high', 'p_value'])
+    return pd.DataFrame(results).sort_values('diff_vs_rest', ascending=False)
@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+"""
+Clustering Model Selection
+- Sweeps the number of clusters in parallel on a fixed feature set; feature
+  subsets can be scored alongside for comparison
+- Scores candidates with silhouette and Davies-Bouldin (sampled on large inputs)
+- Switches to MiniBatchKMeans above a size threshold
+- Returns the chosen model with a timing and quality report
+
+Usage:
+    python cluster_selection.py --synthetic 300000
+"""
+
+import argparse
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from sklearn.cluster import KMeans, MiniBatchKMeans
+from sklearn.metrics import davies_bouldin_score, silhouette_score
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+# Inputs with more rows than this are clustered with MiniBatchKMeans
+MINIBATCH_THRESHOLD = 50_000
+
+# Rows used to estimate the quality scores (silhouette is O(n^2))
+SCORE_SAMPLE_SIZE = 5_000
+
+# ------------------------------
+# Candidate Scoring
+# ------------------------------
+_shared = {}
+
+def _init_worker(X, sample_idx):
+    """Hold the scaled matrix in each worker instead of pickling it per task"""
+    _shared['X'] = X
+    _shared['sample_idx'] = sample_idx
+
+def make_kmeans(k, n_rows, seed=42, minibatch_threshold=MINIBATCH_THRESHOLD):
+    """KMeans for small inputs, MiniBatchKMeans for large ones"""
+    if n_rows > minibatch_threshold:
+        return MiniBatchKMeans(n_clusters=k, batch_size=4096, n_init=3, random_state=seed)
+    return KMeans(n_clusters=k, n_init=10, random_state=seed)
+
+def _score_candidate(columns, k, seed, minibatch_threshold):
+    """Fit one (feature subset, k) candidate and score it on the sample"""
+    X = _shared['X'][:, columns]
+    sample_idx = _shared['sample_idx']
+
+    start = time.perf_counter()
+    model = make_kmeans(k, len(X), seed, minibatch_threshold)
+    labels = model.fit_predict(X)
+    fit_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    sample_X = X[sample_idx] if sample_idx is not None else X
+    sample_labels = labels[sample_idx] if sample_idx is not None else labels
+    if len(np.unique(sample_labels)) < 2:
+        silhouette, davies_bouldin = np.nan, np.nan
+    else:
+        silhouette = silhouette_score(sample_X, sample_labels)
+        davies_bouldin = davies_bouldin_score(sample_X, sample_labels)
+    score_time = time.perf_counter() - start
+
+    return {
+        'k': k,
+        'inertia': float(model.inertia_),
+        'silhouette': float(silhouette),
+        'davies_bouldin': float(davies_bouldin),
+        'fit_s': fit_time,
+        'score_s': score_time,
+        'algorithm': type(model).__name__
+    }
+
+def candidate_grid(features, k_range, min_features=None):
+    """Every feature subset of at least `min_features` (default: all features) crossed with every k"""
+    if min_features is None:
+        min_features = len(features)
+    subsets = [
+        list(combo)
+        for size in range(min(min_features, len(features)), len(features) + 1)
+        for combo in itertools.combinations(features, size)
+    ]
+    return [(subset, k) for subset in subsets for k in k_range]
+
+# ------------------------------
+# Selection
+# ------------------------------
+def select_clusters(frame, features, k_range=range(2, 9), min_features=None, n_jobs=None,
+                    sample_size=SCORE_SAMPLE_SIZE, minibatch_threshold=MINIBATCH_THRESHOLD,
+                    seed=42):
+    """Choose the number of clusters and feature subset for a table
+
+    The model always uses all of `features`; candidates on that set are
+    ranked by silhouette (higher is better), then by Davies-Bouldin (lower is
+    better), then by fewer clusters. Scores are not comparable across feature
+    sets of different sizes, so subsets (swept when `min_features` is below
+    the number of features) are only reported, ranked after the full set.
+    Rows with missing features are ignored.
+
+    Returns a dict with the fitted `model` (scaler + clusterer), the
+    `features` and `k` chosen, cluster `labels` aligned with the complete
+    rows of `frame`, the per-candidate `report` and the `total_s` runtime.
+    """
+    total_start = time.perf_counter()
+    data = frame[features].dropna()
+    k_range = [k for k in k_range if 2 <= k < len(data)]
+    if not k_range:
+        raise ValueError(f"Not enough complete rows ({len(data)}) to cluster")
+
+    # Scaling is per column, so scaling once covers every feature subset
+    X = StandardScaler().fit_transform(data.to_numpy(dtype=float))
+    rng = np.random.default_rng(seed)
+    sample_idx = (np.sort(rng.choice(len(X), sample_size, replace=False))
+                  if len(X) > sample_size else None)
+
+    grid = candidate_grid(features, k_range, min_features)
+    col_index = {name: i for i, name in enumerate(features)}
+    tasks = [([col_index[c] for c in subset], k) for subset, k in grid]
+
+    if n_jobs is None or n_jobs < 0:
+        n_jobs = os.cpu_count() or 1
+    n_jobs = max(1, min(n_jobs, len(tasks)))
+    if n_jobs == 1:
+        _init_worker(X, sample_idx)
+        rows = [_score_candidate(cols, k, seed, minibatch_threshold) for cols, k in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker,
+                                 initargs=(X, sample_idx)) as pool:
+            futures = [pool.submit(_score_candidate, cols, k, seed, minibatch_threshold)
+                       for cols, k in tasks]
+            rows = [f.result() for f in futures]
+    _shared.clear()
+
+    report = pd.DataFrame(rows)
+    report.insert(0, 'features', [', '.join(subset) for subset, _ in grid])
+    report['silhouette'] = report['silhouette'].round(4)
+    report['full_set'] = [len(subset) == len(features) for subset, _ in grid]
+    report = report.sort_values(['full_set', 'silhouette', 'davies_bouldin', 'k'],
+                                ascending=[False, False, True, True],
+                                na_position='last').reset_index(drop=True)
+
+    chosen = list(features)
+    k = int(report.iloc[0]['k'])
+
+    # Refit the winner as a reusable pipeline on the unscaled features
+    model = Pipeline([
+        ('scaler', StandardScaler()),
+        ('cluster', make_kmeans(k, len(data), seed, minibatch_threshold))
+    ])
+    labels = pd.Series(model.fit_predict(data[chosen].to_numpy(dtype=float)),
+                       index=data.index, name='cluster')
+
+    return {
+        'model': model,
+        'features': chosen,
+        'k': k,
+        'labels': labels,
+        'report': report,
+        'n_rows': len(data),
+        'sampled': sample_idx is not None,
+        'total_s': time.perf_counter() - total_start
+    }
+
+def report_selection(result, title, top=5):
+    """Print the chosen model and the best-ranked candidates"""
+    report = result['report']
+    print(f"\n{title} model selection: {len(report)} candidates on "
+          f"{result['n_rows']:,} rows in {result['total_s']:.2f}s"
+          f"{' (scores sampled)' if result['sampled'] else ''}")
+    print(f"Chosen: k={result['k']} on [{', '.join(result['features'])}] "
+          f"({report.iloc[0]['algorithm']})")
+    print(report.head(top)[['features', 'k', 'silhouette', 'davies_bouldin',
+                            'fit_s', 'score_s']].round(3).to_string(index=False))
+
+# ------------------------------
+# Scale Check
+# ------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time cluster selection on synthetic data")
+    parser.add_argument('--synthetic', type=int, default=300_000, help="Rows to generate")
+    parser.add_argument('--max-k', type=int, default=8)
+    parser.add_argument('--n-jobs', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    centers = rng.normal(0, 5, size=(4, 3))
+    labels = rng.integers(0, 4, args.synthetic)
+    frame = pd.DataFrame(centers[labels] + rng.normal(0, 1, (args.synthetic, 3)),
+                         columns=['strike_rate', 'avg_runs', 'sixes'])
+    result = select_clusters(frame, list(frame.columns), range(2, args.max_k + 1),
+                             n_jobs=args.n_jobs)
+    report_selection(result, 'Synthetic')
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+"""
+Cross-Validated Model Evaluation
+- k-fold or repeated k-fold CV run across a process pool
+- Fold preprocessing (median imputation + scaling) is fitted once per fold
+  and shared by every model family
+- Reports R-squared, MAE and RMSE with their spread, plus fit/predict timings
+
+Usage:
+    python evaluation.py --data-dir ../data_collection_and_cleaning_output --folds 5 --repeats 3
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import HistGradientBoostingRegressor, RandomForestRegressor
+from sklearn.impute import SimpleImputer
+from sklearn.linear_model import HuberRegressor, LinearRegression, Ridge
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+from sklearn.model_selection import KFold, RepeatedKFold
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+
+# Estimators fitted on the shared, already-preprocessed fold matrices
+MODEL_FAMILIES = {
+    'linear': lambda seed: LinearRegression(),
+    'ridge': lambda seed: Ridge(alpha=1.0),
+    'huber': lambda seed: HuberRegressor(max_iter=1000),
+    'forest': lambda seed: RandomForestRegressor(n_estimators=200, min_samples_leaf=2,
+                                                 random_state=seed, n_jobs=1),
+    'gbm': lambda seed: HistGradientBoostingRegressor(max_iter=200, random_state=seed)
+}
+
+# ------------------------------
+# Fold Preprocessing Cache
+# ------------------------------
+_shared = {}
+
+def _init_worker(folds):
+    """Hold the preprocessed folds in each worker instead of pickling them per task"""
+    _shared['folds'] = folds
+
+def prepare_folds(X, y, n_splits=5, n_repeats=1, seed=42):
+    """Split once and fit imputation + scaling on each training fold
+
+    Preprocessing is fitted on the training rows only, so test folds never
+    influence the imputed medians or scaling.
+    """
+    X = np.asarray(X, dtype=float)
+    y = np.asarray(y, dtype=float)
+    splitter = (RepeatedKFold(n_splits=n_splits, n_repeats=n_repeats, random_state=seed)
+                if n_repeats > 1 else KFold(n_splits=n_splits, shuffle=True, random_state=seed))
+    folds = []
+    for train, test in splitter.split(X):
+        prep = make_pipeline(SimpleImputer(strategy='median'), StandardScaler())
+        folds.append({
+            'X_train': prep.fit_transform(X[train]),
+            'X_test': prep.transform(X[test]),
+            'y_train': y[train],
+            'y_test': y[test]
+        })
+    return folds
+
+# ------------------------------
+# Fold Evaluation
+# ------------------------------
+def _evaluate(family, fold_index, seed):
+    """Fit one model family on one cached fold and score it"""
+    fold = _shared['folds'][fold_index]
+    model = MODEL_FAMILIES[family](seed)
+
+    start = time.perf_counter()
+    model.fit(fold['X_train'], fold['y_train'])
+    fit_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    pred = model.predict(fold['X_test'])
+    predict_time = time.perf_counter() - start
+
+    return {
+        'model': family,
+        'fold': fold_index,
+        'r2': r2_score(fold['y_test'], pred),
+        'mae': mean_absolute_error(fold['y_test'], pred),
+        'rmse': float(np.sqrt(mean_squared_error(fold['y_test'], pred))),
+        'fit_s': fit_time,
+        'predict_s': predict_time
+    }
+
+def cross_validate_models(X, y, families=None, n_splits=5, n_repeats=1, n_jobs=None, seed=42):
+    """Cross-validate several model families on the same folds
+
+    Returns (summary, folds): `summary` has one row per family with the
+    mean and standard deviation of each metric and the mean timings;
+    `folds` holds every (family, fold) result.
+    """
+    families = families or list(MODEL_FAMILIES)
+    unknown = [f for f in families if f not in MODEL_FAMILIES]
+    if unknown:
+        raise ValueError(f"Unknown model family: {', '.join(unknown)}")
+
+    start = time.perf_counter()
+    folds = prepare_folds(X, y, n_splits, n_repeats, seed)
+    prep_time = time.perf_counter() - start
+
+    tasks = [(family, i) for family in families for i in range(len(folds))]
+    if n_jobs is None or n_jobs < 0:
+        n_jobs = os.cpu_count() or 1
+    n_jobs = max(1, min(n_jobs, len(tasks)))
+    if n_jobs == 1:
+        _init_worker(folds)
+        rows = [_evaluate(family, i, seed) for family, i in tasks]
+        _shared.clear()
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker,
+                                 initargs=(folds,)) as pool:
+            futures = [pool.submit(_evaluate, family, i, seed) for family, i in tasks]
+            rows = [f.result() for f in futures]
+
+    results = pd.DataFrame(rows)
+    summary = results.groupby('model', sort=False).agg(
+        r2_mean=('r2', 'mean'), r2_std=('r2', 'std'),
+        mae_mean=('mae', 'mean'), mae_std=('mae', 'std'),
+        rmse_mean=('rmse', 'mean'), rmse_std=('rmse', 'std'),
+        fit_s=('fit_s', 'mean'), predict_s=('predict_s', 'mean')
+    ).sort_values('r2_mean', ascending=False)
+    summary.attrs.update({'n_folds': len(folds), 'prep_s': prep_time,
+                          'total_s': time.perf_counter() - start})
+    return summary, results
+
+def report_cv(summary, title):
+    print(f"\n{title}: {summary.attrs['n_folds']} folds, preprocessing "
+          f"{summary.attrs['prep_s']:.3f}s, total {summary.attrs['total_s']:.2f}s")
+    table = pd.DataFrame({
+        'R2': [f"{m:.3f} ± {s:.3f}" for m, s in zip(summary['r2_mean'], summary['r2_std'])],
+        'MAE': [f"{m:.2f} ± {s:.2f}" for m, s in zip(summary['mae_mean'], summary['mae_std'])],
+        'RMSE': [f"{m:.2f} ± {s:.2f}" for m, s in zip(summary['rmse_mean'], summary['rmse_std'])],
+        'fit (ms)': (summary['fit_s'] * 1000).round(2),
+        'predict (ms)': (summary['predict_s'] * 1000).round(2)
+    }, index=summary.index)
+    print(table.to_string())
+
+# ------------------------------
+# Command Line
+# ------------------------------
+def evaluate_regressions(batting_features, bowling_features, families=None,
+                         n_splits=5, n_repeats=1, n_jobs=None):
+    """Cross-validate the batting and bowling regressions from predict.py"""
+    import predict
+    results = {}
+    for name, features, columns, target in [
+        ('Batting (total_runs)', batting_features, predict.BATTING_MODEL_FEATURES, 'total_runs'),
+        ('Bowling (avg_economy)', bowling_features, predict.BOWLING_MODEL_FEATURES, 'avg_economy')
+    ]:
+        data = features[features[target].notna()]
+        summary, _ = cross_validate_models(data[columns], data[target], families,
+                                           n_splits, n_repeats, n_jobs)
+        report_cv(summary, name)
+        results[name.split()[0].lower()] = summary
+    return results
+
+def main(argv=None):
+    import predict
+    parser = argparse.ArgumentParser(description="Cross-validate the regression models")
+    parser.add_argument('--data-dir', default='.')
+    parser.add_argument('--folds', type=int, default=5)
+    parser.add_argument('--repeats', type=int, default=1)
+    parser.add_argument('--families', nargs='+', default=list(MODEL_FAMILIES),
+                        help=f"Model families to compare ({', '.join(MODEL_FAMILIES)})")
+    parser.add_argument('--n-jobs', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    batting = predict.load_batting_data(os.path.join(args.data_dir, 'fact_batting_summary.csv'))
+    bowling = predict.load_bowling_data(os.path.join(args.data_dir, 'fact_bowling_summary.csv'))
+    batting_features, bowling_features = predict.create_features(batting, bowling)
+    print("\n=== CROSS-VALIDATED MODEL COMPARISON ===")
+    evaluate_regressions(batting_features, bowling_features, args.families,
+                         args.folds, args.repeats, args.n_jobs)
+
+if __name__ == "__main__":
+    main()
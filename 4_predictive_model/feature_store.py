@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+"""
+Point-in-Time Feature Store
+- Per-player features as of every match date, from one sorted cumulative pass
+- Stored as versioned Parquet tables, rebuilt only when the inputs change
+- As-of joins return only what was known before each match (no future leakage)
+
+Each stored row holds a player's features *through* one match date (that
+date included). as_of_join() matches an event to the latest row strictly
+before the event date, so same-day and later matches never leak in.
+
+Layout:
+    <store_dir>/<table>/v<N>/features.parquet
+    <store_dir>/<table>/v<N>/metadata.json
+    <store_dir>/<table>/LATEST
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import time
+
+import pandas as pd
+
+import predict
+from incremental import TABLES, features_from_stats, partial_stats
+
+MATCH_FILE = 'dim_match_summary.csv'
+MATCH_DATE_FORMAT = '%b %d, %Y'   # e.g. "Oct 16, 2022"
+DATE_COL = 'match_date'
+
+# ------------------------------
+# Cumulative Features
+# ------------------------------
+def load_match_dates(path):
+    """match_id -> match date from the match summary table"""
+    matches = predict.load_match_data(path)
+    return pd.DataFrame({
+        'match_id': matches['match_id'],
+        DATE_COL: pd.to_datetime(matches['matchdate'], format=MATCH_DATE_FORMAT,
+                                 errors='coerce')
+    }).dropna().drop_duplicates('match_id')
+
+def cumulative_features(rows, dates, table):
+    """Features per (player, match date) covering every match up to that date
+
+    Rows are summed per player and date, sorted once, and accumulated with a
+    grouped cumulative sum, so the cost is one sort plus one linear pass.
+    """
+    spec = TABLES[table]
+    key = spec['key']
+    rows = rows.merge(dates, on='match_id', how='inner')
+    daily = partial_stats(rows, spec, by=[key, DATE_COL]).sort_index()
+    through = daily.groupby(level=key).cumsum()
+    features = features_from_stats(through, spec)
+    return features.reset_index()
+
+def as_of_join(events, features, table, date_col=DATE_COL):
+    """Attach to each event the player's features from strictly earlier dates
+
+    `events` needs the player key column and `date_col`. Players with no
+    earlier matches get zero sums and counts and missing averages.
+    """
+    spec = TABLES[table]
+    key = spec['key']
+    # Row positions survive the sort and merge whatever the events index is
+    # (named, multi-level or with duplicate labels); the index is put back after
+    left = events.reset_index(drop=True)
+    left['_row'] = range(len(left))
+    right = features.rename(columns={DATE_COL: '_as_of'}).sort_values('_as_of', kind='stable')
+    # merge_asof needs one datetime resolution on both sides (Parquet reads
+    # back microseconds); the events keep their own dates in the result
+    left[date_col] = left[date_col].astype(right['_as_of'].dtype)
+    left = left.sort_values(date_col, kind='stable')
+    joined = pd.merge_asof(left, right, left_on=date_col, right_on='_as_of', by=key,
+                           allow_exact_matches=False)
+    joined = joined.sort_values('_row').drop(columns=['_row', '_as_of'])
+    joined.index = events.index
+    joined[date_col] = events[date_col]
+
+    totals = [name for _, how, name in spec['aggregates'] if how != 'mean']
+    joined[totals] = joined[totals].fillna(0)
+    return joined
+
+def latest_features(features, table):
+    """Career-to-date features: each player's most recent row"""
+    key = TABLES[table]['key']
+    return (features.sort_values([key, DATE_COL], kind='stable')
+            .groupby(key).tail(1).drop(columns=DATE_COL).reset_index(drop=True))
+
+# ------------------------------
+# Versioned Storage
+# ------------------------------
+def _file_hash(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _version_dir(store_dir, table, version):
+    return os.path.join(store_dir, table, f"v{version}")
+
+def latest_version(table, store_dir):
+    path = os.path.join(store_dir, table, 'LATEST')
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return int(f.read().strip())
+
+def read_metadata(table, store_dir, version=None):
+    version = version if version is not None else latest_version(table, store_dir)
+    if version is None:
+        return None
+    with open(os.path.join(_version_dir(store_dir, table, version), 'metadata.json')) as f:
+        return json.load(f)
+
+def load_features(table, store_dir, version=None, columns=None):
+    """Read a stored feature table (optionally only some columns)"""
+    version = version if version is not None else latest_version(table, store_dir)
+    if version is None:
+        raise FileNotFoundError(f"No '{table}' features in {store_dir}; run build_feature_store")
+    if columns is not None:
+        columns = [TABLES[table]['key'], DATE_COL] + [c for c in columns
+                                                      if c not in (TABLES[table]['key'], DATE_COL)]
+    path = os.path.join(_version_dir(store_dir, table, version), 'features.parquet')
+    return pd.read_parquet(path, columns=columns)
+
+def build_feature_store(data_dir='.', store_dir=None, force=False):
+    """Materialize point-in-time features for batting and bowling
+
+    A new version is written only when the fact table, the match table or
+    the feature definitions change. Returns {table: metadata}.
+    """
+    store_dir = store_dir or os.path.join(data_dir, 'feature_store')
+    match_path = os.path.join(data_dir, MATCH_FILE)
+    dates = None
+    result = {}
+
+    for table, spec in TABLES.items():
+        fact_path = os.path.join(data_dir, spec['file'])
+        fingerprint = hashlib.sha256(json.dumps([
+            _file_hash(fact_path), _file_hash(match_path), spec['aggregates']
+        ]).encode()).hexdigest()
+        metadata = read_metadata(table, store_dir)
+        if not force and metadata is not None and metadata['fingerprint'] == fingerprint:
+            metadata['status'] = 'unchanged'
+            result[table] = metadata
+            continue
+
+        start = time.perf_counter()
+        if dates is None:
+            dates = load_match_dates(match_path)
+        loader = predict.load_batting_data if table == 'batting' else predict.load_bowling_data
+        features = cumulative_features(loader(fact_path), dates, table)
+
+        version = (latest_version(table, store_dir) or 0) + 1
+        out_dir = _version_dir(store_dir, table, version)
+        os.makedirs(out_dir, exist_ok=True)
+        features.to_parquet(os.path.join(out_dir, 'features.parquet'), index=False)
+        metadata = {
+            'table': table,
+            'version': version,
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'fingerprint': fingerprint,
+            'key': spec['key'],
+            'columns': list(features.columns),
+            'n_rows': int(len(features)),
+            'n_players': int(features[spec['key']].nunique()),
+            'first_date': str(features[DATE_COL].min().date()) if len(features) else None,
+            'last_date': str(features[DATE_COL].max().date()) if len(features) else None,
+            'build_s': round(time.perf_counter() - start, 3)
+        }
+        with open(os.path.join(out_dir, 'metadata.json'), 'w') as f:
+            json.dump(metadata, f, indent=2)
+        latest = os.path.join(store_dir, table, 'LATEST')
+        with open(latest + '.tmp', 'w') as f:
+            f.write(str(version))
+        os.replace(latest + '.tmp', latest)
+        metadata['status'] = 'built'
+        result[table] = metadata
+
+    return result
+
+def report_store(result):
+    print("\n=== FEATURE STORE ===")
+    for table, meta in result.items():
+        timing = f", {meta['build_s']:.2f}s" if meta['status'] == 'built' else ''
+        print(f"{table:>8}: v{meta['version']} {meta['status']:<9} {meta['n_rows']:>8,} rows, "
+              f"{meta['n_players']:,} players, {meta['first_date']} to {meta['last_date']}{timing}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the point-in-time feature store")
+    parser.add_argument('--data-dir', default='.')
+    parser.add_argument('--store-dir', default=None,
+                        help="Where feature versions are written (default: <data-dir>/feature_store)")
+    parser.add_argument('--force', action='store_true', help="Write a new version even if unchanged")
+    args = parser.parse_args(argv)
+    report_store(build_feature_store(args.data_dir, args.store_dir, args.force))
+
+if __name__ == "__main__":
+    main()
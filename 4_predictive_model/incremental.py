@@ -0,0 +1,480 @@
+# -*- coding: utf-8 -*-
+"""
+Incremental Model Updates
+- Reads only the fact rows appended since the last update
+- Keeps per-player sums and counts so features change only for affected players
+- Streaming scaler statistics, online K-means centroids and online least squares
+- A drift check triggers a full refit only when the models no longer fit the data
+
+Usage:
+    python incremental.py --data-dir ../data_collection_and_cleaning_output
+    python incremental.py --data-dir ../data_collection_and_cleaning_output --refit
+"""
+
+import argparse
+import csv
+import hashlib
+import io
+import os
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+import predict
+from cluster_selection import select_clusters
+
+STATE_FILE = os.path.join('online', 'state.joblib')
+# Bumped when the saved layout changes; older state files trigger a full fit
+STATE_VERSION = 2
+
+TABLES = {
+    'batting': {
+        'file': 'fact_batting_summary.csv',
+        'key': 'batsmanname',
+        'renames': predict.BATTING_RENAMES,
+        'clean': predict.clean_batting_data,
+        'aggregates': predict.BATTING_AGGREGATES,
+        'cluster_features': predict.BATTING_CLUSTER_FEATURES,
+        'model_features': predict.BATTING_MODEL_FEATURES,
+        'target': 'total_runs'
+    },
+    'bowling': {
+        'file': 'fact_bowling_summary.csv',
+        'key': 'bowlername',
+        'renames': {},
+        'clean': predict.clean_bowling_data,
+        'aggregates': predict.BOWLING_AGGREGATES,
+        'cluster_features': predict.BOWLING_CLUSTER_FEATURES,
+        'model_features': predict.BOWLING_MODEL_FEATURES,
+        'target': 'avg_economy'
+    }
+}
+
+# Drift thresholds that force a full refit
+MAX_MEAN_SHIFT = 0.5            # change in a feature mean, in fit-time standard deviations
+STD_RATIO_RANGE = (0.67, 1.5)   # allowed ratio of current to fit-time standard deviation
+MAX_INERTIA_RATIO = 1.3         # within-cluster sum of squares per player vs fit time
+MAX_R2_DROP = 0.1               # fall in regression R-squared vs fit time
+
+# ------------------------------
+# Streaming Statistics
+# ------------------------------
+# The online models are saved as plain dicts of their arrays, not pickled
+# instances, so state written by `python incremental.py` (module __main__)
+# loads from `import incremental` and vice versa.
+
+class _Plain:
+    def to_dict(self):
+        return dict(self.__dict__)
+
+    @classmethod
+    def from_dict(cls, data):
+        obj = cls.__new__(cls)
+        obj.__dict__.update(data)
+        return obj
+
+class RunningMoments(_Plain):
+    """Per-column count, sum and sum of squares that rows can enter and leave"""
+
+    def __init__(self, n_features):
+        self.count = np.zeros(n_features)
+        self.total = np.zeros(n_features)
+        self.total_sq = np.zeros(n_features)
+
+    def update(self, X, sign=1):
+        X = np.asarray(X, dtype=float)
+        present = ~np.isnan(X)
+        self.count += sign * present.sum(axis=0)
+        self.total += sign * np.nansum(X, axis=0)
+        self.total_sq += sign * np.nansum(X ** 2, axis=0)
+
+    @property
+    def mean(self):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self.total / self.count
+
+    @property
+    def std(self):
+        """Population standard deviation, as used by StandardScaler"""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            var = self.total_sq / self.count - self.mean ** 2
+        return np.sqrt(np.clip(var, 0, None))
+
+class OnlineKMeans(_Plain):
+    """K-means centroids kept as exact means of their current members
+
+    A changed player leaves the cluster it was in and joins the nearest
+    centroid; other players keep their assignments until the next refit.
+    """
+
+    def __init__(self, X, labels, k):
+        X = np.asarray(X, dtype=float)
+        self.sums = np.zeros((k, X.shape[1]))
+        self.sums_sq = np.zeros((k, X.shape[1]))
+        self.counts = np.zeros(k)
+        self._apply(X, labels, 1)
+
+    def _apply(self, X, labels, sign):
+        np.add.at(self.sums, labels, sign * X)
+        np.add.at(self.sums_sq, labels, sign * X ** 2)
+        np.add.at(self.counts, labels, sign)
+
+    @property
+    def centroids(self):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self.sums / self.counts[:, None]
+
+    def assign(self, X, scale):
+        """Nearest centroid in standardized units (empty clusters are skipped)"""
+        dist = (((X[:, None, :] - self.centroids[None, :, :]) / scale) ** 2).sum(axis=2)
+        dist[:, self.counts <= 0] = np.inf
+        return dist.argmin(axis=1)
+
+    def remove(self, X, labels):
+        self._apply(np.asarray(X, dtype=float), labels, -1)
+
+    def add(self, X, scale):
+        X = np.asarray(X, dtype=float)
+        labels = self.assign(X, scale)
+        self._apply(X, labels, 1)
+        return labels
+
+    def inertia_per_point(self, scale):
+        """Within-cluster sum of squares per member, in standardized units"""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            sse = self.sums_sq - self.sums ** 2 / self.counts[:, None]
+        sse = np.nansum(sse / scale ** 2)
+        return sse / max(self.counts.sum(), 1)
+
+class OnlineLeastSquares(_Plain):
+    """Linear regression from running X'X and X'y; rows can be added or removed"""
+
+    def __init__(self, n_features):
+        self.xtx = np.zeros((n_features + 1, n_features + 1))
+        self.xty = np.zeros(n_features + 1)
+        self.n = 0
+        self.y_sum = 0.0
+        self.y_sq = 0.0
+
+    def update(self, X, y, sign=1):
+        X = np.column_stack([np.ones(len(X)), np.asarray(X, dtype=float)])
+        y = np.asarray(y, dtype=float)
+        self.xtx += sign * X.T @ X
+        self.xty += sign * X.T @ y
+        self.n += sign * len(y)
+        self.y_sum += sign * y.sum()
+        self.y_sq += sign * (y ** 2).sum()
+
+    @property
+    def beta(self):
+        return np.linalg.lstsq(self.xtx, self.xty, rcond=None)[0]
+
+    @property
+    def intercept_(self):
+        return self.beta[0]
+
+    @property
+    def coef_(self):
+        return self.beta[1:]
+
+    def predict(self, X):
+        return self.intercept_ + np.asarray(X, dtype=float) @ self.coef_
+
+    def r2(self):
+        """In-sample R-squared computed from the running sums"""
+        beta = self.beta
+        sse = self.y_sq - 2 * beta @ self.xty + beta @ self.xtx @ beta
+        sst = self.y_sq - self.y_sum ** 2 / max(self.n, 1)
+        return float(1 - sse / sst) if sst > 0 else float('nan')
+
+# ------------------------------
+# Reading Appended Rows
+# ------------------------------
+def _tail_digest(path, offset, size=4096):
+    """Hash of the bytes just before `offset`, to detect rewritten files"""
+    with open(path, 'rb') as f:
+        f.seek(max(offset - size, 0))
+        return hashlib.sha256(f.read(offset - max(offset - size, 0))).hexdigest()
+
+def read_new_rows(path, cursor, spec):
+    """Cleaned rows appended after `cursor`; returns (rows, new cursor, full)
+
+    `full` is True when the file was read from the start because there was
+    no cursor or the already-consumed part of the file has changed.
+    """
+    size = os.path.getsize(path)
+    full = (cursor is None or size < cursor['offset']
+            or _tail_digest(path, cursor['offset']) != cursor['digest'])
+    offset = 0 if full else cursor['offset']
+
+    with open(path, 'rb') as f:
+        header = next(csv.reader([f.readline().decode('utf-8-sig')]))
+        f.seek(offset)
+        data = f.read()
+    if full:
+        rows = pd.read_csv(io.BytesIO(data))
+    elif not data.strip():
+        rows = pd.DataFrame(columns=header)
+    else:
+        rows = pd.read_csv(io.BytesIO(data), header=None, names=header)
+    rows.columns = rows.columns.str.strip().str.lower()
+    rows = spec['clean'](rows.rename(columns=spec['renames']), 'pandas')
+
+    end = offset + len(data)
+    return rows, {'offset': end, 'digest': _tail_digest(path, end)}, full
+
+# ------------------------------
+# Per-Player Sufficient Statistics
+# ------------------------------
+def partial_stats(rows, spec, by=None):
+    """Per-player sums and counts needed to rebuild the feature table
+
+    `by` groups on more columns than the player key (e.g. player and date).
+    """
+    key = spec['key']
+    agg = {}
+    for col, how, _ in spec['aggregates']:
+        if how in ('sum', 'mean'):
+            agg[f'{col}_sum'] = (col, 'sum')
+        if how in ('count', 'mean'):
+            agg[f'{col}_count'] = (col, 'count')
+    return rows[rows[key].notna()].groupby(by or key).agg(**agg)
+
+def features_from_stats(stats, spec):
+    """Feature table (same columns as predict.create_features) from the sums"""
+    features = pd.DataFrame(index=stats.index)
+    for col, how, name in spec['aggregates']:
+        if how == 'sum':
+            features[name] = stats[f'{col}_sum']
+        elif how == 'count':
+            features[name] = stats[f'{col}_count']
+        else:
+            features[name] = stats[f'{col}_sum'] / stats[f'{col}_count'].where(
+                stats[f'{col}_count'] > 0)
+    return features.astype(float)
+
+# ------------------------------
+# Full Fit and Online Update
+# ------------------------------
+def _model_inputs(features, spec, medians):
+    X = features[spec['model_features']].fillna(medians).to_numpy(dtype=float)
+    return X, features[spec['target']].to_numpy(dtype=float)
+
+def full_fit(table, stats, k_range=range(2, 9)):
+    """Refit scaler statistics, clusters and regression on every player"""
+    spec = TABLES[table]
+    features = features_from_stats(stats, spec)
+    cluster_cols = spec['cluster_features']
+
+    scaler = RunningMoments(len(cluster_cols))
+    scaler.update(features[cluster_cols])
+
+    selection = select_clusters(features, cluster_cols, k_range, n_jobs=1)
+    chosen = [cluster_cols.index(c) for c in selection['features']]
+    labels = pd.Series(np.nan, index=features.index)
+    labels[selection['labels'].index] = selection['labels']
+    complete = selection['labels'].index
+    kmeans = OnlineKMeans(features.loc[complete, selection['features']],
+                          selection['labels'].to_numpy(), selection['k'])
+
+    medians = features[spec['model_features']].median()
+    ols = OnlineLeastSquares(len(spec['model_features']))
+    ols.update(*_model_inputs(features, spec, medians))
+
+    fit_scale = _scale(scaler)
+    return {
+        'stats': stats,
+        'features': features,
+        'scaler': scaler,
+        'kmeans': kmeans,
+        'cluster_columns': chosen,
+        'labels': labels,
+        'medians': medians,
+        'ols': ols,
+        'fit': {
+            'mean': scaler.mean.copy(),
+            'std': scaler.std.copy(),
+            'inertia': kmeans.inertia_per_point(fit_scale[chosen]),
+            'r2': ols.r2(),
+            'k': selection['k'],
+            'players': len(features),
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S')
+        }
+    }
+
+def _scale(scaler):
+    std = scaler.std
+    return np.where((std > 0) & np.isfinite(std), std, 1.0)
+
+def apply_update(model, new_stats, spec):
+    """Fold new per-player sums into the table and update the models in place
+
+    Work is proportional to the number of players in `new_stats`.
+    """
+    stats, features = model['stats'], model['features']
+    players = new_stats.index
+    existing = players[players.isin(stats.index)]
+    cluster_cols = spec['cluster_features']
+    chosen = model['cluster_columns']
+
+    # Remove the affected players' old rows from every running statistic
+    old = features.loc[existing]
+    model['scaler'].update(old[cluster_cols], sign=-1)
+    old_labels = model['labels'].loc[existing].dropna()
+    model['kmeans'].remove(old.loc[old_labels.index, cluster_cols].to_numpy()[:, chosen],
+                           old_labels.to_numpy(dtype=int))
+    model['ols'].update(*_model_inputs(old, spec, model['medians']), sign=-1)
+
+    # Merge sums and recompute features for the affected players only
+    merged = new_stats.add(stats.reindex(players).fillna(0), fill_value=0)
+    stats = pd.concat([stats.drop(existing), merged])
+    new = features_from_stats(merged, spec)
+    model['stats'] = stats
+    model['features'] = pd.concat([features.drop(existing), new])
+
+    # Add the new rows back
+    model['scaler'].update(new[cluster_cols])
+    scale = _scale(model['scaler'])[chosen]
+    values = new[cluster_cols].to_numpy(dtype=float)[:, chosen]
+    complete = ~np.isnan(values).any(axis=1)
+    labels = pd.Series(np.nan, index=new.index)
+    if complete.any():
+        labels[complete] = model['kmeans'].add(values[complete], scale)
+    model['labels'] = pd.concat([model['labels'].drop(existing), labels])
+    model['ols'].update(*_model_inputs(new, spec, model['medians']))
+    return len(players), len(players) - len(existing)
+
+def check_drift(model):
+    """Reasons the online models no longer describe the data (empty if none)"""
+    fit, scaler = model['fit'], model['scaler']
+    reasons = []
+    fit_std = np.where(fit['std'] > 0, fit['std'], 1.0)
+    shift = np.abs(scaler.mean - fit['mean']) / fit_std
+    if np.nanmax(shift) > MAX_MEAN_SHIFT:
+        reasons.append(f"feature mean shifted {np.nanmax(shift):.2f} std")
+    ratio = scaler.std / fit_std
+    if np.nanmin(ratio) < STD_RATIO_RANGE[0] or np.nanmax(ratio) > STD_RATIO_RANGE[1]:
+        reasons.append(f"feature spread changed (x{np.nanmin(ratio):.2f}-{np.nanmax(ratio):.2f})")
+    kmeans = model['kmeans']
+    if (kmeans.counts <= 0).any():
+        reasons.append("empty cluster")
+    inertia = kmeans.inertia_per_point(_scale(scaler)[model['cluster_columns']])
+    if fit['inertia'] > 0 and inertia / fit['inertia'] > MAX_INERTIA_RATIO:
+        reasons.append(f"cluster inertia up x{inertia / fit['inertia']:.2f}")
+    r2 = model['ols'].r2()
+    if fit['r2'] - r2 > MAX_R2_DROP:
+        reasons.append(f"R-squared fell {fit['r2']:.3f} -> {r2:.3f}")
+    return reasons
+
+# ------------------------------
+# Update Driver
+# ------------------------------
+ONLINE_MODELS = {'scaler': RunningMoments, 'kmeans': OnlineKMeans, 'ols': OnlineLeastSquares}
+
+def load_state(model_dir):
+    """Saved {table: {'cursor', 'model'}}; empty when missing, unreadable or outdated"""
+    path = os.path.join(model_dir, STATE_FILE)
+    if not os.path.exists(path):
+        return {}
+    try:
+        saved = joblib.load(path)
+    except Exception:
+        return {}
+    if not isinstance(saved, dict) or saved.get('version') != STATE_VERSION:
+        return {}
+    state = {}
+    for table, entry in saved['tables'].items():
+        model = dict(entry['model'])
+        for key, cls in ONLINE_MODELS.items():
+            model[key] = cls.from_dict(model[key])
+        state[table] = {'cursor': entry['cursor'], 'model': model}
+    return state
+
+def save_state(state, model_dir):
+    path = os.path.join(model_dir, STATE_FILE)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tables = {}
+    for table, entry in state.items():
+        model = dict(entry['model'])
+        for key in ONLINE_MODELS:
+            model[key] = model[key].to_dict()
+        tables[table] = {'cursor': entry['cursor'], 'model': model}
+    joblib.dump({'version': STATE_VERSION, 'tables': tables}, path + '.tmp')
+    os.replace(path + '.tmp', path)
+
+def update(data_dir='.', model_dir=None, refit=False, k_range=range(2, 9)):
+    """Bring the online models up to date with the fact tables
+
+    Returns {table: summary dict}. The first run (or `refit=True`) fits on
+    the whole history; later runs only read rows appended since then.
+    """
+    model_dir = model_dir or os.path.join(data_dir, 'models')
+    state = {} if refit else load_state(model_dir)
+    summary = {}
+
+    for table, spec in TABLES.items():
+        start = time.perf_counter()
+        entry = state.get(table)
+        cursor = None if refit or entry is None else entry['cursor']
+        rows, cursor, full = read_new_rows(os.path.join(data_dir, spec['file']), cursor, spec)
+        new_stats = partial_stats(rows, spec)
+
+        if full:
+            model, action, reasons = full_fit(table, new_stats, k_range), 'full fit', []
+        elif rows.empty:
+            model, action, reasons = entry['model'], 'unchanged', []
+        else:
+            model = entry['model']
+            apply_update(model, new_stats, spec)
+            reasons = check_drift(model)
+            action = 'updated'
+            if reasons:
+                model = full_fit(table, model['stats'], k_range)
+                action = 'refit (drift)'
+
+        state[table] = {'cursor': cursor, 'model': model}
+        summary[table] = {
+            'action': action,
+            'new_rows': len(rows),
+            'players_changed': len(new_stats),
+            'players': len(model['features']),
+            'k': model['kmeans'].counts.size,
+            'r2': model['ols'].r2(),
+            'drift': reasons,
+            'seconds': time.perf_counter() - start
+        }
+
+    save_state(state, model_dir)
+    return summary
+
+def predict_players(model, players, spec):
+    """Online regression prediction and cluster label for the given players"""
+    features = model['features'].loc[players]
+    X, _ = _model_inputs(features, spec, model['medians'])
+    return pd.DataFrame({
+        f"predicted_{spec['target']}": model['ols'].predict(X),
+        'cluster': model['labels'].loc[players].to_numpy()
+    }, index=features.index)
+
+def report_update(summary):
+    print("\n=== INCREMENTAL UPDATE ===")
+    for table, info in summary.items():
+        print(f"{table:>8}: {info['action']:<14} {info['new_rows']:>7,} new rows, "
+              f"{info['players_changed']:>5,} of {info['players']:,} players changed, "
+              f"k={info['k']}, R2={info['r2']:.3f}, {info['seconds']:.3f}s")
+        for reason in info['drift']:
+            print(f"          drift: {reason}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Incrementally update the player models")
+    parser.add_argument('--data-dir', default='.')
+    parser.add_argument('--model-dir', default=None,
+                        help="Where the online state is kept (default: <data-dir>/models)")
+    parser.add_argument('--refit', action='store_true', help="Refit on the full history")
+    args = parser.parse_args(argv)
+    report_update(update(args.data_dir, args.model_dir, args.refit))
+
+if __name__ == "__main__":
+    main()
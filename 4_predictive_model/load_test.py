@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+Load Test for the Local Prediction Server
+- Concurrent clients send batting/bowling prediction requests for a fixed duration
+- Reports client-side p50/p99 latency and throughput plus the server's /metrics
+
+Usage:
+    python prediction_server.py --data-dir ../data_collection_and_cleaning_output &
+    python load_test.py --clients 32 --duration 10
+"""
+
+import argparse
+import json
+import os
+import random
+import threading
+import time
+import urllib.request
+
+import numpy as np
+import pandas as pd
+
+def _request(url, payload=None, timeout=30):
+    data = json.dumps(payload).encode() if payload is not None else None
+    req = urllib.request.Request(url, data=data, headers={'Content-Type': 'application/json'})
+    with urllib.request.urlopen(req, timeout=timeout) as resp:
+        return json.loads(resp.read())
+
+def load_player_names(data_dir):
+    """Batsman and bowler names to request, taken from the fact tables"""
+    batting = pd.read_csv(os.path.join(data_dir, 'fact_batting_summary.csv'))
+    bowling = pd.read_csv(os.path.join(data_dir, 'fact_bowling_summary.csv'))
+    return {
+        'batting': sorted(batting['batsmanName'].dropna().str.strip().unique()),
+        'bowling': sorted(bowling['bowlerName'].dropna().str.strip().unique())
+    }
+
+def run_client(base_url, players, batch, deadline, latencies, errors, seed):
+    rng = random.Random(seed)
+    while time.perf_counter() < deadline:
+        name = rng.choice(['batting', 'bowling'])
+        names = rng.sample(players[name], min(batch, len(players[name])))
+        start = time.perf_counter()
+        try:
+            _request(f"{base_url}/predict/{name}", {'players': names})
+            latencies.append(time.perf_counter() - start)
+        except Exception:
+            errors.append(1)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the prediction server")
+    parser.add_argument('--url', default='http://127.0.0.1:8765')
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--players-per-request', type=int, default=1)
+    parser.add_argument('--data-dir', default='.',
+                        help="Data directory used to pick player names")
+    args = parser.parse_args(argv)
+
+    players = load_player_names(args.data_dir)
+    print(f"Server: {_request(f'{args.url}/health')}")
+    latencies, errors = [], []
+    deadline = time.perf_counter() + args.duration
+    threads = [
+        threading.Thread(target=run_client, args=(
+            args.url, players, args.players_per_request, deadline, latencies, errors, i))
+        for i in range(args.clients)
+    ]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    ms = np.array(latencies) * 1000
+    print(f"\n=== LOAD TEST ({args.clients} clients, {elapsed:.1f}s) ===")
+    print(f"Requests: {len(latencies)}  Errors: {len(errors)}")
+    print(f"Throughput: {len(latencies) / elapsed:.1f} req/s")
+    if len(ms):
+        print(f"Latency p50: {np.percentile(ms, 50):.2f} ms  "
+              f"p99: {np.percentile(ms, 99):.2f} ms  max: {ms.max():.2f} ms")
+    print("\nServer metrics:")
+    print(json.dumps(_request(f"{args.url}/metrics"), indent=2))
+
+if __name__ == "__main__":
+    main()
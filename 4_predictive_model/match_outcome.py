@@ -0,0 +1,366 @@
+# -*- coding: utf-8 -*-
+"""
+Match Outcome Predictor
+- Team-strength features built in one date-ordered pass: recency-weighted
+  batting run rate, bowling economy and win rate, plus head-to-head record
+  and record at the ground, all from matches strictly before each fixture
+- Logistic regression validated on time-ordered splits (train on earlier
+  matches, test on the next block)
+- Batch scoring of any number of fixtures at once from the final team state
+
+Usage:
+    python match_outcome.py --data-dir ../data_collection_and_cleaning_output
+    python match_outcome.py --data-dir ../data_collection_and_cleaning_output --fixtures fixtures.csv
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.impute import SimpleImputer
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import accuracy_score, brier_score_loss, log_loss
+from sklearn.model_selection import TimeSeriesSplit
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+
+import predict
+from feature_store import MATCH_DATE_FORMAT
+from model_store import get_or_train
+
+# Team form halves in weight after this many of the team's own matches
+HALF_LIFE_MATCHES = 10
+DECAY = 0.5 ** (1 / HALF_LIFE_MATCHES)
+NO_RESULT = {'abandoned', 'no result'}
+
+# Every feature is a team1-minus-team2 difference, so swapping the teams
+# negates the feature vector
+OUTCOME_FEATURES = ['run_rate_diff', 'economy_diff', 'win_rate_diff', 'experience_diff',
+                    'h2h_diff', 'ground_win_rate_diff']
+OUTCOME_SPEC = {'model': 'LogisticRegression', 'C': 0.1, 'imputer': 'median',
+                'half_life': HALF_LIFE_MATCHES, 'cv_splits': 5}
+
+# Columns of TeamStrength.totals
+TOTALS = ['runs', 'balls', 'conceded', 'bowled', 'wins', 'played']
+
+# ------------------------------
+# Per-Match Team Statistics
+# ------------------------------
+def overs_to_balls(overs):
+    """Cricket overs notation (3.4 = 3 overs and 4 balls) to balls"""
+    overs = pd.to_numeric(overs, errors='coerce').fillna(0)
+    whole = np.floor(overs)
+    return whole * 6 + np.round((overs - whole) * 10)
+
+def team_match_stats(batting, bowling):
+    """Runs, balls faced, runs conceded and balls bowled per (match_id, team)"""
+    bat = batting.assign(runs=pd.to_numeric(batting['runs'], errors='coerce'),
+                         balls=pd.to_numeric(batting['balls'], errors='coerce'))
+    bat = bat.groupby(['match_id', 'teaminnings'])[['runs', 'balls']].sum()
+    bowl = pd.DataFrame({
+        'match_id': bowling['match_id'],
+        'team': bowling['bowlingteam'],
+        'conceded': pd.to_numeric(bowling['runs'], errors='coerce'),
+        'bowled': overs_to_balls(bowling['overs'])
+    }).groupby(['match_id', 'team'])[['conceded', 'bowled']].sum()
+    bat.index.names = ['match_id', 'team']
+    return bat.join(bowl, how='outer').fillna(0)
+
+def load_matches(data_dir):
+    """Match table in date order with both teams' match statistics attached"""
+    matches = predict.load_match_data(os.path.join(data_dir, 'dim_match_summary.csv'))
+    batting = predict.load_batting_data(os.path.join(data_dir, 'fact_batting_summary.csv'),
+                                        columns=['teaminnings', 'runs', 'balls', 'match_id'])
+    bowling = predict.load_bowling_data(os.path.join(data_dir, 'fact_bowling_summary.csv'),
+                                        columns=['bowlingteam', 'runs', 'overs', 'match_id'])
+    matches['date'] = pd.to_datetime(matches['matchdate'], format=MATCH_DATE_FORMAT,
+                                     errors='coerce')
+    matches = matches.dropna(subset=['date']).sort_values('date', kind='stable')
+
+    stats = team_match_stats(batting, bowling)
+    for side in ('team1', 'team2'):
+        side_stats = stats.reindex(pd.MultiIndex.from_arrays([matches['match_id'], matches[side]]))
+        for col in stats.columns:
+            matches[f"{side}_{col}"] = side_stats[col].fillna(0).to_numpy()
+    matches['decided'] = ~matches['winner'].str.strip().str.lower().isin(NO_RESULT)
+    matches['team1_won'] = (matches['winner'] == matches['team1']).astype(int)
+    return matches.reset_index(drop=True)
+
+# ------------------------------
+# Incremental Team Strength
+# ------------------------------
+class TeamStrength:
+    """Running team form, head-to-head and ground records
+
+    Arrays carry one extra all-zero row (and column) at the end: unknown
+    teams and grounds look up code -1 and so read an empty history.
+    """
+
+    def __init__(self):
+        self.teams = pd.Index([], dtype=object)
+        self.grounds = pd.Index([], dtype=object)
+        self.totals = np.zeros((1, len(TOTALS)))
+        self.h2h = np.zeros((1, 1, 2))        # [team, opponent] -> (wins, played)
+        self.ground = np.zeros((1, 1, 2))     # [team, ground] -> (wins, played)
+
+    def _grow(self, teams, grounds):
+        new_teams = pd.Index(pd.unique(np.asarray(teams, dtype=object))).difference(self.teams)
+        new_grounds = pd.Index(pd.unique(np.asarray(grounds, dtype=object))).difference(self.grounds)
+        if not len(new_teams) and not len(new_grounds):
+            return
+        n, g = len(self.teams), len(self.grounds)
+        self.teams = self.teams.append(new_teams)
+        self.grounds = self.grounds.append(new_grounds)
+        N, G = len(self.teams), len(self.grounds)
+
+        totals = np.zeros((N + 1, len(TOTALS)))
+        totals[:n] = self.totals[:n]
+        h2h = np.zeros((N + 1, N + 1, 2))
+        h2h[:n, :n] = self.h2h[:n, :n]
+        ground = np.zeros((N + 1, G + 1, 2))
+        ground[:n, :g] = self.ground[:n, :g]
+        self.totals, self.h2h, self.ground = totals, h2h, ground
+
+    def _codes(self, team1, team2, ground):
+        return (self.teams.get_indexer(team1), self.teams.get_indexer(team2),
+                self.grounds.get_indexer(ground))
+
+    def _feature_matrix(self, t1, t2, g):
+        """OUTCOME_FEATURES as an array, for fixtures given as integer codes"""
+        a, b = self.totals[t1], self.totals[t2]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rates = lambda num, den, scale=1: (np.where(den > 0, num / den, np.nan) * scale)
+            ground1, ground2 = self.ground[t1, g], self.ground[t2, g]
+            # Wins minus losses per meeting; 0 for teams that have not met
+            wins, played = self.h2h[t1, t2, 0], self.h2h[t1, t2, 1]
+            return np.column_stack([
+                rates(a[:, 0], a[:, 1], 6) - rates(b[:, 0], b[:, 1], 6),
+                rates(a[:, 2], a[:, 3], 6) - rates(b[:, 2], b[:, 3], 6),
+                rates(a[:, 4], a[:, 5]) - rates(b[:, 4], b[:, 5]),
+                a[:, 5] - b[:, 5],
+                (2 * wins - played) / np.maximum(played, 1),
+                rates(ground1[:, 0], ground1[:, 1]) - rates(ground2[:, 0], ground2[:, 1])
+            ])
+
+    def _apply(self, t1, t2, g, stats1, stats2, team1_won, decided):
+        """Fold one block of matches (as codes and arrays) into the state"""
+        won1 = team1_won * decided
+        won2 = (1 - team1_won) * decided
+        # Abandoned matches with no balls bowled leave the team's form unchanged
+        played = [np.maximum(decided, stats[:, 1] > 0) for stats in (stats1, stats2)]
+        appearances = np.bincount(np.concatenate([t1, t2]), weights=np.concatenate(played),
+                                  minlength=len(self.totals))
+        self.totals *= (DECAY ** appearances)[:, None]
+        for code, opponent, stats, won in ((t1, t2, stats1, won1), (t2, t1, stats2, won2)):
+            np.add.at(self.totals, code, np.column_stack([stats, won, decided]))
+            np.add.at(self.h2h, (code, opponent, 0), won)
+            np.add.at(self.h2h, (code, opponent, 1), decided)
+            np.add.at(self.ground, (code, g, 0), won)
+            np.add.at(self.ground, (code, g, 1), decided)
+
+    def features(self, team1, team2, ground):
+        """OUTCOME_FEATURES for a batch of fixtures, from the current state"""
+        return pd.DataFrame(self._feature_matrix(*self._codes(team1, team2, ground)),
+                            columns=OUTCOME_FEATURES)
+
+    def update(self, results):
+        """Fold a block of played matches into the state
+
+        Team form is recency weighted: each match a team plays scales its
+        earlier totals by DECAY. Matches without a result add only their
+        runs and balls.
+        """
+        self._grow(pd.concat([results['team1'], results['team2']]), results['ground'])
+        arrays = _match_arrays(results)
+        self._apply(*self._codes(results['team1'], results['team2'], results['ground']), *arrays)
+        return self
+
+def _match_arrays(matches):
+    """(team1 stats, team2 stats, team1_won, decided) as float arrays"""
+    stats = [matches[[f"{side}_{col}" for col in ('runs', 'balls', 'conceded', 'bowled')]]
+             .to_numpy(dtype=float) for side in ('team1', 'team2')]
+    return (stats[0], stats[1], matches['team1_won'].to_numpy(dtype=float),
+            matches['decided'].to_numpy(dtype=float))
+
+def build_training_set(matches, state=None):
+    """Pre-match features for every match, from one pass over the dates
+
+    Matches on the same date see only earlier dates, then update the state
+    together. Pass an existing `state` to continue from earlier history.
+    Returns (features, state).
+    """
+    state = state or TeamStrength()
+    index = matches.index
+    matches = matches.sort_values('date', kind='stable')
+    state._grow(pd.concat([matches['team1'], matches['team2']]), matches['ground'])
+    t1, t2, g = state._codes(matches['team1'], matches['team2'], matches['ground'])
+    stats1, stats2, team1_won, decided = _match_arrays(matches)
+
+    features = np.empty((len(matches), len(OUTCOME_FEATURES)))
+    dates = matches['date'].to_numpy()
+    bounds = np.concatenate([[0], np.flatnonzero(dates[1:] != dates[:-1]) + 1, [len(dates)]])
+    for lo, hi in zip(bounds[:-1], bounds[1:]):
+        block = slice(lo, hi)
+        features[block] = state._feature_matrix(t1[block], t2[block], g[block])
+        state._apply(t1[block], t2[block], g[block], stats1[block], stats2[block],
+                     team1_won[block], decided[block])
+    features = pd.DataFrame(features, index=matches.index, columns=OUTCOME_FEATURES)
+    return features.reindex(index), state
+
+# ------------------------------
+# Training and Time-Ordered Validation
+# ------------------------------
+def _symmetric(X, y):
+    """Add each match again with the teams swapped, so team order carries no signal"""
+    X = np.asarray(X, dtype=float)
+    y = np.asarray(y)
+    return np.vstack([X, -X]), np.concatenate([y, 1 - y])
+
+def _make_model():
+    return make_pipeline(SimpleImputer(strategy='median'), StandardScaler(),
+                         LogisticRegression(C=OUTCOME_SPEC['C']))
+
+def _win_probability(model, X):
+    """P(team1 wins), averaged with 1 - P(team2 wins) from the swapped fixture"""
+    X = np.asarray(X, dtype=float)
+    return (model.predict_proba(X)[:, 1] + 1 - model.predict_proba(-X)[:, 1]) / 2
+
+def time_ordered_cv(X, y, n_splits=5):
+    """Train on earlier matches and score the next block, fold by fold"""
+    X = np.asarray(X, dtype=float)
+    y = np.asarray(y)
+    rows = []
+    for fold, (train, test) in enumerate(TimeSeriesSplit(n_splits=n_splits).split(X)):
+        if len(np.unique(y[train])) < 2:
+            continue
+        model = _make_model().fit(*_symmetric(X[train], y[train]))
+        prob = _win_probability(model, X[test])
+        # Baseline: back the team with the better win rate so far (team1 on ties)
+        baseline = (np.nan_to_num(X[test, OUTCOME_FEATURES.index('win_rate_diff')]) >= 0)
+        rows.append({
+            'fold': fold,
+            'train': len(train),
+            'test': len(test),
+            'accuracy': accuracy_score(y[test], prob >= 0.5),
+            'baseline_accuracy': accuracy_score(y[test], baseline),
+            'log_loss': log_loss(y[test], prob, labels=[0, 1]),
+            'brier': brier_score_loss(y[test], prob)
+        })
+    return pd.DataFrame(rows)
+
+def _train_outcome(X, y):
+    folds = time_ordered_cv(X, y, OUTCOME_SPEC['cv_splits'])
+    model = _make_model().fit(*_symmetric(X, y))
+    metrics = {'cv_folds': folds.to_dict('records')}
+    if len(folds):
+        metrics.update({col: float(folds[col].mean())
+                        for col in ('accuracy', 'baseline_accuracy', 'log_loss', 'brier')})
+    return model, metrics
+
+def train_outcome_model(data_dir, model_dir=None):
+    """Build features, validate and fit (or reuse) the match outcome model
+
+    Returns (model, metadata, state); the state scores future fixtures.
+    """
+    matches = load_matches(data_dir)
+    features, state = build_training_set(matches)
+    decided = matches['decided'].to_numpy()
+    X = features[decided].reset_index(drop=True)
+    y = matches.loc[decided, 'team1_won'].reset_index(drop=True)
+
+    if model_dir is None:
+        model, metrics = _train_outcome(X, y)
+        return model, {'metrics': metrics, 'n_rows': len(X)}, state
+    model, metadata, trained = get_or_train('match_outcome', X, y, _train_outcome,
+                                            spec=OUTCOME_SPEC, model_dir=model_dir)
+    metadata = dict(metadata, status="trained" if trained else "unchanged features, loaded")
+    return model, metadata, state
+
+# ------------------------------
+# Batch Scoring
+# ------------------------------
+def predict_fixtures(model, state, fixtures):
+    """Win probabilities for a table of fixtures (team1, team2, optional ground)
+
+    A team with no match history has no features to score, so its fixtures
+    are returned with no probability or winner and named in `unknown_teams`.
+    """
+    if 'ground' not in fixtures:
+        fixtures = fixtures.assign(ground='')
+    X = state.features(fixtures['team1'], fixtures['team2'], fixtures['ground'])
+    prob = _win_probability(model, X[OUTCOME_FEATURES]) if len(X) else np.empty(0)
+    known1 = fixtures['team1'].isin(state.teams).to_numpy()
+    known2 = fixtures['team2'].isin(state.teams).to_numpy()
+    known = known1 & known2
+    out = fixtures.copy()
+    out['team1_win_prob'] = np.where(known, prob, np.nan)
+    out['predicted_winner'] = np.where(~known, None,
+                                       np.where(prob >= 0.5, fixtures['team1'], fixtures['team2']))
+    out['unknown_teams'] = [
+        ', '.join(t for t, ok in ((t1, k1), (t2, k2)) if not ok)
+        for t1, t2, k1, k2 in zip(fixtures['team1'], fixtures['team2'], known1, known2)
+    ]
+    return out
+
+def all_pairings(state, ground=None):
+    """Every pairing of known teams, as a fixture table"""
+    t1, t2 = np.triu_indices(len(state.teams), k=1)
+    return pd.DataFrame({'team1': state.teams[t1], 'team2': state.teams[t2],
+                         'ground': ground or ''})
+
+def report_outcome(metadata):
+    metrics = metadata['metrics']
+    print("\n=== MATCH OUTCOME MODEL ===")
+    version = f" v{metadata['version']} ({metadata['status']})" if 'version' in metadata else ''
+    print(f"Trained on {metadata['n_rows']} decided matches{version}")
+    folds = pd.DataFrame(metrics.get('cv_folds', []))
+    if not len(folds):
+        print("Not enough matches for time-ordered validation")
+        return
+    print("\nTime-ordered validation (train on earlier matches, test on the next block):")
+    print(folds.round(3).to_string(index=False))
+    print(f"\nMean accuracy {metrics['accuracy']:.3f} (win-rate baseline "
+          f"{metrics['baseline_accuracy']:.3f}), log loss {metrics['log_loss']:.3f}, "
+          f"Brier {metrics['brier']:.3f}")
+
+def report_coefficients(model):
+    print("\nFeature Coefficients (standardized, team1 minus team2):")
+    for feat, coef in zip(OUTCOME_FEATURES, model.named_steps['logisticregression'].coef_[0]):
+        print(f"{feat:>21}: {coef:>7.3f}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train the match outcome model and score fixtures")
+    parser.add_argument('--data-dir', default='.')
+    parser.add_argument('--model-dir', default=None)
+    parser.add_argument('--fixtures', default=None,
+                        help="CSV of upcoming fixtures (team1, team2, optional ground); "
+                             "default: every pairing of known teams")
+    parser.add_argument('--ground', default=None, help="Ground for the default pairings")
+    parser.add_argument('--top', type=int, default=15)
+    args = parser.parse_args(argv)
+
+    model_dir = args.model_dir or os.path.join(args.data_dir, 'models')
+    model, metadata, state = train_outcome_model(args.data_dir, model_dir)
+    report_outcome(metadata)
+    report_coefficients(model)
+
+    fixtures = (pd.read_csv(args.fixtures) if args.fixtures
+                else all_pairings(state, args.ground))
+    start = time.perf_counter()
+    scored = predict_fixtures(model, state, fixtures)
+    elapsed = time.perf_counter() - start
+    print(f"\nScored {len(scored):,} fixtures in {elapsed * 1000:.1f} ms")
+    unknown = scored['unknown_teams'] != ''
+    if unknown.any():
+        names = sorted({t for teams in scored.loc[unknown, 'unknown_teams'] for t in teams.split(', ')})
+        print(f"Not scored: {unknown.sum():,} fixtures with no match history for "
+              f"{', '.join(names)}")
+    scored['confidence'] = (scored['team1_win_prob'] - 0.5).abs()
+    print(scored.sort_values('confidence', ascending=False).head(args.top)
+          [['team1', 'team2', 'ground', 'team1_win_prob', 'predicted_winner']]
+          .round(3).to_string(index=False))
+
+if __name__ == "__main__":
+    main()
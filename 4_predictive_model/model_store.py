@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+"""
+Versioned Model Artifacts and Batch Prediction
+- Saves fitted pipelines with their feature schema and training-data fingerprint
+- Reuses the latest artifact when features and model spec are unchanged
+- predict_batch() loads each model once and scores many players in one call
+- Scoring uses the NumPy export when present, so joblib and scikit-learn are
+  only imported to train or to load artifacts without one
+
+Layout:
+    <model_dir>/<name>/v<N>/model.joblib
+    <model_dir>/<name>/v<N>/model.npz       (NumPy-only export, see numpy_inference.py)
+    <model_dir>/<name>/v<N>/metadata.json
+    <model_dir>/<name>/LATEST
+"""
+
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from numpy_inference import NPZ_FILE, NumpyModel, export_pipeline
+
+DEFAULT_MODEL_DIR = 'models'
+
+_loaded = {}
+
+# ------------------------------
+# Fingerprints
+# ------------------------------
+def data_fingerprint(X, y=None, spec=None):
+    """Hash of the training features, target and model specification"""
+    digest = hashlib.sha256()
+    digest.update(json.dumps([str(c) for c in X.columns]).encode())
+    digest.update(pd.util.hash_pandas_object(X, index=False).values.tobytes())
+    if y is not None:
+        digest.update(pd.util.hash_pandas_object(y, index=False).values.tobytes())
+    if spec is not None:
+        digest.update(json.dumps(spec, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+def feature_schema(X):
+    """Ordered feature names and dtypes"""
+    return [{'name': str(col), 'dtype': str(dtype)} for col, dtype in X.dtypes.items()]
+
+# ------------------------------
+# Artifact Storage
+# ------------------------------
+def latest_version(name, model_dir=DEFAULT_MODEL_DIR):
+    path = os.path.join(model_dir, name, 'LATEST')
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return int(f.read().strip())
+
+def _version_dir(name, version, model_dir):
+    return os.path.join(model_dir, name, f"v{version}")
+
+def read_metadata(name, version=None, model_dir=DEFAULT_MODEL_DIR):
+    version = version if version is not None else latest_version(name, model_dir)
+    if version is None:
+        return None
+    path = os.path.join(_version_dir(name, version, model_dir), 'metadata.json')
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+def save_artifact(name, model, X, target, fingerprint, metrics=None,
+                  model_dir=DEFAULT_MODEL_DIR):
+    """Write a new artifact version and point LATEST at it"""
+    import joblib
+    import sklearn
+    version = (latest_version(name, model_dir) or 0) + 1
+    out_dir = _version_dir(name, version, model_dir)
+    os.makedirs(out_dir, exist_ok=True)
+    joblib.dump(model, os.path.join(out_dir, 'model.joblib'))
+    try:
+        export_pipeline(model, os.path.join(out_dir, NPZ_FILE), [str(c) for c in X.columns])
+        numpy_export = True
+    except ValueError:
+        numpy_export = False   # step types without a NumPy scorer
+    metadata = {
+        'name': name,
+        'version': version,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'features': feature_schema(X),
+        'target': target,
+        'fingerprint': fingerprint,
+        'n_rows': int(len(X)),
+        'sklearn_version': sklearn.__version__,
+        'numpy_export': numpy_export,
+        'metrics': metrics or {}
+    }
+    with open(os.path.join(out_dir, 'metadata.json'), 'w') as f:
+        json.dump(metadata, f, indent=2)
+    latest = os.path.join(model_dir, name, 'LATEST')
+    with open(latest + '.tmp', 'w') as f:
+        f.write(str(version))
+    os.replace(latest + '.tmp', latest)
+    return metadata
+
+def load_artifact(name, version=None, model_dir=DEFAULT_MODEL_DIR, pipeline=False):
+    """Load (model, metadata), caching each version in memory
+
+    The model is a NumpyModel when the version has a NumPy export, unless
+    `pipeline` asks for the fitted scikit-learn pipeline (needed for
+    anything beyond predict, e.g. coefficients or predict_proba).
+    """
+    version = version if version is not None else latest_version(name, model_dir)
+    if version is None:
+        raise FileNotFoundError(f"No saved '{name}' model in {model_dir}")
+    out_dir = _version_dir(name, version, model_dir)
+    use_numpy = not pipeline and os.path.exists(os.path.join(out_dir, NPZ_FILE))
+    key = (os.path.abspath(model_dir), name, version, use_numpy)
+    if key not in _loaded:
+        metadata = read_metadata(name, version, model_dir)
+        if use_numpy:
+            model = NumpyModel(os.path.join(out_dir, NPZ_FILE))
+        else:
+            import joblib
+            model = joblib.load(os.path.join(out_dir, 'model.joblib'))
+        _loaded[key] = (model, metadata)
+    return _loaded[key]
+
+def get_or_train(name, X, y, train_fn, spec=None, model_dir=DEFAULT_MODEL_DIR):
+    """Return (model, metadata, trained) reusing the latest artifact when valid
+
+    `train_fn(X, y)` must return (fitted_model, metrics_dict). The latest
+    artifact is reused only if it was built from identical features, target
+    and spec with the installed scikit-learn version. The model returned is
+    always the scikit-learn pipeline.
+    """
+    import sklearn
+    fingerprint = data_fingerprint(X, y, spec)
+    metadata = read_metadata(name, model_dir=model_dir)
+    if (metadata is not None
+            and metadata['fingerprint'] == fingerprint
+            and metadata['sklearn_version'] == sklearn.__version__):
+        model, metadata = load_artifact(name, metadata['version'], model_dir, pipeline=True)
+        return model, metadata, False
+
+    model, metrics = train_fn(X, y)
+    metadata = save_artifact(name, model, X, y.name, fingerprint, metrics, model_dir)
+    _loaded[(os.path.abspath(model_dir), name, metadata['version'], False)] = (model, metadata)
+    return model, metadata, True
+
+# ------------------------------
+# Batch Prediction
+# ------------------------------
+def predict_batch(features, name, model_dir=DEFAULT_MODEL_DIR, version=None):
+    """Score every row of a feature table with a saved model in one call
+
+    `features` needs the columns listed in the artifact's feature schema
+    (extra columns are ignored). Missing values are imputed by the saved
+    pipeline (or its NumPy export). Returns a Series aligned with `features.index`.
+    """
+    model, metadata = load_artifact(name, version, model_dir)
+    columns = [f['name'] for f in metadata['features']]
+    missing = [c for c in columns if c not in features.columns]
+    if missing:
+        raise KeyError(f"Features missing for '{name}' model: {', '.join(missing)}")
+    X = features[columns].to_numpy(dtype=float)
+    predictions = model.predict(X) if len(X) else np.empty(0)
+    return pd.Series(predictions, index=features.index, name=f"predicted_{metadata['target']}")
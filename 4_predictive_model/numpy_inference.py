@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+"""
+NumPy-Only Inference for Fitted Pipelines
+- Exports imputer + LinearRegression and StandardScaler + KMeans pipelines
+  to a compact .npz array artifact
+- NumpyModel scores those artifacts with NumPy alone (no scikit-learn,
+  joblib or pandas import), giving the same predictions as the pipeline
+
+Usage:
+    python numpy_inference.py --model-dir ../data_collection_and_cleaning_output/models
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+NPZ_FILE = 'model.npz'
+
+# Fitted attributes kept for each supported step type
+STEP_ARRAYS = {
+    'SimpleImputer': ['statistics_'],
+    'StandardScaler': ['mean_', 'scale_'],
+    'LinearRegression': ['coef_', 'intercept_'],
+    'KMeans': ['cluster_centers_'],
+    'MiniBatchKMeans': ['cluster_centers_']
+}
+
+# ------------------------------
+# Export (reads fitted attributes; does not import scikit-learn)
+# ------------------------------
+def export_pipeline(model, path, feature_names=None):
+    """Write a fitted pipeline or single estimator as a NumPy artifact"""
+    steps = [step for _, step in model.steps] if hasattr(model, 'steps') else [model]
+    spec = {'steps': [], 'features': list(feature_names) if feature_names is not None else None}
+    arrays = {}
+    for i, step in enumerate(steps):
+        kind = type(step).__name__
+        if kind not in STEP_ARRAYS:
+            raise ValueError(f"Cannot export step of type {kind}")
+        if kind == 'SimpleImputer' and step.strategy not in ('median', 'mean', 'most_frequent',
+                                                             'constant'):
+            raise ValueError(f"Unsupported imputer strategy: {step.strategy}")
+        entry = {'type': kind}
+        if kind == 'StandardScaler':
+            entry.update(with_mean=bool(step.with_mean), with_std=bool(step.with_std))
+        if kind == 'SimpleImputer':
+            entry['keep_empty_features'] = bool(getattr(step, 'keep_empty_features', False))
+        spec['steps'].append(entry)
+        for attr in STEP_ARRAYS[kind]:
+            value = getattr(step, attr)
+            if value is not None:
+                arrays[f"step{i}_{attr}"] = np.asarray(value, dtype=float)
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = path + '.tmp.npz'
+    np.savez(tmp, __spec__=np.array(json.dumps(spec)), **arrays)
+    os.replace(tmp, path)
+    return path
+
+# ------------------------------
+# NumPy Scorer
+# ------------------------------
+class NumpyModel:
+    """Applies an exported pipeline with NumPy array operations only"""
+
+    def __init__(self, path):
+        with np.load(path, allow_pickle=False) as data:
+            self.spec = json.loads(str(data['__spec__']))
+            self.arrays = {k: data[k] for k in data.files if k != '__spec__'}
+        self.features = self.spec['features']
+
+    def _get(self, i, attr):
+        return self.arrays.get(f"step{i}_{attr}")
+
+    def _transform(self, X, steps):
+        for i, step in steps:
+            kind = step['type']
+            if kind == 'SimpleImputer':
+                stats = self._get(i, 'statistics_')
+                if not step['keep_empty_features']:
+                    # The fitted imputer drops columns that were entirely missing
+                    keep = ~np.isnan(stats)
+                    X, stats = X[:, keep], stats[keep]
+                X = np.where(np.isnan(X), stats, X)
+            elif kind == 'StandardScaler':
+                if step['with_mean']:
+                    X = X - self._get(i, 'mean_')
+                if step['with_std']:
+                    X = X / self._get(i, 'scale_')
+        return X
+
+    def _last(self):
+        steps = list(enumerate(self.spec['steps']))
+        return steps[:-1], steps[-1]
+
+    def _as_array(self, X):
+        if hasattr(X, 'columns') and self.features is not None:
+            X = X[self.features]
+        return np.asarray(X, dtype=float)
+
+    def predict(self, X):
+        """Regression values, or cluster labels for a KMeans artifact"""
+        head, (i, last) = self._last()
+        X = self._transform(self._as_array(X), head)
+        if last['type'] == 'LinearRegression':
+            return X @ self._get(i, 'coef_') + self._get(i, 'intercept_')
+        if last['type'] in ('KMeans', 'MiniBatchKMeans'):
+            centers = self._get(i, 'cluster_centers_')
+            dist = ((X ** 2).sum(axis=1)[:, None] - 2 * X @ centers.T
+                    + (centers ** 2).sum(axis=1)[None, :])
+            return dist.argmin(axis=1).astype(np.int32)
+        return X
+
+def latest_path(name, model_dir, version=None):
+    """Path of a model_store artifact's NumPy export (LATEST unless given)"""
+    if version is None:
+        with open(os.path.join(model_dir, name, 'LATEST')) as f:
+            version = int(f.read().strip())
+    return os.path.join(model_dir, name, f"v{version}", NPZ_FILE)
+
+def load_model(name, model_dir, version=None):
+    return NumpyModel(latest_path(name, model_dir, version))
+
+# ------------------------------
+# Verification and Footprint
+# ------------------------------
+def _child_footprint(code):
+    """Wall time and peak RSS (MB) of a fresh interpreter running `code`"""
+    # VmHWM is reset by exec, unlike ru_maxrss which keeps the parent's peak
+    probe = (f"import time; t = time.perf_counter(); {code}; "
+             "hwm = [l for l in open('/proc/self/status') if l.startswith('VmHWM')]; "
+             "print(time.perf_counter() - t, int(hwm[0].split()[1]) / 1024)")
+    out = subprocess.run([sys.executable, '-c', probe], capture_output=True, text=True,
+                         check=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+    seconds, mb = out.stdout.split()
+    return float(seconds), float(mb)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export saved models and check NumPy scoring")
+    parser.add_argument('--model-dir', default='models')
+    parser.add_argument('--names', nargs='+', default=['batting', 'bowling'])
+    parser.add_argument('--rows', type=int, default=100_000, help="Random rows to compare on")
+    args = parser.parse_args(argv)
+
+    from model_store import load_artifact   # scikit-learn only needed for the check
+    rng = np.random.default_rng(0)
+    print("\n=== NUMPY INFERENCE CHECK ===")
+    for name in args.names:
+        model, metadata = load_artifact(name, model_dir=args.model_dir, pipeline=True)
+        path = latest_path(name, args.model_dir, metadata['version'])
+        if not os.path.exists(path):
+            export_pipeline(model, path, [f['name'] for f in metadata['features']])
+        fast = NumpyModel(path)
+
+        X = rng.gamma(2.0, 20.0, size=(args.rows, len(metadata['features'])))
+        X[rng.random(X.shape) < 0.05] = np.nan
+        start = time.perf_counter()
+        expected = model.predict(X)
+        sk_time = time.perf_counter() - start
+        start = time.perf_counter()
+        got = fast.predict(X)
+        np_time = time.perf_counter() - start
+        print(f"{name:>8} v{metadata['version']}: max abs diff {np.abs(expected - got).max():.2e} "
+              f"over {args.rows:,} rows; sklearn {sk_time * 1000:.1f} ms, numpy {np_time * 1000:.1f} ms "
+              f"({os.path.getsize(path):,} bytes)")
+
+    sk = _child_footprint("import joblib, sklearn.pipeline, sklearn.linear_model, "
+                          "sklearn.impute, sklearn.cluster")
+    npy = _child_footprint("import numpy_inference")
+    print(f"\nImport: scikit-learn path {sk[0]:.2f}s / {sk[1]:.0f} MB peak, "
+          f"NumPy path {npy[0]:.2f}s / {npy[1]:.0f} MB peak")
+
+if __name__ == "__main__":
+    main()
@@ -7,16 +7,24 @@ Enhanced Cricket Performance Analytics Pipeline
 """
 
 import pandas as pd
-import numpy as np
 from sklearn.linear_model import LinearRegression
-from sklearn.cluster import KMeans
-from sklearn.preprocessing import StandardScaler
 from sklearn.impute import SimpleImputer
 from sklearn.model_selection import train_test_split
 from sklearn.pipeline import make_pipeline
-import matplotlib.pyplot as plt
-import seaborn as sns
-import re
+import os
+import sys
+
+# Shared figure pipeline and backends live with the analysis scripts
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..', '3_data_analysis_and_visualization'))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from backends import get_backend, backend_of
+from figure_pipeline import figure_job, render_figures, report_render
+from model_store import get_or_train
+from cluster_selection import select_clusters, report_selection
+from evaluation import cross_validate_models
+from numpy_inference import export_pipeline
+from instrumentation import span
 
 # ------------------------------
 # 1. Data Loading with Robust Cleaning
@@ -38,71 +46,57 @@ def load_player_data(filepath):
         'bowlingstyle': 'bowlingStyle'
     })
 
-def safe_numeric_conversion(series):
-    """Convert series to numeric with advanced cleaning"""
-    if series.dtype == object:
-        series = series.astype(str).apply(
-            lambda x: re.sub(r'(\d+\.\d+)\.\d+', r'\1', x) if pd.notna(x) else x
-        )
-    return pd.to_numeric(series, errors='coerce')
+BATTING_RENAMES = {'out/not_out': 'dismissal'}
 
-def load_batting_data(filepath):
+def load_batting_data(filepath, backend=None, columns=None):
     """Load batting data with rigorous numeric validation"""
-    df = pd.read_csv(filepath)
-    df.columns = df.columns.str.strip().str.lower()
-    
-    # Clean and convert numeric columns
+    backend = get_backend(backend)
+    df = backend.scan(filepath, renames=BATTING_RENAMES, columns=columns)
+    return clean_batting_data(df, backend)
+
+def clean_batting_data(df, backend=None):
+    """Clean and convert numeric batting columns"""
     numeric_cols = ['runs', 'balls', '4s', '6s', 'sr']
-    for col in numeric_cols:
-        if col in df.columns:
-            df[col] = safe_numeric_conversion(df[col])
-    
-    return df.rename(columns={'out/not_out': 'dismissal'})
+    return get_backend(backend).to_numeric(df, numeric_cols, fix_versions=True)
 
-def load_bowling_data(filepath):
+def load_bowling_data(filepath, backend=None, columns=None):
     """Load bowling data with economy rate validation"""
-    df = pd.read_csv(filepath)
-    df.columns = df.columns.str.strip().str.lower()
-    
-    # Special handling for economy rate
-    if 'economy' in df.columns:
-        df['economy'] = safe_numeric_conversion(df['economy'])
-        # Validate reasonable range
-        df['economy'] = df['economy'].clip(0, 20)  # Assume economy between 0-20
-    
-    return df
+    backend = get_backend(backend)
+    df = backend.scan(filepath, columns=columns)
+    return clean_bowling_data(df, backend)
+
+def clean_bowling_data(df, backend=None):
+    """Special handling for economy rate; assume economy between 0-20"""
+    return get_backend(backend).to_numeric(df, ['economy'], fix_versions=True, clip=(0, 20))
 
 # ------------------------------
 # 2. Feature Engineering
 # ------------------------------
+# (source column, aggregation, feature name) per player
+BATTING_AGGREGATES = [
+    ('runs', 'sum', 'total_runs'),
+    ('runs', 'mean', 'avg_runs'),
+    ('balls', 'sum', 'balls_faced'),
+    ('sr', 'mean', 'strike_rate'),
+    ('4s', 'sum', 'fours'),
+    ('6s', 'sum', 'sixes'),
+    ('match_id', 'count', 'innings_played')
+]
+BOWLING_AGGREGATES = [
+    ('wickets', 'sum', 'total_wickets'),
+    ('economy', 'mean', 'avg_economy'),
+    ('overs', 'sum', 'overs_bowled'),
+    ('match_id', 'count', 'matches_played')
+]
+
 def create_features(batting, bowling):
     """Generate performance metrics for analysis"""
     # Batting features
-    batting_features = batting.groupby('batsmanname').agg({
-        'runs': ['sum', 'mean'],
-        'balls': 'sum',
-        'sr': 'mean',
-        '4s': 'sum',
-        '6s': 'sum',
-        'match_id': 'count'
-    })
-    batting_features.columns = [
-        'total_runs', 'avg_runs', 'balls_faced',
-        'strike_rate', 'fours', 'sixes', 'innings_played'
-    ]
+    batting_features = backend_of(batting).group_agg(batting, 'batsmanname', BATTING_AGGREGATES)
     batting_features = batting_features.reset_index()
     
     # Bowling features
-    bowling_features = bowling.groupby('bowlername').agg({
-        'wickets': 'sum',
-        'economy': 'mean',
-        'overs': 'sum',
-        'match_id': 'count'
-    })
-    bowling_features.columns = [
-        'total_wickets', 'avg_economy',
-        'overs_bowled', 'matches_played'
-    ]
+    bowling_features = backend_of(bowling).group_agg(bowling, 'bowlername', BOWLING_AGGREGATES)
     bowling_features = bowling_features.reset_index()
     
     return batting_features, bowling_features
@@ -110,59 +104,95 @@ def create_features(batting, bowling):
 # ------------------------------
 # 3. Regression Models with Missing Value Handling
 # ------------------------------
-def build_regression_models(batting, bowling):
-    """Train predictive models for player performance with proper NaN handling"""
-    print("\n=== PERFORMANCE PREDICTION MODELS ===")
-    
-    # Batting model (predict total runs)
-    X_bat = batting[['innings_played', 'balls_faced', 'strike_rate']].copy()
-    y_bat = batting['total_runs'].copy()
-    
-    # Handle missing values - impute with median
-    imputer = SimpleImputer(strategy='median')
-    X_bat_imputed = imputer.fit_transform(X_bat)
-    
-    # Split data
+BATTING_MODEL_FEATURES = ['innings_played', 'balls_faced', 'strike_rate']
+BOWLING_MODEL_FEATURES = ['matches_played', 'overs_bowled', 'total_wickets']
+REGRESSION_SPEC = {'model': 'LinearRegression', 'imputer': 'median',
+                   'test_size': 0.2, 'random_state': 42, 'cv_folds': 5}
+
+def _train_regression(X, y):
+    """Fit an imputer + LinearRegression pipeline on an 80/20 split
+
+    Missing values are imputed inside the pipeline only, so the medians
+    come from the training rows. R-squared is reported on the holdout and
+    as the mean and spread over k-fold cross-validation.
+    """
     X_train, X_test, y_train, y_test = train_test_split(
-        X_bat_imputed, y_bat, test_size=0.2, random_state=42
+        X, y, test_size=REGRESSION_SPEC['test_size'],
+        random_state=REGRESSION_SPEC['random_state']
     )
     
     # Create pipeline with imputer and model
-    bat_model = make_pipeline(
+    model = make_pipeline(
         SimpleImputer(strategy='median'),
         LinearRegression()
     )
-    bat_model.fit(X_train, y_train)
-    batting['predicted_runs'] = bat_model.predict(X_bat_imputed)
+    model.fit(X_train, y_train)
+    
+    cv, _ = cross_validate_models(X, y, ['linear'], n_splits=REGRESSION_SPEC['cv_folds'],
+                                  n_jobs=1, seed=REGRESSION_SPEC['random_state'])
+    return model, {'r2': float(model.score(X_test, y_test)),
+                   'cv_r2_mean': float(cv['r2_mean'].iloc[0]),
+                   'cv_r2_std': float(cv['r2_std'].iloc[0])}
+
+def _fit_regression(name, X, y, model_dir=None):
+    """Train a regression model, or reuse the saved artifact for unchanged features
+
+    Returns (model, metadata); only the metrics are set when no model_dir
+    is given and nothing is persisted.
+    """
+    if model_dir is None:
+        with span('fit', model=name, rows=len(X)):
+            model, metrics = _train_regression(X.to_numpy(dtype=float), y)
+        return model, {'metrics': metrics}
+    
+    with span('fit', model=name, rows=len(X)) as info:
+        model, metadata, trained = get_or_train(
+            name, X, y,
+            lambda features, target: _train_regression(features.to_numpy(dtype=float), target),
+            spec=REGRESSION_SPEC, model_dir=model_dir
+        )
+        info['trained'] = trained
+    status = "trained" if trained else "unchanged features, loaded"
+    print(f"\n{name} model v{metadata['version']} ({status})")
+    return model, metadata
+
+def _print_r2(metrics):
+    print(f"R-squared: {metrics['r2']:.3f} (holdout)")
+    if 'cv_r2_mean' in metrics:
+        print(f"{REGRESSION_SPEC['cv_folds']}-fold CV R-squared: "
+              f"{metrics['cv_r2_mean']:.3f} ± {metrics['cv_r2_std']:.3f}")
+
+def build_regression_models(batting, bowling, model_dir=None):
+    """Train predictive models for player performance with proper NaN handling
+
+    With a `model_dir`, fitted pipelines are saved as versioned artifacts
+    and only retrained when the features change.
+    """
+    print("\n=== PERFORMANCE PREDICTION MODELS ===")
+    
+    # Batting model (predict total runs)
+    X_bat = batting[BATTING_MODEL_FEATURES].copy()
+    y_bat = batting['total_runs'].copy()
+    
+    bat_model, bat_meta = _fit_regression('batting', X_bat, y_bat, model_dir)
+    batting['predicted_runs'] = bat_model.predict(X_bat.to_numpy(dtype=float))
     
     print("\nBatting Model Results:")
-    print(f"R-squared: {bat_model.score(X_test, y_test):.3f}")
+    _print_r2(bat_meta['metrics'])
     print("Feature Coefficients:")
     coefs = bat_model.named_steps['linearregression'].coef_
     for feat, coef in zip(X_bat.columns, coefs):
         print(f"{feat:>15}: {coef:>7.2f}")
     
     # Bowling model (predict economy rate)
-    X_bowl = bowling[['matches_played', 'overs_bowled', 'total_wickets']].copy()
+    X_bowl = bowling[BOWLING_MODEL_FEATURES].copy()
     y_bowl = bowling['avg_economy'].copy()
     
-    # Handle missing values
-    X_bowl_imputed = imputer.fit_transform(X_bowl)
-    
-    # Split data
-    X_train_bowl, X_test_bowl, y_train_bowl, y_test_bowl = train_test_split(
-        X_bowl_imputed, y_bowl, test_size=0.2, random_state=42
-    )
-    
-    bowl_model = make_pipeline(
-        SimpleImputer(strategy='median'),
-        LinearRegression()
-    )
-    bowl_model.fit(X_train_bowl, y_train_bowl)
-    bowling['predicted_economy'] = bowl_model.predict(X_bowl_imputed)
+    bowl_model, bowl_meta = _fit_regression('bowling', X_bowl, y_bowl, model_dir)
+    bowling['predicted_economy'] = bowl_model.predict(X_bowl.to_numpy(dtype=float))
     
     print("\nBowling Model Results:")
-    print(f"R-squared: {bowl_model.score(X_test_bowl, y_test_bowl):.3f}")
+    _print_r2(bowl_meta['metrics'])
     print("Feature Coefficients:")
     bowl_coefs = bowl_model.named_steps['linearregression'].coef_
     for feat, coef in zip(X_bowl.columns, bowl_coefs):
@@ -173,16 +203,26 @@ def build_regression_models(batting, bowling):
 # ------------------------------
 # 4. Player Clustering
 # ------------------------------
-def cluster_players(batting, bowling):
-    """Identify player segments using K-means with proper scaling"""
+BATTING_CLUSTER_FEATURES = ['strike_rate', 'avg_runs', 'sixes']
+BOWLING_CLUSTER_FEATURES = ['avg_economy', 'total_wickets']
+
+def cluster_players(batting, bowling, figures=None, k_range=range(2, 9), n_jobs=None,
+                    model_dir=None):
+    """Identify player segments using K-means with proper scaling
+
+    The number of clusters is chosen per table on its fixed feature set by
+    cluster_selection.select_clusters over `k_range`. With a `model_dir`
+    the chosen scaler + KMeans pipelines are exported for NumPy-only
+    scoring. If a `figures` list is given the plot job is queued on it for
+    batch rendering; otherwise it is rendered immediately.
+    """
     print("\n=== PLAYER SEGMENTATION ===")
     
-    # Batting clusters - drop rows with missing values
-    bat_features = batting[['strike_rate', 'avg_runs', 'sixes']].dropna()
-    bat_scaled = StandardScaler().fit_transform(bat_features)
-    
-    kmeans_bat = KMeans(n_clusters=4, random_state=42)
-    batting.loc[bat_features.index, 'cluster'] = kmeans_bat.fit_predict(bat_scaled)
+    # Batting clusters - rows with missing values are left unclustered
+    with span('fit', model='batting_clusters', rows=len(batting)):
+        bat_selection = select_clusters(batting, BATTING_CLUSTER_FEATURES, k_range, n_jobs=n_jobs)
+    report_selection(bat_selection, 'Batting')
+    batting.loc[bat_selection['labels'].index, 'cluster'] = bat_selection['labels']
     
     print("\nBatting Clusters Profile:")
     print(batting.groupby('cluster').agg({
@@ -191,59 +231,84 @@ def cluster_players(batting, bowling):
         'sixes': 'mean'
     }).round(2))
     
-    # Bowling clusters - drop rows with missing values
-    bowl_features = bowling[['avg_economy', 'total_wickets']].dropna()
-    bowl_scaled = StandardScaler().fit_transform(bowl_features)
-    
-    kmeans_bowl = KMeans(n_clusters=3, random_state=42)
-    bowling.loc[bowl_features.index, 'cluster'] = kmeans_bowl.fit_predict(bowl_scaled)
+    # Bowling clusters
+    with span('fit', model='bowling_clusters', rows=len(bowling)):
+        bowl_selection = select_clusters(bowling, BOWLING_CLUSTER_FEATURES, k_range, n_jobs=n_jobs)
+    report_selection(bowl_selection, 'Bowling')
+    bowling.loc[bowl_selection['labels'].index, 'cluster'] = bowl_selection['labels']
     
-    # Visualization
-    plt.figure(figsize=(15,6))
+    if model_dir is not None:
+        with span('write', artifacts='clusters'):
+            for name, selection in [('batting', bat_selection), ('bowling', bowl_selection)]:
+                export_pipeline(selection['model'],
+                                os.path.join(model_dir, 'clusters', f"{name}.npz"),
+                                selection['features'])
+            # Per-player assignments, charted live by the dashboard
+            for name, table, cols in [
+                ('batting', batting, ['batsmanname'] + BATTING_CLUSTER_FEATURES),
+                ('bowling', bowling, ['bowlername'] + BOWLING_CLUSTER_FEATURES)
+            ]:
+                path = os.path.join(model_dir, 'clusters', f"{name}_players.parquet")
+                assigned = table.dropna(subset=['cluster'])[cols + ['cluster']]
+                assigned.astype({'cluster': 'int32'}).to_parquet(path + '.tmp', index=False)
+                os.replace(path + '.tmp', path)
     
-    plt.subplot(1,2,1)
-    sns.scatterplot(data=batting.dropna(subset=['cluster']), 
-                    x='strike_rate', y='avg_runs',
-                    hue='cluster', palette='viridis', s=100)
-    plt.title("Batsmen Clusters", fontsize=14)
-    
-    plt.subplot(1,2,2)
-    sns.scatterplot(data=bowling.dropna(subset=['cluster']), 
-                    x='avg_economy', y='total_wickets',
-                    hue='cluster', palette='rocket', s=100)
-    plt.title("Bowler Clusters", fontsize=14)
+    # Visualization (skipped when clusters and parameters are unchanged)
+    job = figure_job(
+        'player_clusters.png', 'cluster_panels',
+        {
+            'batting': batting.dropna(subset=['cluster'])[
+                ['strike_rate', 'avg_runs', 'cluster']].reset_index(drop=True),
+            'bowling': bowling.dropna(subset=['cluster'])[
+                ['avg_economy', 'total_wickets', 'cluster']].reset_index(drop=True)
+        },
+        bbox_inches='tight',
+        panels=[
+            {'data': 'batting', 'x': 'strike_rate', 'y': 'avg_runs',
+             'palette': 'viridis', 'title': 'Batsmen Clusters'},
+            {'data': 'bowling', 'x': 'avg_economy', 'y': 'total_wickets',
+             'palette': 'rocket', 'title': 'Bowler Clusters'}
+        ]
+    )
+    if figures is not None:
+        figures.append(job)
+    else:
+        print()
+        report_render(render_figures([job], n_jobs=1))
     
-    plt.tight_layout()
-    plt.savefig('player_clusters.png', dpi=300, bbox_inches='tight')
-    print("\nSaved cluster visualization: player_clusters.png")
+    return batting, bowling
 
 # ------------------------------
 # Main Execution
 # ------------------------------
-def main():
+def main(data_dir='.', backend=None, model_dir=None):
     print("Cricket Analytics Pipeline Started")
     
     try:
         # Load and clean data
         print("\n[1/4] Loading and validating data...")
-        matches = load_match_data('dim_match_summary.csv')
-        players = load_player_data('dim_players_no_images.csv')
-        batting = load_batting_data('fact_batting_summary.csv')
-        bowling = load_bowling_data('fact_bowling_summary.csv')
+        with span('load', tables='matches,players,batting,bowling'):
+            matches = load_match_data(os.path.join(data_dir, 'dim_match_summary.csv'))
+            players = load_player_data(os.path.join(data_dir, 'dim_players_no_images.csv'))
+            batting = load_batting_data(os.path.join(data_dir, 'fact_batting_summary.csv'), backend)
+            bowling = load_bowling_data(os.path.join(data_dir, 'fact_bowling_summary.csv'), backend)
         
         # Feature engineering
         print("[2/4] Creating performance features...")
-        batting_features, bowling_features = create_features(batting, bowling)
+        with span('aggregate', step='features'):
+            batting_features, bowling_features = create_features(batting, bowling)
         
         # Predictive modeling
         print("[3/4] Building regression models...")
         batting_pred, bowling_pred = build_regression_models(
-            batting_features, bowling_features
+            batting_features, bowling_features,
+            model_dir=model_dir or os.path.join(data_dir, 'models')
         )
         
         # Player segmentation
         print("[4/4] Clustering players...")
-        cluster_players(batting_pred, bowling_pred)
+        cluster_players(batting_pred, bowling_pred,
+                        model_dir=model_dir or os.path.join(data_dir, 'models'))
         
         print("\nPipeline executed successfully!")
         print("Outputs generated:")
@@ -251,7 +316,7 @@ def main():
         print("- Player cluster visualization (player_clusters.png)")
         
     except Exception as e:
-        print(f"\nERROR: {str(e)}")
+        print(f"\nERROR: {type(e).__name__}: {str(e)}")
         print("\nTroubleshooting steps:")
         print("1. Verify all input files exist")
         print("2. Check for malformed numeric values in CSVs")
@@ -259,4 +324,4 @@ def main():
         raise
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main(sys.argv[1] if len(sys.argv) > 1 else '.')
\ No newline at end of file
@@ -0,0 +1,312 @@
+# -*- coding: utf-8 -*-
+"""
+Local Micro-Batching Prediction Server
+- Keeps the batting and bowling models and feature tables in memory
+- Merges concurrent requests into micro-batches for one vectorized predict call
+- Reports p50/p99 latency, throughput and batch-size metrics at /metrics
+- Standard library HTTP server only; runs fully offline
+
+Usage:
+    python prediction_server.py --data-dir ../data_collection_and_cleaning_output --port 8765
+
+Endpoints:
+    POST /predict/batting   {"players": ["Virat Kohli"]}  or  {"rows": [{...features...}]}
+    POST /predict/bowling   (same body shapes)
+    GET  /metrics
+    GET  /health
+"""
+
+import argparse
+import json
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+import predict
+from model_store import load_artifact, predict_batch
+
+MODELS = {
+    'batting': {'key': 'batsmanname', 'builder': 'batting'},
+    'bowling': {'key': 'bowlername', 'builder': 'bowling'}
+}
+
+# ------------------------------
+# Model State
+# ------------------------------
+def load_state(data_dir, model_dir=None):
+    """Feature tables indexed by player and the saved models (trained if absent)"""
+    model_dir = model_dir or os.path.join(data_dir, 'models')
+    batting = predict.load_batting_data(os.path.join(data_dir, 'fact_batting_summary.csv'))
+    bowling = predict.load_bowling_data(os.path.join(data_dir, 'fact_bowling_summary.csv'))
+    batting_features, bowling_features = predict.create_features(batting, bowling)
+
+    # Trains and saves only when no artifact matches the current features
+    predict.build_regression_models(batting_features.copy(), bowling_features.copy(),
+                                    model_dir=model_dir)
+    return {
+        'model_dir': model_dir,
+        'features': {
+            'batting': batting_features.set_index('batsmanname'),
+            'bowling': bowling_features.set_index('bowlername')
+        },
+        'versions': {name: load_artifact(name, model_dir=model_dir)[1]['version']
+                     for name in MODELS}
+    }
+
+# ------------------------------
+# Metrics
+# ------------------------------
+class Metrics:
+    """Rolling latency, throughput and batch-size statistics"""
+
+    def __init__(self, window=10000):
+        self.lock = threading.Lock()
+        self.latencies = deque(maxlen=window)
+        self.batch_sizes = deque(maxlen=window)
+        self.completed = deque(maxlen=window)
+        self.requests = 0
+        self.rows = 0
+        self.errors = 0
+        self.started = time.time()
+
+    def record_request(self, latency, rows, ok=True):
+        with self.lock:
+            self.latencies.append(latency)
+            self.completed.append(time.time())
+            self.requests += 1
+            self.rows += rows
+            self.errors += 0 if ok else 1
+
+    def record_batch(self, size):
+        with self.lock:
+            self.batch_sizes.append(size)
+
+    def snapshot(self):
+        with self.lock:
+            latencies = np.array(self.latencies) * 1000
+            batches = np.array(self.batch_sizes)
+            now = time.time()
+            recent = [t for t in self.completed if now - t <= 10]
+        return {
+            'uptime_s': round(now - self.started, 1),
+            'requests': self.requests,
+            'rows_scored': self.rows,
+            'errors': self.errors,
+            'latency_ms': {
+                'p50': float(np.percentile(latencies, 50)) if len(latencies) else None,
+                'p99': float(np.percentile(latencies, 99)) if len(latencies) else None,
+                'max': float(latencies.max()) if len(latencies) else None
+            },
+            'throughput_rps_10s': round(len(recent) / 10, 2),
+            'batches': {
+                'count': int(len(batches)),
+                'mean_size': float(batches.mean()) if len(batches) else None,
+                'max_size': int(batches.max()) if len(batches) else None
+            }
+        }
+
+# ------------------------------
+# Micro-Batcher
+# ------------------------------
+class MicroBatcher:
+    """Collects requests for one model and scores them together
+
+    A request waits at most `max_wait_ms` for others to join its batch; a
+    batch is flushed early once it holds `max_batch_rows` rows.
+    """
+
+    def __init__(self, name, model_dir, metrics, max_batch_rows=4096, max_wait_ms=2.0):
+        self.name = name
+        self.model_dir = model_dir
+        self.metrics = metrics
+        self.max_batch_rows = max_batch_rows
+        self.max_wait = max_wait_ms / 1000
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self._run, name=f"batcher-{name}", daemon=True)
+        self.thread.start()
+
+    def submit(self, frame):
+        future = Future()
+        self.queue.put((frame, future))
+        return future
+
+    def _run(self):
+        while True:
+            items = [self.queue.get()]
+            rows = len(items[0][0])
+            deadline = time.perf_counter() + self.max_wait
+            while rows < self.max_batch_rows:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self.queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                items.append(item)
+                rows += len(item[0])
+            self._score(items)
+
+    def _score(self, items):
+        frames = [frame for frame, _ in items]
+        try:
+            batch = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+            predictions = predict_batch(batch, self.name, self.model_dir).to_numpy()
+        except Exception as e:
+            if len(items) == 1:
+                items[0][1].set_exception(e)
+                return
+            # Score the requests one at a time so only the failing one errors
+            for item in items:
+                self._score([item])
+            return
+        self.metrics.record_batch(len(items))
+        start = 0
+        for frame, future in items:
+            future.set_result(predictions[start:start + len(frame)])
+            start += len(frame)
+
+# ------------------------------
+# HTTP Handler
+# ------------------------------
+class PredictionHandler(BaseHTTPRequestHandler):
+    server_version = 'T20Predict/1.0'
+
+    def log_message(self, format, *args):
+        pass   # per-request console logging would dominate latency
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == '/health':
+            self._send_json(200, {'status': 'ok', 'models': self.server.state['versions']})
+        elif self.path == '/metrics':
+            self._send_json(200, self.server.metrics.snapshot())
+        else:
+            self._send_json(404, {'error': 'not found'})
+
+    def do_POST(self):
+        start = time.perf_counter()
+        name = self.path.rsplit('/', 1)[-1]
+        if not self.path.startswith('/predict/') or name not in MODELS:
+            self._send_json(404, {'error': 'not found'})
+            return
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            body = json.loads(self.rfile.read(length) or b'{}')
+            frame, labels = self._request_frame(name, body)
+        except (ValueError, KeyError) as e:
+            self.server.metrics.record_request(time.perf_counter() - start, 0, ok=False)
+            self._send_json(400, {'error': str(e.args[0]) if e.args else type(e).__name__})
+            return
+
+        try:
+            predictions = self.server.batchers[name].submit(frame).result(timeout=30)
+        except Exception as e:
+            self.server.metrics.record_request(time.perf_counter() - start, 0, ok=False)
+            self._send_json(500, {'error': f"{type(e).__name__}: {e}"})
+            return
+
+        self._send_json(200, {
+            'model': name,
+            'version': self.server.state['versions'][name],
+            'predictions': [
+                {'player': label, 'prediction': None if np.isnan(value) else float(value)}
+                for label, value in zip(labels, predictions)
+            ]
+        })
+        self.server.metrics.record_request(time.perf_counter() - start, len(frame))
+
+    def _feature_columns(self, name):
+        _, metadata = load_artifact(name, self.server.state['versions'][name],
+                                    self.server.state['model_dir'])
+        return [f['name'] for f in metadata['features']]
+
+    def _request_frame(self, name, body):
+        """Feature rows for a request, from player names or explicit rows
+
+        The body must be an object and `players` a list of names. Explicit rows
+        must carry every model feature as a number (or null, which the model
+        imputes), so one bad request cannot fail a shared micro-batch.
+        """
+        if not isinstance(body, dict):
+            raise ValueError("Request body must be a JSON object")
+        if 'players' in body:
+            players = body['players']
+            if not isinstance(players, list) or not players or not all(isinstance(p, str) for p in players):
+                raise ValueError("'players' must be a non-empty list of names")
+            table = self.server.state['features'][name]
+            unknown = [p for p in players if p not in table.index]
+            if unknown:
+                raise KeyError(f"Unknown player(s): {', '.join(unknown)}")
+            return table.loc[players].reset_index(drop=True), list(players)
+        if 'rows' in body:
+            rows = body['rows']
+            if not isinstance(rows, list) or not rows or not all(isinstance(r, dict) for r in rows):
+                raise ValueError("'rows' must be a non-empty list of objects")
+            frame = pd.DataFrame(rows)
+            columns = self._feature_columns(name)
+            missing = [c for c in columns if c not in frame.columns]
+            if missing:
+                raise ValueError(f"Rows are missing feature(s): {', '.join(missing)}")
+            for col in columns:
+                values = pd.to_numeric(frame[col], errors='coerce')
+                invalid = values.isna() & frame[col].notna()
+                if invalid.any():
+                    raise ValueError(f"Feature '{col}' must be numeric "
+                                     f"(got {frame[col][invalid].iloc[0]!r})")
+                frame[col] = values.astype(float)
+            return frame, [row.get('player') for row in rows]
+        raise ValueError("Request body needs 'players' or 'rows'")
+
+class PredictionServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256   # default of 5 drops bursts of concurrent clients
+
+def make_server(state, host='127.0.0.1', port=8765, max_batch_rows=4096, max_wait_ms=2.0):
+    metrics = Metrics()
+    server = PredictionServer((host, port), PredictionHandler)
+    server.state = state
+    server.metrics = metrics
+    server.batchers = {
+        name: MicroBatcher(name, state['model_dir'], metrics, max_batch_rows, max_wait_ms)
+        for name in MODELS
+    }
+    return server
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve batting/bowling predictions locally")
+    parser.add_argument('--data-dir', default='.')
+    parser.add_argument('--model-dir', default=None)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--max-batch-rows', type=int, default=4096)
+    parser.add_argument('--max-wait-ms', type=float, default=2.0)
+    args = parser.parse_args(argv)
+
+    state = load_state(args.data_dir, args.model_dir)
+    server = make_server(state, args.host, args.port, args.max_batch_rows, args.max_wait_ms)
+    print(f"\nServing predictions on http://{args.host}:{args.port} "
+          f"(models: {state['versions']})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nShutting down...")
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
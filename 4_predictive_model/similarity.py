@@ -0,0 +1,297 @@
+# -*- coding: utf-8 -*-
+"""
+Player Similarity Index
+- Standardized batting and bowling style vectors built from create_features
+- Top-k nearest neighbours by brute-force matrix products for small data,
+  or a KD-tree (scipy) once the index is large
+- Players can be added, changed or removed without rebuilding; the tree is
+  rebuilt only after enough changes accumulate
+- Saved as a small .npz file; querying needs only NumPy and pandas
+
+Usage:
+    python similarity.py --data-dir ../data_collection_and_cleaning_output --player "Virat Kohli"
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+INDEX_FILE = os.path.join('similarity', 'index.npz')
+
+# Indexes up to this size are searched by brute force
+BRUTE_FORCE_MAX = 20_000
+# Rebuild the KD-tree once changes since the last build exceed this share
+REBUILD_FRACTION = 0.1
+
+# ------------------------------
+# Style Vectors
+# ------------------------------
+def player_vectors(batting_features, bowling_features):
+    """One row per player of per-innings / per-match style features
+
+    Rates rather than career totals, so players are compared on how they
+    play and not on how much they have played. Players who never bowled
+    (or batted) get zero for the counting rates and no value for averages.
+    """
+    bat = batting_features.assign(player=batting_features['batsmanname'].str.strip())
+    bat = bat.groupby('player').agg(
+        runs=('total_runs', 'sum'), balls=('balls_faced', 'sum'), fours=('fours', 'sum'),
+        sixes=('sixes', 'sum'), innings=('innings_played', 'sum'),
+        avg_runs=('avg_runs', 'mean'), strike_rate=('strike_rate', 'mean'))
+    bowl = bowling_features.assign(player=bowling_features['bowlername'].str.strip())
+    bowl = bowl.groupby('player').agg(
+        wickets=('total_wickets', 'sum'), overs=('overs_bowled', 'sum'),
+        matches=('matches_played', 'sum'), economy=('avg_economy', 'mean'))
+
+    innings = bat['innings'].where(bat['innings'] > 0)
+    matches = bowl['matches'].where(bowl['matches'] > 0)
+    vectors = pd.DataFrame({
+        'avg_runs': bat['avg_runs'],
+        'strike_rate': bat['strike_rate'],
+        'balls_per_innings': bat['balls'] / innings,
+        'fours_per_innings': bat['fours'] / innings,
+        'sixes_per_innings': bat['sixes'] / innings,
+        'economy': bowl['economy'],
+        'wickets_per_match': bowl['wickets'] / matches,
+        'overs_per_match': bowl['overs'] / matches
+    })
+    counting = ['balls_per_innings', 'fours_per_innings', 'sixes_per_innings',
+                'wickets_per_match', 'overs_per_match']
+    vectors[counting] = vectors[counting].fillna(0)
+    return vectors.sort_index()
+
+# ------------------------------
+# Index
+# ------------------------------
+class SimilarityIndex:
+    """Nearest-neighbour search over standardized player vectors
+
+    Standardization (mean / std per feature) is fixed when the index is
+    built; missing values sit at the feature mean. Rows added after the
+    KD-tree was built are searched by brute force until the next rebuild.
+    """
+
+    def __init__(self, vectors, mean=None, std=None):
+        self.features = list(vectors.columns)
+        values = vectors.to_numpy(dtype=float)
+        self.mean = np.nanmean(values, axis=0) if mean is None else np.asarray(mean, dtype=float)
+        std = np.nanstd(values, axis=0) if std is None else np.asarray(std, dtype=float)
+        self.std = np.where((std > 0) & np.isfinite(std), std, 1.0)
+        self.names = np.asarray(vectors.index, dtype=str)
+        self.raw = values
+        self.scaled = self._scale(values)
+        self.alive = np.ones(len(values), dtype=bool)
+        self.rows = {name: i for i, name in enumerate(self.names)}
+        self._build_tree()
+
+    def _scale(self, values):
+        return np.nan_to_num((values - self.mean) / self.std, nan=0.0)
+
+    def _build_tree(self):
+        """Compact removed rows and (re)build the KD-tree for large indexes"""
+        if not self.alive.all():
+            keep = self.alive
+            self.names, self.raw, self.scaled = self.names[keep], self.raw[keep], self.scaled[keep]
+            self.alive = np.ones(len(self.names), dtype=bool)
+            self.rows = {name: i for i, name in enumerate(self.names)}
+        self.tree = None
+        self.tree_rows = 0
+        if len(self.names) > BRUTE_FORCE_MAX:
+            from scipy.spatial import cKDTree
+            self.tree = cKDTree(self.scaled)
+            self.tree_rows = len(self.names)
+        self.changes = 0
+
+    def __len__(self):
+        return int(self.alive.sum())
+
+    # ------------------------------
+    # Updates
+    # ------------------------------
+    def upsert(self, vectors):
+        """Add new players and replace the vectors of existing ones"""
+        vectors = vectors[self.features]
+        existing = [n for n in vectors.index if n in self.rows]
+        self.remove(existing)
+        self.names = np.concatenate([self.names, np.asarray(vectors.index, dtype=str)])
+        values = vectors.to_numpy(dtype=float)
+        self.raw = np.vstack([self.raw, values])
+        self.scaled = np.vstack([self.scaled, self._scale(values)])
+        self.alive = np.concatenate([self.alive, np.ones(len(values), dtype=bool)])
+        start = len(self.names) - len(values)
+        self.rows.update({name: start + i for i, name in enumerate(vectors.index)})
+        self.changes += len(values)
+        self._maybe_rebuild()
+
+    def remove(self, names):
+        for name in names:
+            row = self.rows.pop(name, None)
+            if row is not None:
+                self.alive[row] = False
+                self.changes += 1
+        self._maybe_rebuild()
+
+    def sync(self, vectors):
+        """Apply only the differences between the index and a fresh vector table
+
+        Returns (changed, removed) player counts.
+        """
+        vectors = vectors[self.features]
+        current = self.vectors().reindex(vectors.index)
+        same = ((current.to_numpy() == vectors.to_numpy())
+                | (current.isna().to_numpy() & vectors.isna().to_numpy())).all(axis=1)
+        changed = vectors[~same]
+        removed = [n for n in self.rows if n not in vectors.index]
+        if len(changed):
+            self.upsert(changed)
+        if removed:
+            self.remove(removed)
+        return len(changed), len(removed)
+
+    def _maybe_rebuild(self):
+        limit = BRUTE_FORCE_MAX if self.tree is None else REBUILD_FRACTION * self.tree_rows
+        if self.changes > limit or (self.tree is None and len(self.names) > BRUTE_FORCE_MAX):
+            self._build_tree()
+
+    def vectors(self):
+        """Current raw vectors of all live players"""
+        return pd.DataFrame(self.raw[self.alive], index=self.names[self.alive],
+                            columns=self.features)
+
+    # ------------------------------
+    # Queries
+    # ------------------------------
+    def _brute(self, X, rows, k):
+        candidates = self.scaled[rows]
+        dist = ((X ** 2).sum(axis=1)[:, None] - 2 * X @ candidates.T
+                + (candidates ** 2).sum(axis=1)[None, :])
+        if k < len(rows):
+            top = np.argpartition(dist, k - 1, axis=1)[:, :k]
+        else:
+            top = np.broadcast_to(np.arange(len(rows)), dist.shape)
+        return np.take_along_axis(dist, top, axis=1), rows[top]
+
+    def _search(self, X, k):
+        """(distances, rows) of the k nearest live rows for each query vector"""
+        parts = []
+        if self.tree is not None:
+            # Ask for a few extra neighbours and widen only if removed rows crowd them out
+            kq = min(2 * k, self.tree_rows)
+            while True:
+                dist, idx = self.tree.query(X, k=kq)
+                dist, idx = dist.reshape(len(X), kq), idx.reshape(len(X), kq)
+                live = self.alive[idx]
+                if kq == self.tree_rows or (live.sum(axis=1) >= k).all():
+                    break
+                kq = min(4 * kq, self.tree_rows)
+            dist = np.where(live, dist ** 2, np.inf)
+            parts.append((dist, idx))
+            rest = np.flatnonzero(self.alive[self.tree_rows:]) + self.tree_rows
+        else:
+            rest = np.flatnonzero(self.alive)
+        if len(rest):
+            parts.append(self._brute(X, rest, k))
+        dist = np.hstack([d for d, _ in parts])
+        idx = np.hstack([i for _, i in parts])
+        order = np.argsort(dist, axis=1, kind='stable')[:, :k]
+        return (np.sqrt(np.clip(np.take_along_axis(dist, order, axis=1), 0, None)),
+                np.take_along_axis(idx, order, axis=1))
+
+    def query(self, players, k=10):
+        """Nearest players to one or more indexed players (themselves excluded)
+
+        Returns a DataFrame with one row per (player, neighbour), ranked by
+        distance in standardized units.
+        """
+        players = [players] if isinstance(players, str) else list(players)
+        unknown = [p for p in players if p not in self.rows]
+        if unknown:
+            raise KeyError(f"Not in similarity index: {', '.join(unknown)}")
+        rows = np.array([self.rows[p] for p in players])
+        dist, idx = self._search(self.scaled[rows], k + 1)
+        out = []
+        for player, row, d, i in zip(players, rows, dist, idx):
+            keep = (i != row) & np.isfinite(d)
+            out.append(pd.DataFrame({
+                'player': player, 'rank': np.arange(1, keep.sum() + 1),
+                'similar_player': self.names[i[keep]], 'distance': d[keep]
+            }).head(k))
+        return pd.concat(out, ignore_index=True)
+
+    def query_vector(self, vector, k=10):
+        """Nearest players to a raw feature vector (dict or Series)"""
+        X = self._scale(pd.Series(vector).reindex(self.features).to_numpy(dtype=float)[None, :])
+        dist, idx = self._search(X, k)
+        keep = np.isfinite(dist[0])
+        return pd.DataFrame({'rank': np.arange(1, keep.sum() + 1),
+                             'similar_player': self.names[idx[0][keep]],
+                             'distance': dist[0][keep]})
+
+    # ------------------------------
+    # Persistence
+    # ------------------------------
+    def save(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        live = self.alive
+        tmp = path + '.tmp.npz'
+        np.savez(tmp, names=self.names[live], raw=self.raw[live], mean=self.mean,
+                 std=self.std, features=np.array(self.features))
+        os.replace(tmp, path)
+        return path
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            vectors = pd.DataFrame(data['raw'], index=data['names'],
+                                   columns=[str(f) for f in data['features']])
+            return cls(vectors, mean=data['mean'], std=data['std'])
+
+def index_path(model_dir):
+    return os.path.join(model_dir, INDEX_FILE)
+
+# ------------------------------
+# Command Line
+# ------------------------------
+def update_index(data_dir, model_dir=None, rebuild=False):
+    """Build the index, or sync the saved one with the current features"""
+    import predict
+    model_dir = model_dir or os.path.join(data_dir, 'models')
+    batting = predict.load_batting_data(os.path.join(data_dir, 'fact_batting_summary.csv'))
+    bowling = predict.load_bowling_data(os.path.join(data_dir, 'fact_bowling_summary.csv'))
+    vectors = player_vectors(*predict.create_features(batting, bowling))
+
+    path = index_path(model_dir)
+    if rebuild or not os.path.exists(path):
+        index = SimilarityIndex(vectors)
+        status = f"built with {len(index)} players"
+    else:
+        index = SimilarityIndex.load(path)
+        changed, removed = index.sync(vectors)
+        status = f"synced: {changed} players added/changed, {removed} removed"
+    index.save(path)
+    return index, status
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build and query the player similarity index")
+    parser.add_argument('--data-dir', default='.')
+    parser.add_argument('--model-dir', default=None)
+    parser.add_argument('--player', action='append', default=[],
+                        help="Player to find look-alikes for (repeatable)")
+    parser.add_argument('-k', type=int, default=5)
+    parser.add_argument('--rebuild', action='store_true')
+    args = parser.parse_args(argv)
+
+    index, status = update_index(args.data_dir, args.model_dir, args.rebuild)
+    print(f"\n=== PLAYER SIMILARITY ===\nIndex {status}")
+    for player in args.player:
+        start = time.perf_counter()
+        result = index.query(player, args.k)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"\nPlayers most like {player} ({elapsed:.2f} ms):")
+        print(result[['rank', 'similar_player', 'distance']].round(3).to_string(index=False))
+
+if __name__ == "__main__":
+    main()
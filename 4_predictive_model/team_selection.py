@@ -0,0 +1,345 @@
+# -*- coding: utf-8 -*-
+"""
+Optimal Playing-XI Selection
+- Values each player's expected match contribution in runs (runs scored,
+  runs saved by economy and wickets) from the aggregates and model predictions,
+  shrunk towards role-based tournament rates for players with few appearances; players
+  below a minimum number of appearances are picked only when a pool needs them
+- Picks the best XI under role, team and budget constraints with an
+  integer program (scipy.optimize.milp)
+- Solves thousands of candidate pools at once by scoring every feasible XI
+  as one matrix product, for what-if analysis
+
+Usage:
+    python team_selection.py --data-dir ../data_collection_and_cleaning_output --team India
+    python team_selection.py --data-dir ../data_collection_and_cleaning_output --team India --what-if 5000
+"""
+
+import argparse
+import contextlib
+import io
+import itertools
+import math
+import os
+import time
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+from scipy.optimize import Bounds, LinearConstraint, milp
+
+DEFAULT_CONSTRAINTS = {
+    'size': 11,
+    'min_keepers': 1,
+    'min_bowlers': 5,       # bowlers and all-rounders who can bowl their overs
+    'min_batters': 5,       # batters, keepers and batting all-rounders
+    'max_per_team': None,   # cap on players from one team (mixed pools)
+    'budget': None          # cap on total cost when a cost column is given
+}
+
+RUNS_PER_WICKET = 20.0
+# Pseudo-observations at the tournament rate added to every player's record,
+# so one good innings or match cannot outweigh a full tournament
+PRIOR_INNINGS = 5
+PRIOR_MATCHES = 5
+PRIOR_OVERS = 10
+# Innings or matches a player needs before selection prefers them on value
+MIN_APPEARANCES = 2
+ROLE_FLAGS = ['keeper', 'bowler', 'batter']
+
+# Pools whose number of possible XIs exceeds this are solved one by one with milp
+MAX_COMBINATIONS = 250_000
+# Upper bound on (pools x combinations) scored in one matrix product
+MAX_BATCH_CELLS = 20_000_000
+
+# ------------------------------
+# Player Values
+# ------------------------------
+def role_flags(roles):
+    """Keeper / bowling option / batter flags from playingRole"""
+    roles = roles.fillna('').str.strip()
+    return pd.DataFrame({
+        'keeper': roles.str.contains('Wicketkeeper'),
+        'bowler': (roles == 'Bowler') | roles.str.contains('Allrounder'),
+        'batter': (roles.str.contains('Batter')
+                   | roles.isin(['Allrounder', 'Batting Allrounder']))
+    }, index=roles.index)
+
+def player_values(players, batting, bowling, runs_per_wicket=RUNS_PER_WICKET):
+    """Expected contribution per match, in runs, for every player
+
+    `batting` and `bowling` are the predict.py feature tables after
+    build_regression_models (with predicted_runs / predicted_economy).
+    Runs saved compare the predicted economy with the overs-weighted
+    average economy of all bowlers. Runs per innings, economy and wickets
+    per match are shrunk towards a prior by sample size (PRIOR_INNINGS,
+    PRIOR_OVERS and PRIOR_MATCHES pseudo-observations). The priors follow
+    the role: specialist bowlers' batting towards the bowlers' rate and
+    everyone else's towards the other players' rate; wickets towards the
+    bowling options' rate, or zero for players who are not one. Batting
+    evidence is counted in balls faced, as innings of tournament-average
+    length, so a one-ball cameo weighs almost nothing. `appearances` is the
+    larger of innings batted and matches bowled in.
+    """
+    bat = batting.assign(name=batting['batsmanname'].str.strip()).groupby('name').agg(
+        predicted_runs=('predicted_runs', 'sum'), innings_played=('innings_played', 'sum'),
+        balls_faced=('balls_faced', 'sum'), avg_runs=('avg_runs', 'mean'))
+    bowl = bowling.assign(name=bowling['bowlername'].str.strip()).groupby('name').agg(
+        predicted_economy=('predicted_economy', 'mean'), avg_economy=('avg_economy', 'mean'),
+        total_wickets=('total_wickets', 'sum'), overs_bowled=('overs_bowled', 'sum'),
+        matches_played=('matches_played', 'sum'))
+
+    table = players.assign(name=players['name'].str.strip())[['name', 'team', 'playingrole']]
+    table = table.drop_duplicates('name').set_index('name')
+    flags = role_flags(table['playingrole'])
+    tail = (flags['bowler'] & ~flags['batter']).reindex(bat.index, fill_value=False)
+    bowls = flags['bowler'].reindex(bowl.index, fill_value=False)
+
+    innings = bat['innings_played'].fillna(0).clip(lower=0)
+    balls = bat['balls_faced'].fillna(0).clip(lower=0)
+    bat_runs = bat['predicted_runs'].where(innings > 0, 0).fillna(0).clip(lower=0)
+    prior_runs = pd.Series(np.where(
+        tail, bat_runs[tail].sum() / max(innings[tail].sum(), 1),
+        bat_runs[~tail].sum() / max(innings[~tail].sum(), 1)), index=bat.index)
+    per_innings = (bat_runs / innings.where(innings > 0)).fillna(prior_runs)
+    evidence = balls / max(balls.sum() / max(innings.sum(), 1), 1e-9)
+    runs = (per_innings * evidence + PRIOR_INNINGS * prior_runs) / (evidence + PRIOR_INNINGS)
+
+    weights = bowl['overs_bowled'].where(bowl['avg_economy'].notna(), 0)
+    baseline = (bowl['avg_economy'].fillna(0) * weights).sum() / max(weights.sum(), 1e-9)
+    overs = bowl['overs_bowled'].fillna(0)
+    economy = ((bowl['predicted_economy'].fillna(baseline) * overs + PRIOR_OVERS * baseline)
+               / (overs + PRIOR_OVERS))
+    matches = bowl['matches_played'].fillna(0)
+    per_match = matches.where(matches > 0)
+    runs_saved = (baseline - economy) * overs / per_match
+    prior_wickets = np.where(
+        bowls, bowl['total_wickets'][bowls].sum() / max(matches[bowls].sum(), 1), 0)
+    wickets = ((bowl['total_wickets'].fillna(0) + PRIOR_MATCHES * prior_wickets)
+               / (matches + PRIOR_MATCHES)).where(matches > 0)
+
+    table['runs'] = runs.reindex(table.index).fillna(0)
+    table['runs_saved'] = runs_saved.reindex(table.index).fillna(0)
+    table['wickets'] = wickets.reindex(table.index).fillna(0)
+    table['value'] = table['runs'] + table['runs_saved'] + runs_per_wicket * table['wickets']
+    table['appearances'] = np.maximum(innings.reindex(table.index).fillna(0),
+                                      matches.reindex(table.index).fillna(0)).astype(int)
+    return pd.concat([table, flags], axis=1)
+
+# ------------------------------
+# Integer Program (single pool)
+# ------------------------------
+def _constraint_rows(flags, teams, costs, constraints):
+    """Rows (A, lower, upper) of the selection constraints for one pool"""
+    n = len(flags)
+    rows = [(np.ones(n), constraints['size'], constraints['size'])]
+    for flag in ROLE_FLAGS:
+        minimum = constraints[f'min_{flag}s']
+        if minimum:
+            rows.append((flags[:, ROLE_FLAGS.index(flag)].astype(float), minimum, np.inf))
+    if constraints.get('max_per_team') and teams is not None:
+        for team in np.unique(teams):
+            rows.append(((teams == team).astype(float), 0, constraints['max_per_team']))
+    if constraints.get('budget') is not None and costs is not None:
+        rows.append((np.asarray(costs, dtype=float), 0, constraints['budget']))
+    A, lower, upper = zip(*rows)
+    return np.vstack(A), np.array(lower, dtype=float), np.array(upper, dtype=float)
+
+def _solve_milp(values, flags, teams=None, costs=None, constraints=None):
+    """Best selection mask for one pool (None if infeasible)"""
+    constraints = {**DEFAULT_CONSTRAINTS, **(constraints or {})}
+    available = ~np.isnan(values)
+    if available.sum() < constraints['size']:
+        return None
+    A, lower, upper = _constraint_rows(flags[available], None if teams is None
+                                       else teams[available],
+                                       None if costs is None else costs[available], constraints)
+    result = milp(-values[available], integrality=np.ones(available.sum()),
+                  bounds=Bounds(0, 1), constraints=LinearConstraint(A, lower, upper))
+    if not result.success:
+        return None
+    mask = np.zeros(len(values), dtype=bool)
+    mask[np.flatnonzero(available)[result.x > 0.5]] = True
+    return mask
+
+def _selectable_values(table, constraints=None, costs=None, min_appearances=MIN_APPEARANCES):
+    """Values with players below `min_appearances` marked unavailable (NaN),
+    unless the pool cannot field a valid XI (within budget) without them"""
+    values = table['value'].to_numpy(dtype=float)
+    if 'appearances' not in table:
+        return values
+    few = table['appearances'].to_numpy() < min_appearances
+    if not few.any():
+        return values
+    restricted = np.where(few, np.nan, values)
+    flags = table[ROLE_FLAGS].to_numpy(dtype=bool)
+    if _solve_milp(restricted, flags, table['team'].to_numpy(), costs, constraints) is None:
+        return values
+    return restricted
+
+def select_xi(table, constraints=None, cost_col=None):
+    """Choose the best XI from a pool of players (rows of player_values)
+
+    Players with fewer than MIN_APPEARANCES appearances are left out while
+    the pool can field a valid XI without them. Returns (xi, info): the
+    selected rows sorted by value, and a dict with the total value and solve
+    time. Raises ValueError if no XI satisfies the constraints.
+    """
+    start = time.perf_counter()
+    costs = table[cost_col].to_numpy(dtype=float) if cost_col else None
+    values = _selectable_values(table, constraints, costs)
+    flags = table[ROLE_FLAGS].to_numpy(dtype=bool)
+    teams = table['team'].to_numpy()
+    mask = _solve_milp(values, flags, teams, costs, constraints)
+    elapsed = time.perf_counter() - start
+    if mask is None:
+        raise ValueError("No XI satisfies the selection constraints for this pool")
+    xi = table[mask].sort_values('value', ascending=False)
+    return xi, {'total_value': float(xi['value'].sum()), 'solve_s': elapsed}
+
+# ------------------------------
+# Vectorized Selection (many pools)
+# ------------------------------
+@lru_cache(maxsize=8)
+def _combinations(n, size):
+    """Every size-subset of n players as a (combinations x n) 0/1 matrix"""
+    combos = np.zeros((math.comb(n, size), n), dtype=np.float64)
+    for row, chosen in enumerate(itertools.combinations(range(n), size)):
+        combos[row, chosen] = 1
+    return combos
+
+def select_many(values, flags, teams=None, costs=None, constraints=None):
+    """Best XI for each of many candidate pools of the same width
+
+    `values` is (pools x players) with NaN for unavailable players, `flags`
+    (pools x players x 3) holds the keeper/bowler/batter flags, and the
+    optional `teams` (integer codes) and `costs` are (pools x players).
+    Every feasible XI is scored with one matrix product per batch of pools.
+
+    Returns (masks, totals); infeasible pools get an empty mask and NaN.
+    """
+    constraints = {**DEFAULT_CONSTRAINTS, **(constraints or {})}
+    values = np.asarray(values, dtype=float)
+    n_pools, n = values.shape
+    size = constraints['size']
+    masks = np.zeros((n_pools, n), dtype=bool)
+    totals = np.full(n_pools, np.nan)
+    if n < size:
+        return masks, totals
+
+    if math.comb(n, size) > MAX_COMBINATIONS:
+        for p in range(n_pools):
+            mask = _solve_milp(values[p], flags[p], None if teams is None else teams[p],
+                               None if costs is None else costs[p], constraints)
+            if mask is not None:
+                masks[p], totals[p] = mask, values[p][mask].sum()
+        return masks, totals
+
+    combos = _combinations(n, size)
+    picked = combos.T.astype(bool)
+    step = max(1, MAX_BATCH_CELLS // len(combos))
+    for lo in range(0, n_pools, step):
+        hi = min(lo + step, n_pools)
+        v = values[lo:hi]
+        missing = np.isnan(v)
+        score = np.where(missing, 0, v) @ combos.T
+        feasible = (missing.astype(float) @ combos.T) == 0
+        for r, flag in enumerate(ROLE_FLAGS):
+            minimum = constraints[f'min_{flag}s']
+            if minimum:
+                feasible &= flags[lo:hi, :, r].astype(float) @ combos.T >= minimum
+        if constraints.get('max_per_team') and teams is not None:
+            for team in np.unique(teams[lo:hi]):
+                counts = (teams[lo:hi] == team).astype(float) @ combos.T
+                feasible &= counts <= constraints['max_per_team']
+        if constraints.get('budget') is not None and costs is not None:
+            feasible &= np.asarray(costs[lo:hi], dtype=float) @ combos.T <= constraints['budget']
+
+        score[~feasible] = -np.inf
+        best = score.argmax(axis=1)
+        found = np.isfinite(score[np.arange(hi - lo), best])
+        masks[lo:hi][found] = picked[:, best[found]].T
+        totals[lo:hi][found] = score[np.arange(hi - lo), best][found]
+    return masks, totals
+
+def what_if(table, n_scenarios=1000, unavailable=1, noise=0.15, constraints=None, seed=42):
+    """Selection frequency under random injuries and form noise
+
+    Each scenario drops `unavailable` random players and scales every value
+    by lognormal noise; all scenarios are solved together with select_many.
+    Returns (frequency per player, scenario totals, seconds).
+    """
+    rng = np.random.default_rng(seed)
+    base = _selectable_values(table, constraints)
+    values = base * rng.lognormal(0, noise, size=(n_scenarios, len(base)))
+    if unavailable:
+        out = np.argsort(rng.random((n_scenarios, len(base))), axis=1)[:, :unavailable]
+        np.put_along_axis(values, out, np.nan, axis=1)
+    flags = np.broadcast_to(table[ROLE_FLAGS].to_numpy(dtype=bool),
+                            (n_scenarios, len(base), len(ROLE_FLAGS)))
+    start = time.perf_counter()
+    masks, totals = select_many(values, flags, constraints=constraints)
+    elapsed = time.perf_counter() - start
+    frequency = pd.Series(masks.mean(axis=0), index=table.index, name='selected_share')
+    return frequency.sort_values(ascending=False), totals, elapsed
+
+# ------------------------------
+# Command Line
+# ------------------------------
+def load_values(data_dir, model_dir=None):
+    """Player values from the cleaned tables and the saved regression models"""
+    import predict
+    players = predict.load_player_data(os.path.join(data_dir, 'dim_players_no_images.csv'))
+    players.columns = players.columns.str.lower()
+    batting = predict.load_batting_data(os.path.join(data_dir, 'fact_batting_summary.csv'))
+    bowling = predict.load_bowling_data(os.path.join(data_dir, 'fact_bowling_summary.csv'))
+    batting_features, bowling_features = predict.create_features(batting, bowling)
+    with contextlib.redirect_stdout(io.StringIO()):   # model reports are not needed here
+        batting_pred, bowling_pred = predict.build_regression_models(
+            batting_features, bowling_features,
+            model_dir=model_dir or os.path.join(data_dir, 'models'))
+    return player_values(players, batting_pred, bowling_pred)
+
+def print_xi(xi, info, title):
+    print(f"\n{title}: total value {info['total_value']:.1f} runs "
+          f"(solved in {info['solve_s'] * 1000:.1f} ms)")
+    print(xi[['team', 'playingrole', 'runs', 'runs_saved', 'wickets', 'value']]
+          .round(2).to_string())
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Select optimal playing XIs")
+    parser.add_argument('--data-dir', default='.')
+    parser.add_argument('--model-dir', default=None)
+    parser.add_argument('--team', default=None, help="Pick from one squad (default: all players)")
+    parser.add_argument('--max-per-team', type=int, default=3,
+                        help="Cap per team when picking from all players")
+    parser.add_argument('--min-bowlers', type=int, default=DEFAULT_CONSTRAINTS['min_bowlers'])
+    parser.add_argument('--min-keepers', type=int, default=DEFAULT_CONSTRAINTS['min_keepers'])
+    parser.add_argument('--what-if', type=int, default=0,
+                        help="Scenarios with random injuries and form noise for the squad")
+    parser.add_argument('--unavailable', type=int, default=1,
+                        help="Players ruled out at random in each what-if scenario")
+    args = parser.parse_args(argv)
+
+    table = load_values(args.data_dir, args.model_dir)
+    constraints = {'min_bowlers': args.min_bowlers, 'min_keepers': args.min_keepers}
+    print("\n=== TEAM SELECTION ===")
+    if args.team:
+        pool = table[table['team'] == args.team]
+        xi, info = select_xi(pool, constraints)
+        print_xi(xi, info, f"{args.team} XI from {len(pool)} players")
+    else:
+        pool = table
+        xi, info = select_xi(pool, {**constraints, 'max_per_team': args.max_per_team})
+        print_xi(xi, info, f"Tournament XI (max {args.max_per_team} per team)")
+
+    if args.what_if and args.team:
+        frequency, totals, elapsed = what_if(pool, args.what_if, args.unavailable,
+                                           constraints=constraints)
+        print(f"\nWhat-if: {args.what_if:,} scenarios solved in {elapsed:.2f}s "
+              f"({elapsed / args.what_if * 1e6:.0f} µs each); "
+              f"value {np.nanmean(totals):.1f} ± {np.nanstd(totals):.1f}")
+        print((frequency * 100).round(1).astype(str).add('%').to_string())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""
+Checks for team_selection.player_values on a small synthetic tournament
+
+Usage:
+    python -m pytest 4_predictive_model/test_team_selection.py
+"""
+
+import numpy as np
+import pandas as pd
+
+from team_selection import player_values, select_xi
+
+def _tournament():
+    """Twelve regulars with a full tournament and one single-appearance cameo"""
+    names = [f"Regular {i}" for i in range(12)] + ['Cameo']
+    roles = (['Wicketkeeper Batter'] + ['Batter'] * 5 + ['Bowler'] * 5
+             + ['Allrounder', 'Bowler'])
+    players = pd.DataFrame({'name': names, 'team': 'A', 'playingrole': roles})
+    batting = pd.DataFrame({
+        'batsmanname': names,
+        'innings_played': [6] * 12 + [1],
+        'balls_faced': [120] * 6 + [30] * 6 + [1],
+        'predicted_runs': [150.0] * 6 + [40.0] * 6 + [50.0],
+        'avg_runs': [25.0] * 6 + [6.0] * 6 + [50.0]
+    })
+    bowling = pd.DataFrame({
+        'bowlername': names[6:],
+        'matches_played': [6] * 6 + [1],
+        'overs_bowled': [24.0] * 6 + [4.0],
+        'total_wickets': [8] * 6 + [4],
+        'avg_economy': [7.5] * 6 + [3.0],
+        'predicted_economy': [7.5] * 6 + [3.0]
+    })
+    return players, batting, bowling
+
+def test_single_appearance_cannot_top_the_xi():
+    table = player_values(*_tournament())
+    assert table.loc['Cameo', 'appearances'] == 1
+
+    xi, _ = select_xi(table)
+    assert xi.index[0] != 'Cameo'
+    # Twelve regulars can field a valid XI, so the cameo is left out entirely
+    assert 'Cameo' not in xi.index
+
+def test_single_appearance_fills_a_short_squad():
+    players, batting, bowling = _tournament()
+    keep = ~players['name'].isin(['Regular 1', 'Regular 2'])
+    xi, _ = select_xi(player_values(players[keep], batting, bowling))
+    assert 'Cameo' in xi.index
+
+def test_rates_shrink_towards_the_tournament_rate():
+    table = player_values(*_tournament())
+    cameo = table.loc['Cameo']
+    # Raw rates would be 50 runs per innings and 4 wickets per match
+    assert cameo['runs'] < 30
+    assert cameo['wickets'] < 2
+
+def test_single_appearances_fill_a_budget_only_they_meet():
+    table = player_values(*_tournament())
+    table.loc[['Regular 11', 'Cameo'], 'appearances'] = 1
+    table['cost'] = np.where(table['appearances'] < 2, 1.0, 10.0)
+    # Eleven experienced players cost 110; the two cheap ones make 95 reachable
+    xi, _ = select_xi(table, {'budget': 95}, cost_col='cost')
+    assert {'Regular 11', 'Cameo'} <= set(xi.index)
+    assert xi['cost'].sum() <= 95
+
+def test_priors_follow_the_role():
+    players, batting, bowling = _tournament()
+    # A bowler's one-ball cameo and a batter's one-over spell
+    batting.loc[batting['batsmanname'] == 'Cameo', 'predicted_runs'] = 2.0
+    bowling = pd.concat([bowling, pd.DataFrame({
+        'bowlername': ['Regular 1'], 'matches_played': [1], 'overs_bowled': [1.0],
+        'total_wickets': [1], 'avg_economy': [8.0], 'predicted_economy': [8.0]
+    })], ignore_index=True)
+    table = player_values(players, batting, bowling)
+    # Bowlers bat 40 runs in 6 innings and batters take no wickets by default
+    assert table.loc['Cameo', 'runs'] < 40 / 6
+    assert table.loc['Regular 1', 'wickets'] < 1 / 5
@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+"""
+Throughput Benchmark for the Aggregates API
+- Starts api_server.py on a free local port (or uses --url) and runs each
+  scenario for a fixed duration with concurrent keep-alive clients:
+    cold        a new filter/sort/page combination on every request (gzip)
+    warm        a small set of repeated requests, served from the response cache (gzip)
+    revalidate  the warm set with If-None-Match, answered 304
+    json_1000   1000-row leaderboard pages as uncompressed JSON
+    gzip_1000   the same pages gzip-compressed
+    arrow_1000  the same pages as Arrow IPC
+- Reports throughput, p50/p99 latency, mean response size and status counts
+  per scenario, then the server's /metrics
+
+Usage:
+    python api_benchmark.py --data-dir ../data_collection_and_cleaning_output --clients 16 --duration 5
+    python api_benchmark.py --url http://127.0.0.1:8766 --scenarios warm revalidate
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from urllib.parse import urlencode, urlsplit
+
+import numpy as np
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DATA_DIR = os.path.join(APP_DIR, '..', 'data_collection_and_cleaning_output')
+SCENARIOS = ['cold', 'warm', 'revalidate', 'json_1000', 'gzip_1000', 'arrow_1000']
+WARM_REQUESTS = 20
+
+def _request(url, timeout=30):
+    with urllib.request.urlopen(url, timeout=timeout) as resp:
+        return json.loads(resp.read())
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def start_server(data_dir, port, timeout=120):
+    """Run api_server.py on `port` and wait until it answers health checks"""
+    cmd = [sys.executable, os.path.join(APP_DIR, 'api_server.py'), '--data-dir', data_dir,
+           '--port', str(port)]
+    proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"API server exited:\n{proc.stderr.read().decode()}")
+        try:
+            _request(f"http://127.0.0.1:{port}/health", timeout=2)
+            return proc
+        except OSError:
+            time.sleep(0.5)
+    proc.kill()
+    raise RuntimeError(f"API server did not start within {timeout}s")
+
+# ------------------------------
+# Requests
+# ------------------------------
+def selection_values(base_url):
+    """Teams and player roles to filter by, read from the API itself"""
+    teams = [row['Team'] for row in _request(f"{base_url}/win_rates?page_size=1000")['rows']]
+    players = _request(f"{base_url}/players?page_size=1000")['rows']
+    roles = sorted({row['playingRole'] for row in players if row['playingRole']})
+    return teams, roles
+
+def random_query(rng, teams, roles):
+    """A leaderboard request with a random selection, sort order and page"""
+    table = rng.choice(['batting', 'bowling'])
+    params = [('team', t) for t in rng.sample(teams, rng.randint(0, min(3, len(teams))))]
+    params += [('role', r) for r in rng.sample(roles, rng.randint(0, min(2, len(roles))))]
+    if rng.random() < 0.5:
+        sort = {'batting': ['runs', 'strike_rate', 'balls'],
+                'bowling': ['wickets', 'economy', 'runs']}[table]
+        params += [('sort', rng.choice(sort)), ('order', rng.choice(['asc', 'desc']))]
+    params.append(('page', rng.randint(1, 3)))
+    return f"/{table}?{urlencode(params)}"
+
+def scenario_requests(name, rng, teams, roles, warm):
+    """(path, headers) for the next request of a scenario"""
+    if name == 'cold':
+        return random_query(rng, teams, roles), {'Accept-Encoding': 'gzip'}
+    if name in ('warm', 'revalidate'):
+        path, etag = rng.choice(warm)
+        headers = {'Accept-Encoding': 'gzip'}
+        if name == 'revalidate':
+            headers['If-None-Match'] = etag
+        return path, headers
+    table = rng.choice(['batting', 'bowling'])
+    path = f"/{table}?page_size=1000&page={rng.randint(1, 2)}"
+    headers = {'json_1000': {}, 'gzip_1000': {'Accept-Encoding': 'gzip'},
+               'arrow_1000': {'Accept': 'application/vnd.apache.arrow.stream'}}[name]
+    return path, headers
+
+def warm_set(base_url, teams, roles, seed):
+    """Requests repeated by the warm scenarios, with their ETags"""
+    rng = random.Random(seed)
+    host = urlsplit(base_url)
+    conn = http.client.HTTPConnection(host.hostname, host.port, timeout=30)
+    warm = []
+    for _ in range(WARM_REQUESTS):
+        path = random_query(rng, teams, roles)
+        conn.request('GET', path, headers={'Accept-Encoding': 'gzip'})
+        resp = conn.getresponse()
+        resp.read()
+        warm.append((path, resp.getheader('ETag')))
+    conn.close()
+    return warm
+
+# ------------------------------
+# Clients
+# ------------------------------
+def run_client(base_url, name, teams, roles, warm, deadline, results, seed):
+    rng = random.Random(seed)
+    host = urlsplit(base_url)
+    conn = http.client.HTTPConnection(host.hostname, host.port, timeout=30)
+    latencies, sizes, statuses = [], [], {}
+    while time.perf_counter() < deadline:
+        path, headers = scenario_requests(name, rng, teams, roles, warm)
+        start = time.perf_counter()
+        try:
+            conn.request('GET', path, headers=headers)
+            resp = conn.getresponse()
+            body = resp.read()
+        except (OSError, http.client.HTTPException):
+            statuses['error'] = statuses.get('error', 0) + 1
+            conn.close()
+            conn = http.client.HTTPConnection(host.hostname, host.port, timeout=30)
+            continue
+        latencies.append(time.perf_counter() - start)
+        sizes.append(len(body))
+        statuses[resp.status] = statuses.get(resp.status, 0) + 1
+    conn.close()
+    results.append((latencies, sizes, statuses))
+
+def run_scenario(base_url, name, clients, duration, teams, roles, warm, seed):
+    results = []
+    deadline = time.perf_counter() + duration
+    threads = [
+        threading.Thread(target=run_client, args=(
+            base_url, name, teams, roles, warm, deadline, results, seed + i))
+        for i in range(clients)
+    ]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    ms = np.concatenate([r[0] for r in results]) * 1000
+    sizes = np.concatenate([r[1] for r in results])
+    statuses = {}
+    for _, _, counts in results:
+        for status, n in counts.items():
+            statuses[str(status)] = statuses.get(str(status), 0) + n
+    return {
+        'requests': len(ms),
+        'throughput': len(ms) / elapsed,
+        'p50_ms': float(np.percentile(ms, 50)) if len(ms) else None,
+        'p99_ms': float(np.percentile(ms, 99)) if len(ms) else None,
+        'mean_kb': float(sizes.mean() / 1024) if len(sizes) else None,
+        'statuses': statuses
+    }
+
+def print_report(report, clients, duration):
+    print(f"\n=== API BENCHMARK ({clients} clients, {duration:.0f}s per scenario) ===")
+    print(f"{'Scenario':<12} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'KB/resp':>9}  Statuses")
+    for name, r in report.items():
+        if not r['requests']:
+            print(f"{name:<12} no completed requests  {r['statuses']}")
+            continue
+        print(f"{name:<12} {r['throughput']:>9.1f} {r['p50_ms']:>8.2f} {r['p99_ms']:>8.2f} "
+              f"{r['mean_kb']:>9.1f}  {r['statuses']}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the aggregates API")
+    parser.add_argument('--url', help="Running server; by default one is started locally")
+    parser.add_argument('--data-dir', default=DEFAULT_DATA_DIR)
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=5.0,
+                        help="Seconds per scenario")
+    parser.add_argument('--scenarios', nargs='+', choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--report', help="Write the results as JSON")
+    args = parser.parse_args(argv)
+
+    proc = None
+    base_url = args.url
+    if base_url is None:
+        port = _free_port()
+        print(f"Starting API server on port {port}...")
+        proc = start_server(os.path.abspath(args.data_dir), port)
+        base_url = f"http://127.0.0.1:{port}"
+    base_url = base_url.rstrip('/')
+    try:
+        print(f"Server: {_request(f'{base_url}/health')}")
+        teams, roles = selection_values(base_url)
+        warm = warm_set(base_url, teams, roles, args.seed)
+        report = {}
+        for name in args.scenarios:
+            report[name] = run_scenario(base_url, name, args.clients, args.duration, teams,
+                                        roles, warm, args.seed)
+        print_report(report, args.clients, args.duration)
+        print("\nServer metrics:")
+        print(json.dumps(_request(f"{base_url}/metrics"), indent=2))
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport written to {args.report}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,404 @@
+# -*- coding: utf-8 -*-
+"""
+Local Read-Only Aggregates API
+- Serves the dashboard's precomputed aggregates (leaderboards with team and
+  role filters, win rates, head-to-head records, economy distribution,
+  player profiles) and the cleaned input tables, as JSON or Arrow
+- Reads the same incrementally updated snapshot as the dashboard
+  (watcher.py), so new match data is served without a restart
+- ETags come from the snapshot version and the normalized request, so a
+  revalidation (If-None-Match) is answered 304 without touching the data;
+  encoded and gzip-compressed bodies are cached per ETag
+- Every table endpoint is paginated (page, page_size; total in the response)
+- Standard library HTTP server only; runs fully offline
+
+Usage:
+    python api_server.py --data-dir ../data_collection_and_cleaning_output --port 8766
+
+Endpoints (GET):
+    /health
+    /metrics
+    /tables                          snapshot tables with row counts and versions
+    /overview
+    /batting, /bowling               ?team=&role=&sort=&order=asc|desc&search=&page=&page_size=
+    /win_rates                       ?team=
+    /head_to_head                    ?team=&opponent=
+    /economy                         ?team=   innings per economy bin
+    /players                         ?search=&page=&page_size=
+    /players/<name>                  one player's batting, bowling and team totals
+    /data/<matches|players|batting|bowling>   cleaned rows; ?<column>=<value> filters
+
+Table endpoints return Arrow IPC with ?format=arrow or
+"Accept: application/vnd.apache.arrow.stream" (pagination in the schema metadata).
+Repeat a parameter to select several values (?team=India&team=Pakistan).
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import math
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, unquote, urlencode, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from snapshot import ECONOMY_BIN_WIDTH, INPUT_FILES
+from watcher import DataWatcher
+
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 1000
+RESPONSE_CACHE_SIZE = 512
+# Smaller bodies are sent uncompressed
+GZIP_MIN_BYTES = 1024
+ARROW_TYPE = 'application/vnd.apache.arrow.stream'
+# Parameters that are not column filters on /data tables
+RESERVED_PARAMS = {'page', 'page_size', 'format'}
+
+# ------------------------------
+# Queries
+# ------------------------------
+def _values(params, name):
+    return [v for value in params.get(name, []) for v in value.split(',') if v]
+
+def _int_param(params, name, default, low, high):
+    value = params.get(name, [default])[-1]
+    try:
+        value = int(value)
+    except ValueError:
+        raise ValueError(f"{name} must be an integer") from None
+    if not low <= value <= high:
+        raise ValueError(f"{name} must be between {low} and {high}")
+    return value
+
+def _page_params(params):
+    return (_int_param(params, 'page', 1, 1, 10 ** 9),
+            _int_param(params, 'page_size', PAGE_SIZE, 1, MAX_PAGE_SIZE))
+
+def paginate(frame, params):
+    """One page of `frame` and its pagination fields"""
+    page, size = _page_params(params)
+    return frame.iloc[(page - 1) * size:page * size], page, size, len(frame)
+
+class AggregatesAPI:
+    """Answers API requests from the watcher's current snapshot
+
+    Table endpoints return (frame, meta); others return a JSON-ready dict.
+    Unknown names raise KeyError (404) and bad parameters ValueError (400).
+    """
+
+    def __init__(self, watcher):
+        self.watcher = watcher
+        self._inputs = {}
+        self._lock = threading.Lock()
+
+    def _input(self, snapshot, name):
+        """A cleaned input table, read once per content hash"""
+        key = (name, snapshot.metadata['inputs'][name]['sha256'])
+        if key not in self._inputs:
+            with self._lock:
+                if key not in self._inputs:
+                    frame = pd.read_csv(os.path.join(self.watcher.data_dir, INPUT_FILES[name]))
+                    self._inputs = {k: v for k, v in self._inputs.items() if k[0] != name}
+                    self._inputs[key] = frame
+        return self._inputs[key]
+
+    def handle(self, path, params):
+        snapshot, filters = self.watcher.current()
+        parts = [unquote(p) for p in path.strip('/').split('/') if p]
+        if not parts:
+            raise KeyError(path)
+        endpoint, rest = parts[0], parts[1:]
+
+        if endpoint == 'tables' and not rest:
+            return {'version': snapshot.metadata['version'], 'tables': snapshot.metadata['tables']}
+        if endpoint == 'overview' and not rest:
+            overview = snapshot['overview'].iloc[0]
+            return {'version': snapshot.metadata['version'],
+                    **{k: int(v) for k, v in overview.items()}}
+        if endpoint in ('batting', 'bowling') and not rest:
+            return self._leaderboard(filters, endpoint, params)
+        if endpoint == 'win_rates' and not rest:
+            return paginate(filters.win_rates(_values(params, 'team')), params), 'win_rates'
+        if endpoint == 'head_to_head' and not rest:
+            table = snapshot['head_to_head']
+            for param, column in (('team', 'team1'), ('opponent', 'team2')):
+                if _values(params, param):
+                    table = table[table[column].isin(_values(params, param))]
+            return paginate(table, params), 'head_to_head'
+        if endpoint == 'economy' and not rest:
+            bins = filters.economy_bins(_values(params, 'team'))
+            bins = bins.assign(economy_from=bins['bin'] * ECONOMY_BIN_WIDTH,
+                               economy_to=(bins['bin'] + 1) * ECONOMY_BIN_WIDTH)
+            return paginate(bins, params), 'economy'
+        if endpoint == 'players':
+            if rest:
+                return self._profile(snapshot, filters, '/'.join(rest))
+            table = snapshot['players']
+            search = params.get('search', [''])[-1].strip()
+            if search:
+                table = table[table['name'].str.contains(search, case=False, regex=False,
+                                                         na=False)]
+            return paginate(table, params), 'players'
+        if endpoint == 'data' and len(rest) == 1 and rest[0] in INPUT_FILES:
+            table = self._input(snapshot, rest[0])
+            for column, values in params.items():
+                if column in RESERVED_PARAMS:
+                    continue
+                if column not in table.columns:
+                    raise ValueError(f"Unknown column: {column}")
+                table = table[table[column].astype(str).isin(values)]
+            return paginate(table, params), rest[0]
+        raise KeyError(path)
+
+    def _leaderboard(self, filters, table, params):
+        sort = params.get('sort', [None])[-1]
+        columns = filters.get(table).columns
+        if sort is not None and sort not in columns:
+            raise ValueError(f"sort must be one of: {', '.join(columns)}")
+        order = params.get('order', ['desc'])[-1]
+        if order not in ('asc', 'desc'):
+            raise ValueError("order must be asc or desc")
+        page, size = _page_params(params)
+        rows, total = filters.page(table, _values(params, 'team'), _values(params, 'role'),
+                                   sort_by=sort, ascending=order == 'asc',
+                                   search=params.get('search', [''])[-1], page=page - 1,
+                                   page_size=size)
+        return (rows, page, size, total), table
+
+    def _profile(self, snapshot, filters, name):
+        """Career totals of one player, with per-team batting and bowling sums"""
+        profile = {'name': name, 'version': snapshot.metadata['version']}
+        players = snapshot['players']
+        info = players[players['name'] == name]
+        if len(info):
+            profile.update(team=info['team'].iloc[0], role=info['playingRole'].iloc[0])
+        found = len(info) > 0
+        for table, key in (('batting', 'batsmanName'), ('bowling', 'bowlerName')):
+            board = filters.get(table)
+            row = board[board[key] == name]
+            parts = snapshot[f"{table}_parts"]
+            by_team = parts[parts['player'] == name].drop(columns=['player', 'role'])
+            profile[table] = json.loads(row.drop(columns=key).to_json(orient='records'))[0] \
+                if len(row) else None
+            profile[f"{table}_by_team"] = json.loads(
+                by_team.astype({'team': str}).to_json(orient='records'))
+            found = found or len(row) > 0
+        if not found:
+            raise KeyError(name)
+        return profile
+
+# ------------------------------
+# Encoding
+# ------------------------------
+def encode_table(result, fmt, path, params):
+    """(body, content type, total rows) for a paginated table result"""
+    (rows, page, size, total), name = result
+    meta = {'table': name, 'page': page, 'page_size': size, 'total': total,
+            'pages': math.ceil(total / size)}
+    if page * size < total:
+        query = {k: v for k, v in params.items() if k != 'page'}
+        if fmt == 'arrow':
+            query['format'] = ['arrow']
+        meta['next'] = f"{quote(path)}?{urlencode(dict(query, page=[page + 1]), doseq=True)}"
+    if fmt == 'arrow':
+        import pyarrow as pa
+        table = pa.Table.from_pandas(rows, preserve_index=False)
+        table = table.replace_schema_metadata(
+            dict(table.schema.metadata or {}, api=json.dumps(meta)))
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes(), ARROW_TYPE, total
+    body = '{"meta":' + json.dumps(meta) + ',"rows":' + rows.to_json(orient='records') + '}'
+    return body.encode(), 'application/json', total
+
+def request_etag(version, path, params, fmt):
+    """Strong ETag for a request against one snapshot version"""
+    key = json.dumps([version, path, sorted((k, sorted(v)) for k, v in params.items()), fmt])
+    return '"' + hashlib.sha256(key.encode()).hexdigest()[:24] + '"'
+
+# ------------------------------
+# Metrics
+# ------------------------------
+class Metrics:
+    """Request counts, 304s, response-cache hits, bytes and latency"""
+
+    def __init__(self, window=10000):
+        self.lock = threading.Lock()
+        self.latencies = deque(maxlen=window)
+        self.counts = {'requests': 0, 'not_modified': 0, 'cache_hits': 0, 'errors': 0,
+                       'bytes_sent': 0}
+        self.started = time.time()
+
+    def record(self, latency, sent=0, **flags):
+        with self.lock:
+            self.latencies.append(latency)
+            self.counts['requests'] += 1
+            self.counts['bytes_sent'] += sent
+            for name, value in flags.items():
+                self.counts[name] += int(value)
+
+    def snapshot(self):
+        with self.lock:
+            ms = np.array(self.latencies) * 1000
+            counts = dict(self.counts)
+        return dict(counts, uptime_s=round(time.time() - self.started, 1), latency_ms={
+            'p50': float(np.percentile(ms, 50)) if len(ms) else None,
+            'p99': float(np.percentile(ms, 99)) if len(ms) else None
+        })
+
+# ------------------------------
+# HTTP Handler
+# ------------------------------
+class APIHandler(BaseHTTPRequestHandler):
+    server_version = 'T20Aggregates/1.0'
+    # Keep-alive, so clients can reuse connections (every response has a length)
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are separate writes; with Nagle on, keep-alive
+    # responses would wait ~40 ms for the client's delayed ACK
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass   # per-request console logging would dominate latency
+
+    def _send(self, status, body=b'', headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if body and self.command != 'HEAD':
+            self.wfile.write(body)
+        return len(body)
+
+    def _send_json(self, status, payload):
+        return self._send(status, json.dumps(payload).encode(),
+                          {'Content-Type': 'application/json'})
+
+    def do_GET(self):
+        start = time.perf_counter()
+        server = self.server
+        url = urlsplit(self.path)
+        params = parse_qs(url.query)
+        if url.path in ('/health', '/metrics'):
+            payload = (server.metrics.snapshot() if url.path == '/metrics' else
+                       {'status': 'ok', 'version': server.watcher.version})
+            self._send_json(200, payload)
+            return
+
+        try:
+            server.watcher.refresh()
+        except Exception as e:
+            # Keep serving the current snapshot if an update fails
+            self.log_error("snapshot update failed: %s", e)
+        wants_arrow = (params.pop('format', [''])[-1] == 'arrow'
+                       or ARROW_TYPE in self.headers.get('Accept', ''))
+        fmt = 'arrow' if wants_arrow else 'json'
+        etag = request_etag(server.watcher.version, url.path, params, fmt)
+        headers = {'ETag': etag, 'Cache-Control': 'no-cache', 'Vary': 'Accept, Accept-Encoding'}
+        if etag in [t.strip() for t in self.headers.get('If-None-Match', '').split(',')]:
+            self._send(304, headers=headers)
+            server.metrics.record(time.perf_counter() - start, not_modified=True)
+            return
+
+        use_gzip = 'gzip' in self.headers.get('Accept-Encoding', '')
+        cached = server.responses.get(etag, use_gzip)
+        hit = cached is not None
+        if not hit:
+            try:
+                result = server.api.handle(url.path, params)
+            except KeyError as e:
+                sent = self._send_json(404, {'error': f"not found: {e.args[0] if e.args else url.path}"})
+                server.metrics.record(time.perf_counter() - start, sent, errors=True)
+                return
+            except ValueError as e:
+                sent = self._send_json(400, {'error': str(e)})
+                server.metrics.record(time.perf_counter() - start, sent, errors=True)
+                return
+            if isinstance(result, dict):
+                if fmt == 'arrow':
+                    sent = self._send_json(406, {'error': "this endpoint is JSON only"})
+                    server.metrics.record(time.perf_counter() - start, sent, errors=True)
+                    return
+                body, content_type, total = json.dumps(result).encode(), 'application/json', None
+            else:
+                body, content_type, total = encode_table(result, fmt, url.path, params)
+            cached = server.responses.put(etag, body, content_type, total, use_gzip)
+
+        body, content_type, total, compressed = cached
+        headers['Content-Type'] = content_type
+        if compressed:
+            headers['Content-Encoding'] = 'gzip'
+        if total is not None:
+            headers['X-Total-Count'] = str(total)
+        sent = self._send(200, body, headers)
+        server.metrics.record(time.perf_counter() - start, sent, cache_hits=hit)
+
+    do_HEAD = do_GET
+
+class ResponseCache:
+    """Encoded response bodies by ETag, plain and gzip-compressed, LRU-bounded"""
+
+    def __init__(self, size=RESPONSE_CACHE_SIZE):
+        self.size = size
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, etag, use_gzip):
+        with self._lock:
+            entry = self._items.get((etag, use_gzip))
+            if entry is not None:
+                self._items.move_to_end((etag, use_gzip))
+            return entry
+
+    def put(self, etag, body, content_type, total, use_gzip):
+        compressed = use_gzip and len(body) >= GZIP_MIN_BYTES
+        if compressed:
+            body = gzip.compress(body, compresslevel=5)
+        entry = (body, content_type, total, compressed)
+        with self._lock:
+            self._items[(etag, use_gzip)] = entry
+            while len(self._items) > self.size:
+                self._items.popitem(last=False)
+        return entry
+
+class APIServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256   # default of 5 drops bursts of concurrent clients
+
+def make_server(watcher, host='127.0.0.1', port=8766, cache_size=RESPONSE_CACHE_SIZE):
+    server = APIServer((host, port), APIHandler)
+    server.watcher = watcher
+    server.api = AggregatesAPI(watcher)
+    server.responses = ResponseCache(cache_size)
+    server.metrics = Metrics()
+    return server
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve dashboard aggregates over local HTTP")
+    parser.add_argument('--data-dir', default='.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8766)
+    parser.add_argument('--cache-size', type=int, default=RESPONSE_CACHE_SIZE,
+                        help="Encoded responses kept in memory")
+    args = parser.parse_args(argv)
+
+    watcher = DataWatcher(args.data_dir)
+    server = make_server(watcher, args.host, args.port, args.cache_size)
+    print(f"\nServing aggregates on http://{args.host}:{args.port} "
+          f"(snapshot v{watcher.version})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nShutting down...")
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
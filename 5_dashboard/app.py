@@ -1,11 +1,25 @@
 import streamlit as st
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-import plotly.express as px
-import plotly.graph_objects as go
-from PIL import Image
+import argparse
 import os
+import sys
+
+# Pages live in views/ and are imported on first visit, together with the
+# plotting libraries they use; data tables are read when a page first needs them
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(APP_DIR, '..', '4_predictive_model'))
+sys.path.insert(0, os.path.join(APP_DIR, '..', '2_data_cleaning_and_transformation'))
+sys.path.insert(0, os.path.join(APP_DIR, '..'))
+from instrumentation import span
+# Another data directory can be given with: streamlit run app.py -- --data-dir <dir>
+_parser = argparse.ArgumentParser(description="T20 cricket dashboard")
+_parser.add_argument('--data-dir', default=os.path.join(APP_DIR, '..', 'data_collection_and_cleaning_output'))
+# --stats-file <path> makes every run write the filter cache statistics (see load_test.py)
+_parser.add_argument('--stats-file', default=None)
+_args = _parser.parse_known_args()[0]
+DATA_DIR, STATS_FILE = _args.data_dir, _args.stats_file
+SIMILARITY_INDEX = os.path.join(DATA_DIR, 'models', 'similarity', 'index.npz')
+# Per-player cluster assignments written by 4_predictive_model/predict.py
+CLUSTER_DIR = os.path.join(DATA_DIR, 'models', 'clusters')
 
 # Set page configuration
 st.set_page_config(
@@ -14,303 +28,106 @@ st.set_page_config(
     layout="wide"
 )
 
-# Cache data loading to improve performance
-@st.cache_data
-def load_data():
-    try:
-        # Adjust these paths based on your actual file locations
-        match_data = pd.read_csv('../data_cleaning_and_transformation/dim_match_summary.csv')
-        player_data = pd.read_csv('../data_cleaning_and_transformation/dim_players_no_images.csv')
-        batting_data = pd.read_csv('../data_cleaning_and_transformation/fact_batting_summary.csv')
-        bowling_data = pd.read_csv('../data_cleaning_and_transformation/fact_bowling_summary.csv')
-        
-        return match_data, player_data, batting_data, bowling_data
-    except Exception as e:
-        st.error(f"Error loading data: {e}")
-        return None, None, None, None
+# Seconds between checks for new match data in each open session
+REFRESH_SECONDS = 5
 
-# Load images for visualizations
-def load_images():
-    images = {}
+# One watcher per server process holds the precomputed aggregate snapshot and
+# the team/role filter index, and updates them incrementally when the data changes.
+# A failed load raises, so nothing is cached and the next rerun tries again
+@st.cache_resource
+def load_data(data_dir=DATA_DIR):
+    from watcher import DataWatcher
+    return DataWatcher(data_dir, poll_seconds=REFRESH_SECONDS)
+
+# Reruns only this small fragment on a timer; when the watcher has loaded a
+# newer snapshot than the session last rendered, the whole page reruns with it
+@st.fragment(run_every=REFRESH_SECONDS)
+def watch_for_updates(watcher):
     try:
-        images['team_win_rates'] = '../data_analysis_and_visualization/team_win_rates.png'
-        images['bowling_economy'] = '../data_analysis_and_visualization/bowling_economy.png'
-        images['player_clusters'] = '../predictive_model/player_clusters.png'
+        watcher.refresh()
     except Exception as e:
-        st.error(f"Error loading images: {e}")
-    return images
+        st.warning(f"Could not update data: {e}")
+    if watcher.version != st.session_state.get('snapshot_version'):
+        st.rerun()
+    st.caption(f"Data snapshot v{watcher.version}")
+
+# Process-wide cache statistics for the load test, replaced atomically
+def write_cache_stats(path, snapshot, filters):
+    import json
+    import threading
+    stats = dict(filters.cache_stats(), snapshot_version=snapshot.metadata['version'],
+                 tables_loaded=snapshot.loaded())
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump(stats, f)
+    os.replace(tmp, path)
 
 # Main function
 def main():
     # Sidebar
     st.sidebar.title("T20 Cricket Analysis")
     
-    # Load data
-    match_data, player_data, batting_data, bowling_data = load_data()
-    images = load_images()
+    # Load data (snapshot and filters always come from the same version)
+    try:
+        watcher = load_data()
+    except Exception as e:
+        st.error(f"Error loading data: {e}")
+        watcher = None
+    snapshot, filters = watcher.current() if watcher is not None else (None, None)
+    if snapshot is not None:
+        st.session_state['snapshot_version'] = snapshot.metadata['version']
+        with st.sidebar:
+            watch_for_updates(watcher)
     
     # Navigation
     page = st.sidebar.selectbox(
         "Select Page",
-        ["Home/Overview", "Batting Analysis", "Bowling Analysis", "Player Clusters", "Team Analysis"]
+        ["Home/Overview", "Batting Analysis", "Bowling Analysis", "Player Clusters", "Similar Players", "Player Profile",
+         "Team Analysis"]
     )
     
-    # Add filters to sidebar
-    if match_data is not None and player_data is not None:
-        all_teams = pd.concat([match_data['team1'], match_data['team2']]).unique()
+    # Add filters to sidebar (an empty selection shows everything)
+    selected_team, selected_roles = [], []
+    if snapshot is not None:
+        # Filter choices are stored in the snapshot metadata, so no table is read here
+        all_teams = snapshot.metadata['teams']
         selected_team = st.sidebar.multiselect("Select Teams", all_teams)
         
-        if 'playingrole' in player_data.columns:
-            roles = player_data['playingrole'].unique()
-            selected_roles = st.sidebar.multiselect("Select Player Roles", roles)
-    
-    # Pages
-    if page == "Home/Overview":
-        display_overview(match_data, batting_data, bowling_data)
-    
-    elif page == "Batting Analysis":
-        display_batting_analysis(batting_data, player_data)
-    
-    elif page == "Bowling Analysis":
-        display_bowling_analysis(bowling_data, player_data)
-    
-    elif page == "Player Clusters":
-        display_player_clusters(images)
-    
-    elif page == "Team Analysis":
-        display_team_analysis(match_data, images)
-
-# Page functions
-def display_overview(match_data, batting_data, bowling_data):
-    st.title("T20 Cricket Dashboard - Overview")
-    
-    if match_data is None or batting_data is None or bowling_data is None:
-        st.warning("Data not found. Please check your data files.")
-        return
-    
-    # Calculate key metrics
-    total_matches = len(match_data) if match_data is not None else 0
-    total_runs = batting_data['runs'].sum() if batting_data is not None else 0
-    total_wickets = bowling_data['wickets'].sum() if bowling_data is not None else 0
-    
-    # Display metrics in columns
-    col1, col2, col3 = st.columns(3)
-    with col1:
-        st.metric("Total Matches", total_matches)
-    with col2:
-        st.metric("Total Runs", total_runs)
-    with col3:
-        st.metric("Total Wickets", total_wickets)
-    
-    # Additional information
-    st.subheader("About This Dashboard")
-    st.write("""
-    This dashboard provides comprehensive analysis of T20 cricket data, including batting 
-    and bowling statistics, team performance metrics, and player clustering analysis.
-    
-    Use the sidebar to navigate between different sections and apply filters to the data.
-    """)
-
-def display_batting_analysis(batting_data, player_data):
-    st.title("Batting Analysis")
-    
-    if batting_data is None or player_data is None:
-        st.warning("Data not found. Please check your data files.")
-        return
-    
-    # Top run scorers
-    st.subheader("Top Run Scorers")
-    top_batsmen = batting_data.groupby('batsmanName').agg({
-        'runs': 'sum',
-        'balls': 'sum',
-        '4s': 'sum', 
-        '6s': 'sum'
-    }).reset_index()
-    
-    # Calculate strike rate
-    top_batsmen['strike_rate'] = (top_batsmen['runs'] / top_batsmen['balls']) * 100
-    top_batsmen['boundary_percentage'] = ((top_batsmen['4s'] + top_batsmen['6s']) / top_batsmen['balls']) * 100
-    
-    # Sort and display top 10
-    top_batsmen = top_batsmen.sort_values('runs', ascending=False).head(10)
-    
-    # Bar chart for top run scorers
-    fig = px.bar(
-        top_batsmen, 
-        x='batsmanName', 
-        y='runs',
-        title='Top 10 Run Scorers',
-        labels={'batsmanName': 'Batsman', 'runs': 'Total Runs'},
-        color='runs'
-    )
-    st.plotly_chart(fig, use_container_width=True)
-    
-    # Scatter plot for strike rate vs boundary percentage
-    st.subheader("Strike Rate vs Boundary Percentage")
-    fig = px.scatter(
-        top_batsmen,
-        x='strike_rate',
-        y='boundary_percentage',
-        size='runs',
-        hover_name='batsmanName',
-        title='Strike Rate vs Boundary Percentage',
-        labels={
-            'strike_rate': 'Strike Rate',
-            'boundary_percentage': 'Boundary Percentage (%)',
-            'runs': 'Total Runs'
-        }
-    )
-    st.plotly_chart(fig, use_container_width=True)
-    
-    # Display data table
-    st.subheader("Detailed Batting Statistics")
-    st.dataframe(top_batsmen)
-
-def display_bowling_analysis(bowling_data, player_data):
-    st.title("Bowling Analysis")
-    
-    if bowling_data is None or player_data is None:
-        st.warning("Data not found. Please check your data files.")
-        return
-    
-    # Top wicket takers
-    st.subheader("Top Wicket Takers")
-    top_bowlers = bowling_data.groupby('bowlerName').agg({
-        'wickets': 'sum',
-        'runs': 'sum',
-        'overs': 'sum'
-    }).reset_index()
-    
-    # Calculate economy rate
-    top_bowlers['economy'] = top_bowlers['runs'] / top_bowlers['overs']
-    
-    # Sort and display top 10
-    top_bowlers = top_bowlers.sort_values('wickets', ascending=False).head(10)
-    
-    # Bar chart for top wicket takers
-    fig = px.bar(
-        top_bowlers,
-        x='bowlerName',
-        y='wickets',
-        title='Top 10 Wicket Takers',
-        labels={'bowlerName': 'Bowler', 'wickets': 'Total Wickets'},
-        color='wickets'
-    )
-    st.plotly_chart(fig, use_container_width=True)
-    
-    # Show bowling economy visualization
-    st.subheader("Bowling Economy Analysis")
-    try:
-        img_path = '../data_analysis_and_visualization/bowling_economy.png'
-        st.image(img_path, caption="Bowling Economy Analysis")
-    except:
-        st.error("Could not load bowling economy image. Please check file path.")
-    
-    # Display data table
-    st.subheader("Detailed Bowling Statistics")
-    st.dataframe(top_bowlers)
-
-def display_player_clusters(images):
-    st.title("Player Clusters Analysis")
-    
-    # Display player clusters image
-    st.subheader("Player Clustering")
-    try:
-        if os.path.exists(images['player_clusters']):
-            st.image(images['player_clusters'], caption="Player Clusters")
-        else:
-            st.error("Player clusters image not found.")
-    except:
-        st.error("Could not load player clusters image. Please check file path.")
-    
-    # Cluster descriptions
-    st.subheader("Cluster Descriptions")
-    
-    cluster_info = {
-        "Cluster 1: High-Risk Batters": "Players with high strike rates but inconsistent scoring",
-        "Cluster 2: Anchors": "Batters who build innings with good averages but moderate strike rates",
-        "Cluster 3: Economical Bowlers": "Bowlers who maintain tight lines and low economy rates",
-        "Cluster 4: Wicket-Taking Bowlers": "Bowlers focused on taking wickets rather than economy",
-        "Cluster 5: All-Rounders": "Players contributing with both bat and ball"
-    }
-    
-    for cluster, description in cluster_info.items():
-        st.markdown(f"**{cluster}**: {description}")
-
-def display_team_analysis(match_data, images):
-    st.title("Team Analysis")
-    
-    if match_data is None:
-        st.warning("Match data not found. Please check your data files.")
-        return
-    
-    # Calculate team win rates
-    st.subheader("Team Win Rates")
-    
-    all_teams = pd.concat([match_data['team1'], match_data['team2']]).unique()
-    
-    results = []
-    for team in all_teams:
-        total = ((match_data['team1'] == team) | (match_data['team2'] == team)).sum()
-        wins = (match_data['winner'] == team).sum()
-        win_rate = (wins/total)*100 if total > 0 else 0
+        roles = snapshot.metadata['roles']
+        selected_roles = st.sidebar.multiselect("Select Player Roles", roles)
+    
+    # Pages (timed as 'render' spans when tracing is on, see instrumentation.py)
+    with span('render', page=page):
+        if page == "Home/Overview":
+            from views.overview import display_overview
+            display_overview(snapshot)
         
-        results.append({
-            'Team': team, 
-            'Matches': total,
-            'Wins': wins,
-            'WinRate': win_rate
-        })
-    
-    results_df = pd.DataFrame(results).sort_values('WinRate', ascending=False)
-    
-    # Bar chart for win rates
-    fig = px.bar(
-        results_df,
-        x='Team',
-        y='WinRate',
-        title='Team Win Rates (%)',
-        labels={'Team': 'Team', 'WinRate': 'Win Rate (%)'},
-        color='WinRate'
-    )
-    st.plotly_chart(fig, use_container_width=True)
-    
-    # Display team win rates image if available
-    try:
-        if os.path.exists(images['team_win_rates']):
-            st.image(images['team_win_rates'], caption="Team Win Rates")
-    except:
-        st.error("Could not load team win rates image. Please check file path.")
-    
-    # Head-to-head analysis
-    st.subheader("Head-to-Head Analysis")
-    
-    # Create selection for two teams
-    col1, col2 = st.columns(2)
-    with col1:
-        team1 = st.selectbox("Select Team 1", all_teams)
-    with col2:
-        team2 = st.selectbox("Select Team 2", all_teams, index=1 if len(all_teams) > 1 else 0)
-    
-    # Calculate head-to-head stats
-    head_to_head = match_data[
-        ((match_data['team1'] == team1) & (match_data['team2'] == team2)) |
-        ((match_data['team1'] == team2) & (match_data['team2'] == team1))
-    ]
-    
-    team1_wins = (head_to_head['winner'] == team1).sum()
-    team2_wins = (head_to_head['winner'] == team2).sum()
-    
-    # Display head-to-head metrics
-    st.subheader(f"{team1} vs {team2}")
-    
-    metric_col1, metric_col2, metric_col3 = st.columns(3)
-    with metric_col1:
-        st.metric("Total Matches", len(head_to_head))
-    with metric_col2:
-        st.metric(f"{team1} Wins", team1_wins)
-    with metric_col3:
-        st.metric(f"{team2} Wins", team2_wins)
+        elif page == "Batting Analysis":
+            from views.batting import display_batting_analysis
+            display_batting_analysis(filters, selected_team, selected_roles)
+        
+        elif page == "Bowling Analysis":
+            from views.bowling import display_bowling_analysis
+            display_bowling_analysis(filters, selected_team, selected_roles)
+        
+        elif page == "Player Clusters":
+            from views.clusters import display_player_clusters
+            display_player_clusters(CLUSTER_DIR)
+        
+        elif page == "Similar Players":
+            from views.similar import display_similar_players
+            display_similar_players(SIMILARITY_INDEX)
+        
+        elif page == "Player Profile":
+            from views.player import display_player_profile
+            display_player_profile(snapshot, filters, DATA_DIR)
+        
+        elif page == "Team Analysis":
+            from views.teams import display_team_analysis
+            display_team_analysis(snapshot, filters, selected_team)
+        
+    if STATS_FILE and filters is not None:
+        write_cache_stats(STATS_FILE, snapshot, filters)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+Dashboard Startup Benchmark
+- Import time and peak memory of each library the dashboard can use, each
+  measured in a fresh interpreter
+- Cold first paint of the app with Streamlit's AppTest (fresh interpreter),
+  then the first visit to every other page, and which heavy libraries were
+  loaded at each point
+
+Usage:
+    python benchmark_startup.py
+    python benchmark_startup.py --app app_before.py    # compare another version of the app
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+LIBRARIES = ['streamlit', 'pandas', 'numpy', 'pyarrow.parquet', 'plotly.express',
+             'plotly.graph_objects', 'matplotlib.pyplot', 'PIL.Image']
+PAGES = ["Home/Overview", "Batting Analysis", "Bowling Analysis", "Player Clusters",
+         "Similar Players", "Player Profile", "Team Analysis"]
+
+# Peak resident memory of the current process, in MB (VmHWM resets on exec)
+PEAK_MB = ("int([l for l in open('/proc/self/status') if l.startswith('VmHWM')][0].split()[1])"
+           " / 1024")
+
+def _run_child(code):
+    """Run `code` in a fresh interpreter and parse the JSON it prints last"""
+    out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                         cwd=APP_DIR)
+    if out.returncode != 0:
+        raise RuntimeError(out.stderr.strip().splitlines()[-1] if out.stderr else 'failed')
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+def library_costs(libraries=LIBRARIES):
+    """{library: (import seconds, peak MB)} or None for missing libraries"""
+    costs = {}
+    for lib in libraries:
+        code = (f"import json, time; t = time.perf_counter(); import {lib}; "
+                f"print(json.dumps([time.perf_counter() - t, {PEAK_MB}]))")
+        try:
+            costs[lib] = tuple(_run_child(code))
+        except RuntimeError:
+            costs[lib] = None
+    return costs
+
+FIRST_PAINT = '''
+import json, sys, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({app!r}, default_timeout=120)
+at.run()
+loaded = lambda: [lib for lib in {libraries!r} if lib in sys.modules]
+result = {{'first_paint_s': time.perf_counter() - start,
+           'first_paint_peak_mb': {peak},
+           'loaded_first_paint': loaded(),
+           'errors': [str(e.value) for e in at.exception],
+           'pages': {{}}}}
+for page in {pages!r}[1:]:
+    t = time.perf_counter()
+    at.sidebar.selectbox[0].select(page).run()
+    result['pages'][page] = time.perf_counter() - t
+result['loaded_all_pages'] = loaded()
+result['peak_mb'] = {peak}
+print(json.dumps(result))
+'''
+
+def first_paint(app_path):
+    """Cold start and first visit of each page for the app at `app_path`"""
+    code = FIRST_PAINT.format(app=os.path.abspath(app_path), libraries=LIBRARIES,
+                              pages=PAGES, peak=PEAK_MB)
+    return _run_child(code)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark dashboard import time and first paint")
+    parser.add_argument('--app', default=os.path.join(APP_DIR, 'app.py'))
+    args = parser.parse_args(argv)
+
+    print("\n=== LIBRARY IMPORT COST (fresh interpreter each) ===")
+    for lib, cost in library_costs().items():
+        status = f"{cost[0]:6.2f}s {cost[1]:6.0f} MB peak" if cost else "not installed"
+        print(f"{lib:>21}: {status}")
+
+    print(f"\n=== FIRST PAINT: {os.path.relpath(args.app, APP_DIR)} ===")
+    try:
+        result = first_paint(args.app)
+    except RuntimeError as e:
+        print(f"Could not run the app with streamlit.testing (streamlit >= 1.28 needed): {e}")
+        return
+    for error in result['errors']:
+        print(f"App error: {error}")
+    print(f"Cold start to first page: {result['first_paint_s']:.2f}s, "
+          f"{result['first_paint_peak_mb']:.0f} MB peak")
+    print(f"Libraries loaded by then: {', '.join(result['loaded_first_paint']) or 'none'}")
+    print("\nFirst visit to each other page:")
+    for page, seconds in result['pages'].items():
+        print(f"{page:>20}: {seconds * 1000:7.1f} ms")
+    print(f"\nAfter all pages: {', '.join(result['loaded_all_pages'])}; "
+          f"{result['peak_mb']:.0f} MB peak")
+
+if __name__ == "__main__":
+    main()
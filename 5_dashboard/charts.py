@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""
+Dashboard Charts
+- Scatter plots use WebGL traces (Scattergl), which stay responsive with far
+  more points than SVG ones
+- Above MAX_POINTS the rows are downsampled on the server before anything is
+  sent to the browser, stratified by colour group so small clusters stay visible
+- Distributions are drawn from pre-binned counts, never from raw rows
+"""
+
+import numpy as np
+import pandas as pd
+
+# Most points a scatter sends to the browser
+MAX_POINTS = 20_000
+
+def downsample(df, max_points=MAX_POINTS, by=None, seed=0):
+    """At most about `max_points` rows of `df`
+
+    With `by`, each group is sampled in proportion to its size and keeps at
+    least one row. The sample is seeded, so reruns show the same points.
+    """
+    if len(df) <= max_points:
+        return df
+    rng = np.random.default_rng(seed)
+    if by is None:
+        return df.iloc[np.sort(rng.choice(len(df), max_points, replace=False))]
+    # Row positions grouped by code; missing values (code -1) form their own group
+    codes = pd.factorize(df[by])[0] + 1
+    order = np.argsort(codes, kind='stable')
+    keep = []
+    for rows in np.split(order, np.cumsum(np.bincount(codes))[:-1]):
+        if len(rows):
+            quota = max(1, int(len(rows) * max_points / len(df)))
+            keep.append(rng.choice(rows, min(quota, len(rows)), replace=False))
+    return df.iloc[np.sort(np.concatenate(keep))]
+
+def scatter_gl(df, x, y, color=None, hover=None, title=None, labels=None,
+               max_points=MAX_POINTS):
+    """WebGL scatter of `df`, downsampled to `max_points`
+
+    Returns (figure, points shown). One trace per `color` value.
+    """
+    import plotly.graph_objects as go
+    labels = labels or {}
+    shown = downsample(df, max_points, color)
+    groups = shown.groupby(color, sort=True) if color else [(None, shown)]
+    marker = {'size': 6 if len(shown) > 5000 else 9, 'opacity': 0.7}
+    fig = go.Figure()
+    for key, group in groups:
+        fig.add_trace(go.Scattergl(
+            x=group[x], y=group[y], mode='markers', marker=marker,
+            name=f"{labels.get(color, color)} {key}" if color else None,
+            text=group[hover] if hover else None,
+            hovertemplate=(f"%{{text}}<br>{labels.get(x, x)}: %{{x:.2f}}"
+                           f"<br>{labels.get(y, y)}: %{{y:.2f}}<extra></extra>")
+        ))
+    fig.update_layout(title=title, xaxis_title=labels.get(x, x),
+                      yaxis_title=labels.get(y, y), showlegend=color is not None)
+    return fig, len(shown)
+
+def binned_quantiles(bins, counts, width, quantiles=(0.25, 0.5, 0.75)):
+    """Approximate quantiles of binned values, interpolated within each bin"""
+    order = np.argsort(bins)
+    bins, counts = np.asarray(bins)[order], np.asarray(counts, dtype=float)[order]
+    cumulative = np.cumsum(counts)
+    results = []
+    for q in quantiles:
+        target = q * cumulative[-1]
+        i = int(np.searchsorted(cumulative, target))
+        before = cumulative[i - 1] if i else 0.0
+        results.append((bins[i] + (target - before) / counts[i]) * width)
+    return results
+
+def histogram(bins, counts, width, title=None, xlabel=None, ylabel='Count'):
+    """Bar histogram from per-bin counts (bin b covers [b, b + 1) * width)"""
+    import plotly.graph_objects as go
+    left = np.asarray(bins) * width
+    fig = go.Figure(go.Bar(x=left + width / 2, y=counts, width=width,
+                           hovertemplate=f"{xlabel or 'Value'}: %{{x:.2f}}<br>{ylabel}: %{{y}}"
+                                         "<extra></extra>"))
+    fig.update_layout(title=title, xaxis_title=xlabel, yaxis_title=ylabel, bargap=0.05)
+    return fig
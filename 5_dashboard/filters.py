@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+"""
+Dashboard Team and Role Filters
+- Filters run on the snapshot's per-(player, team) partial sums, never on the
+  fact tables: each selection becomes a boolean lookup over the categorical
+  codes, so masking is one array gather per filter
+- Filtered leaderboards are re-summed per player with bincount
+- Results are cached per filter combination, so revisiting a selection is free
+- Table pages are sorted, searched and sliced here: the row order for each
+  (selection, sort, search) is computed once and cached, so fetching any page
+  of a large table is a slice of that order
+
+Usage:
+    python filters.py --data-dir ../data_collection_and_cleaning_output
+"""
+
+import argparse
+import itertools
+import os
+import time
+from functools import lru_cache
+
+import numpy as np
+
+from snapshot import (SNAPSHOT_DIR, batting_table, bowling_table, build_snapshot,
+                      load_snapshot)
+
+FILTER_CACHE_SIZE = 256
+# Cached row orders hold one integer per row, so fewer are kept
+ORDER_CACHE_SIZE = 16
+PAGE_SIZE = 25
+
+LEADERBOARDS = {
+    'batting': batting_table,
+    'bowling': bowling_table
+}
+
+def category_mask(column, values):
+    """Rows of a categorical column whose value is one of `values`
+
+    The lookup has one extra False entry so missing values (code -1) are
+    never selected.
+    """
+    lookup = np.append(column.cat.categories.isin(list(values)), False)
+    return lookup[column.cat.codes.to_numpy()]
+
+class FilterIndex:
+    """Filtered leaderboards and win rates over a loaded snapshot"""
+
+    def __init__(self, snapshot, cache_size=FILTER_CACHE_SIZE, order_cache_size=ORDER_CACHE_SIZE):
+        self.snapshot = snapshot
+        self._filtered = lru_cache(maxsize=cache_size)(self._compute)
+        self._ordered = lru_cache(maxsize=order_cache_size)(self._order)
+
+    def _compute(self, table, teams, roles):
+        if table == 'win_rates':
+            win_rates = self.snapshot['win_rates']
+            if not teams:
+                return win_rates
+            return win_rates[win_rates['Team'].isin(teams)].reset_index(drop=True)
+        if table == 'economy_bins':
+            bins = self.snapshot['economy_bins']
+            if teams:
+                bins = bins[bins['team'].isin(teams)]
+            return bins.groupby('bin', as_index=False)['innings'].sum()
+
+        if not teams and not roles:
+            return self.snapshot[table]
+        parts = self.snapshot[f"{table}_parts"]
+        keep = np.ones(len(parts), dtype=bool)
+        if teams:
+            keep &= category_mask(parts['team'], teams)
+        if roles:
+            keep &= category_mask(parts['role'], roles)
+        return LEADERBOARDS[table](parts, keep)
+
+    def _order(self, table, teams, roles, sort_by, ascending, search):
+        """Row positions of a filtered table in display order, keeping rows
+        whose first (name) column contains `search`"""
+        frame = self._filtered(table, teams, roles)
+        if sort_by is None:
+            order = np.arange(len(frame))
+        else:
+            order = frame[sort_by].reset_index(drop=True).sort_values(
+                ascending=ascending, kind='stable', na_position='last').index.to_numpy()
+        if search:
+            names = frame.iloc[:, 0].astype(str)
+            keep = names.str.contains(search, case=False, regex=False).to_numpy()
+            order = order[keep[order]]
+        return order
+
+    def _query(self, table, teams, roles, sort_by, ascending, search):
+        return self._ordered(table, tuple(sorted(teams or ())), tuple(sorted(roles or ())),
+                             sort_by, bool(ascending), (search or '').strip())
+
+    def count(self, table, teams=(), roles=(), sort_by=None, ascending=False, search=''):
+        """Rows of the filtered table matching `search`"""
+        return len(self._query(table, teams, roles, sort_by, ascending, search))
+
+    def page(self, table, teams=(), roles=(), sort_by=None, ascending=False, search='',
+             page=0, page_size=PAGE_SIZE):
+        """One page of the filtered table, sorted and searched on the server
+
+        Returns (rows, total matching rows). Without `sort_by` rows keep the
+        table's own order (runs, wickets or win rate descending).
+        """
+        order = self._query(table, teams, roles, sort_by, ascending, search)
+        start = page * page_size
+        rows = self.get(table, teams, roles).iloc[order[start:start + page_size]]
+        return rows, len(order)
+
+    def get(self, table, teams=(), roles=()):
+        """`table` restricted to the selected teams and player roles
+
+        An empty selection means no filter. Returned frames are shared by
+        the cache and must not be modified.
+        """
+        return self._filtered(table, tuple(sorted(teams or ())), tuple(sorted(roles or ())))
+
+    def batting(self, teams=(), roles=()):
+        return self.get('batting', teams, roles)
+
+    def bowling(self, teams=(), roles=()):
+        return self.get('bowling', teams, roles)
+
+    def win_rates(self, teams=()):
+        return self.get('win_rates', teams)
+
+    def economy_bins(self, teams=()):
+        """Bowling innings per economy bin for the selected teams"""
+        return self.get('economy_bins', teams)
+
+    def cache_info(self):
+        return self._filtered.cache_info()
+
+    def cache_stats(self):
+        """Hits, misses and size of the filter and table-order caches"""
+        return {name: cache.cache_info()._asdict()
+                for name, cache in (('filter', self._filtered), ('order', self._ordered))}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time filtered dashboard aggregates")
+    parser.add_argument('--data-dir', default='.')
+    parser.add_argument('--combinations', type=int, default=50,
+                        help="Team/role selections to time")
+    args = parser.parse_args(argv)
+
+    snapshot_dir = os.path.join(args.data_dir, SNAPSHOT_DIR)
+    build_snapshot(args.data_dir, snapshot_dir)
+    index = FilterIndex(load_snapshot(snapshot_dir))
+    teams = list(index.snapshot['win_rates']['Team'])
+    roles = list(index.snapshot['players']['playingRole'].dropna().unique())
+    rng = np.random.default_rng(0)
+    selections = [(list(rng.choice(teams, size=rng.integers(0, 4), replace=False)),
+                   list(rng.choice(roles, size=rng.integers(0, 3), replace=False)))
+                  for _ in range(args.combinations)]
+
+    print("\n=== DASHBOARD FILTER LATENCY ===")
+    print(f"{len(index.snapshot['batting_parts']):,} batting and "
+          f"{len(index.snapshot['bowling_parts']):,} bowling (player, team) rows")
+    for label in ('first request', 'cached'):
+        timings = []
+        for (team_sel, role_sel), table in itertools.product(selections, LEADERBOARDS):
+            start = time.perf_counter()
+            index.get(table, team_sel, role_sel)
+            index.win_rates(team_sel)
+            timings.append((time.perf_counter() - start) * 1000)
+        print(f"{label:>13}: median {np.median(timings):.2f} ms, "
+              f"max {np.max(timings):.2f} ms over {len(timings)} page updates")
+
+    print("\n=== TABLE PAGE LATENCY (all bowlers) ===")
+    total = index.count('bowling')
+    pages = rng.integers(0, max(1, total // PAGE_SIZE), size=20)
+    for sort_by, ascending in [(None, False), ('economy', True), ('bowlerName', True)]:
+        start = time.perf_counter()
+        index.page('bowling', sort_by=sort_by, ascending=ascending)
+        first = (time.perf_counter() - start) * 1000
+        timings = []
+        for page in pages:
+            start = time.perf_counter()
+            index.page('bowling', sort_by=sort_by, ascending=ascending, page=int(page))
+            timings.append((time.perf_counter() - start) * 1000)
+        print(f"{sort_by or 'default order':>13}: first page {first:.2f} ms, "
+              f"other pages median {np.median(timings):.2f} ms of {total:,} rows")
+
+if __name__ == "__main__":
+    main()
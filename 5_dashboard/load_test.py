@@ -0,0 +1,377 @@
+# -*- coding: utf-8 -*-
+"""
+Dashboard Load Test
+- Starts the app headless with `streamlit run` on a local port and drives
+  simulated analyst sessions over Streamlit's websocket protocol: each one
+  switches pages, changes the team and role filters and pages through the
+  tables, with a think time between clicks, all sessions at once
+- Records rerun latency percentiles (overall, per action and per page),
+  script errors, server memory (after the first session, at the end, per
+  extra session and peak) and the hit rates of the filter and table-order caches
+- Writes a JSON report; --compare prints two reports side by side, e.g. the
+  same scenario before and after a change
+
+Needs the `websockets` package (pip install websockets).
+
+Usage:
+    python load_test.py --sessions 50 --duration 60 --report after.json
+    python load_test.py --app app_before.py --report before.json
+    python load_test.py --compare before.json after.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+import numpy as np
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DATA_DIR = os.path.join(APP_DIR, '..', 'data_collection_and_cleaning_output')
+
+# Share of clicks of each kind; 'table' (sorting and paging) falls back to a
+# page switch on pages without a paginated table
+ACTIONS = {'page': 0.3, 'teams': 0.25, 'roles': 0.15, 'table': 0.3}
+WIDGET_TYPES = ('selectbox', 'multiselect', 'radio', 'number_input', 'text_input')
+PAGE_LABEL = "Select Page"
+
+# ------------------------------
+# Local App
+# ------------------------------
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def _memory_mb(pid, field='VmRSS'):
+    with open(f"/proc/{pid}/status") as f:
+        line = next(line for line in f if line.startswith(field))
+    return int(line.split()[1]) / 1024
+
+def start_app(app, data_dir, stats_file, port, timeout=60):
+    """Run the app headless on `port` and wait until it answers health checks"""
+    cmd = [sys.executable, '-m', 'streamlit', 'run', os.path.abspath(app),
+           '--server.headless', 'true', '--server.port', str(port),
+           '--server.fileWatcherType', 'none', '--browser.gatherUsageStats', 'false',
+           '--', '--data-dir', os.path.abspath(data_dir), '--stats-file', stats_file]
+    proc = subprocess.Popen(cmd, cwd=os.path.dirname(os.path.abspath(app)),
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"streamlit exited with code {proc.returncode}")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1):
+                return proc
+        except OSError:
+            time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError(f"app did not start within {timeout}s")
+
+# ------------------------------
+# Simulated Sessions
+# ------------------------------
+def widget_state(kind, proto, value):
+    """WidgetState setting a widget to `value` (option labels for choice widgets)
+
+    Streamlit up to 1.3x sends choices as option indices, later versions as
+    the option strings (their protos have a raw_value(s) field).
+    """
+    from streamlit.proto.WidgetStates_pb2 import WidgetState
+    state = WidgetState(id=proto.id)
+    by_string = any(name.startswith('raw_value') for name in proto.DESCRIPTOR.fields_by_name)
+    if kind in ('selectbox', 'radio'):
+        if by_string:
+            state.string_value = value
+        else:
+            state.int_value = list(proto.options).index(value)
+    elif kind == 'multiselect':
+        if by_string:
+            state.string_array_value.data[:] = value
+        else:
+            state.int_array_value.data[:] = [list(proto.options).index(v) for v in value]
+    elif kind == 'number_input':
+        if proto.data_type == type(proto).INT:
+            state.int_value = int(value)
+        else:
+            state.double_value = float(value)
+    else:
+        state.string_value = value
+    return state
+
+class Session:
+    """One simulated browser tab: its websocket, widget values and timings
+
+    Like the browser, every rerun sends the values of all widgets set so far.
+    """
+
+    def __init__(self, url, seed):
+        self.url = url
+        self.rng = random.Random(seed)
+        self.widgets = {}
+        self.states = {}
+        self.page = None
+        self.timings = []
+        self.errors = []
+
+    async def connect(self):
+        import websockets
+        self.ws = await websockets.connect(self.url, subprotocols=['streamlit'], max_size=None)
+
+    async def close(self):
+        await self.ws.close()
+
+    async def rerun(self, action):
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+        msg = BackMsg()
+        msg.rerun_script.query_string = ''
+        msg.rerun_script.widget_states.widgets.extend(self.states.values())
+        start = time.perf_counter()
+        await self.ws.send(msg.SerializeToString())
+        widgets = {}
+        while True:
+            forward = ForwardMsg()
+            forward.ParseFromString(await self.ws.recv())
+            kind = forward.WhichOneof('type')
+            if kind == 'script_finished':
+                break
+            if kind != 'delta' or forward.delta.WhichOneof('type') != 'new_element':
+                continue
+            element = forward.delta.new_element
+            el_type = element.WhichOneof('type')
+            if el_type == 'exception':
+                self.errors.append(element.exception.message)
+            elif el_type in WIDGET_TYPES:
+                proto = getattr(element, el_type)
+                widgets[proto.label] = (el_type, proto)
+        self.timings.append((action, self.page, time.perf_counter() - start))
+        self.widgets = widgets
+
+    def _find(self, prefix):
+        return next((w for label, w in self.widgets.items() if label.startswith(prefix)), None)
+
+    def _set(self, widget, value):
+        kind, proto = widget
+        self.states[proto.id] = widget_state(kind, proto, value)
+
+    def click(self):
+        """Change one widget at random; returns the action name"""
+        action = self.rng.choices(list(ACTIONS), weights=list(ACTIONS.values()))[0]
+        table = self._find("Page (of")
+        if action == 'table' and table is None:
+            action = 'page'
+        if action == 'page':
+            _, proto = self.widgets[PAGE_LABEL]
+            self.page = self.rng.choice(list(proto.options))
+            self._set(self.widgets[PAGE_LABEL], self.page)
+        elif action in ('teams', 'roles'):
+            widget = self._find("Select Teams" if action == 'teams' else "Select Player Roles")
+            if widget is not None:
+                options = list(widget[1].options)
+                size = self.rng.randint(0, min(3 if action == 'teams' else 2, len(options)))
+                self._set(widget, self.rng.sample(options, size))
+        elif self.rng.random() < 0.7:
+            self._set(table, self.rng.randint(1, max(1, int(table[1].max))))
+        else:
+            sort = self._find("Sort by")
+            if sort is not None:
+                self._set(sort, self.rng.choice(list(sort[1].options)))
+        return action
+
+async def run_session(session, deadline, think_time, start_delay):
+    await asyncio.sleep(start_delay)
+    await session.connect()
+    await session.rerun('open')
+    session.page = list(session.widgets[PAGE_LABEL][1].options)[0]
+    while time.perf_counter() < deadline:
+        await asyncio.sleep(session.rng.uniform(*think_time))
+        await session.rerun(session.click())
+
+async def run_load(url, sessions, duration, think_time, ramp_up, seed, on_warm, on_done):
+    """Drive `sessions` concurrent sessions
+
+    `on_warm` runs once the first session has loaded, `on_done` after the
+    last click while every session is still connected.
+    """
+    first = Session(url, seed)
+    await first.connect()
+    await first.rerun('open')
+    first.page = list(first.widgets[PAGE_LABEL][1].options)[0]
+    on_warm()
+    deadline = time.perf_counter() + duration
+    others = [Session(url, seed + i) for i in range(1, sessions)]
+    everyone = [first] + others
+    tasks = [run_session(s, deadline, think_time, ramp_up * i / max(1, len(others)))
+             for i, s in enumerate(others)]
+
+    async def keep_clicking():
+        while time.perf_counter() < deadline:
+            await asyncio.sleep(first.rng.uniform(*think_time))
+            await first.rerun(first.click())
+
+    await asyncio.gather(keep_clicking(), *tasks)
+    on_done()
+    await asyncio.gather(*(s.close() for s in everyone))
+    return everyone
+
+# ------------------------------
+# Report
+# ------------------------------
+def _percentiles(seconds):
+    ms = np.asarray(seconds) * 1000
+    return {'count': int(len(ms)), 'p50_ms': float(np.percentile(ms, 50)),
+            'p90_ms': float(np.percentile(ms, 90)), 'p99_ms': float(np.percentile(ms, 99)),
+            'max_ms': float(ms.max())}
+
+def _hit_rates(stats):
+    if stats is None:
+        return None
+    rates = {}
+    for name in ('filter', 'order'):
+        info = stats[name]
+        calls = info['hits'] + info['misses']
+        rates[name] = dict(info, hit_rate=info['hits'] / calls if calls else None)
+    return rates
+
+def load_test(app, data_dir, sessions, duration, think_time=(0.5, 2.0), ramp_up=5.0, seed=0):
+    """Run the scenario against a freshly started app and return the report"""
+    port = _free_port()
+    stats_file = os.path.join(tempfile.mkdtemp(prefix='dashboard_load_'), 'cache_stats.json')
+    proc = start_app(app, data_dir, stats_file, port)
+    memory = {'start_mb': _memory_mb(proc.pid)}
+    try:
+        def on_warm():
+            memory['one_session_mb'] = _memory_mb(proc.pid)
+
+        def on_done():
+            memory['end_mb'] = _memory_mb(proc.pid)
+            memory['peak_mb'] = _memory_mb(proc.pid, 'VmHWM')
+
+        start = time.perf_counter()
+        everyone = asyncio.run(run_load(f"ws://127.0.0.1:{port}/_stcore/stream", sessions,
+                                        duration, think_time, ramp_up, seed, on_warm, on_done))
+        elapsed = time.perf_counter() - start
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+
+    timings = [t for s in everyone for t in s.timings]
+    errors = [e for s in everyone for e in s.errors]
+    memory['per_session_mb'] = (memory['end_mb'] - memory['one_session_mb']) / max(1, sessions - 1)
+    stats = None
+    if os.path.exists(stats_file):
+        with open(stats_file) as f:
+            stats = json.load(f)
+    report = {
+        'app': os.path.relpath(os.path.abspath(app), APP_DIR),
+        'data_dir': os.path.abspath(data_dir),
+        'sessions': sessions,
+        'duration_s': round(elapsed, 1),
+        'think_time_s': list(think_time),
+        'reruns': len(timings),
+        'reruns_per_s': len(timings) / elapsed,
+        'errors': len(errors),
+        'error_samples': sorted(set(errors))[:5],
+        'latency': _percentiles([t for _, _, t in timings]),
+        'by_action': {a: _percentiles([t for act, _, t in timings if act == a])
+                      for a in sorted({act for act, _, _ in timings})},
+        'by_page': {p: _percentiles([t for _, page, t in timings if page == p])
+                    for p in sorted({page for _, page, _ in timings if page})},
+        'memory': memory,
+        'caches': _hit_rates(stats)
+    }
+    return report
+
+def print_report(report):
+    print(f"\n=== DASHBOARD LOAD TEST: {report['app']} ===")
+    print(f"{report['sessions']} sessions for {report['duration_s']}s: {report['reruns']:,} reruns "
+          f"({report['reruns_per_s']:.1f}/s), {report['errors']} errors")
+    for error in report['error_samples']:
+        print(f"  error: {error}")
+    lat = report['latency']
+    print(f"Rerun latency: p50 {lat['p50_ms']:.0f} ms, p90 {lat['p90_ms']:.0f} ms, "
+          f"p99 {lat['p99_ms']:.0f} ms, max {lat['max_ms']:.0f} ms")
+    for group in ('by_action', 'by_page'):
+        print(f"\n{group.replace('_', ' ').capitalize()}:")
+        for name, lat in report[group].items():
+            print(f"{name:>20}: {lat['count']:5d} reruns, p50 {lat['p50_ms']:6.0f} ms, "
+                  f"p99 {lat['p99_ms']:6.0f} ms")
+    mem = report['memory']
+    print(f"\nServer memory: {mem['one_session_mb']:.0f} MB with one session, "
+          f"{mem['end_mb']:.0f} MB at the end, {mem['per_session_mb']:.2f} MB per extra session, "
+          f"{mem['peak_mb']:.0f} MB peak")
+    if report['caches'] is None:
+        print("Cache statistics: not reported by this app version")
+        return
+    for name, info in report['caches'].items():
+        rate = f"{info['hit_rate']:.1%}" if info['hit_rate'] is not None else 'n/a'
+        print(f"{name.capitalize()} cache: {rate} hits ({info['hits']:,} hits, "
+              f"{info['misses']:,} misses, {info['currsize']} entries)")
+
+def compare_reports(before, after):
+    """Key metrics of two reports side by side, with the relative change"""
+    def metrics(report):
+        values = {
+            'reruns per second': report['reruns_per_s'],
+            'errors': report['errors'],
+            'p50 latency (ms)': report['latency']['p50_ms'],
+            'p90 latency (ms)': report['latency']['p90_ms'],
+            'p99 latency (ms)': report['latency']['p99_ms'],
+            'memory per session (MB)': report['memory']['per_session_mb'],
+            'peak memory (MB)': report['memory']['peak_mb']
+        }
+        for name, info in (report['caches'] or {}).items():
+            values[f"{name} cache hit rate"] = info['hit_rate']
+        return values
+
+    old, new = metrics(before), metrics(after)
+    print(f"\n=== LOAD TEST COMPARISON: {before['app']} -> {after['app']} ===")
+    print(f"{'':>26} {'before':>10} {'after':>10} {'change':>8}")
+    for name in list(old) + [n for n in new if n not in old]:
+        a, b = old.get(name), new.get(name)
+        change = f"{(b - a) / a:+.0%}" if a and b is not None else ''
+        fmt = lambda v: f"{v:10.2f}" if v is not None else f"{'-':>10}"
+        print(f"{name:>26} {fmt(a)} {fmt(b)} {change:>8}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the dashboard with simulated sessions")
+    parser.add_argument('--app', default=os.path.join(APP_DIR, 'app.py'))
+    parser.add_argument('--data-dir', default=DEFAULT_DATA_DIR)
+    parser.add_argument('--sessions', type=int, default=50)
+    parser.add_argument('--duration', type=float, default=60.0, help="Seconds of clicking")
+    parser.add_argument('--think-time', type=float, nargs=2, default=[0.5, 2.0],
+                        metavar=('MIN', 'MAX'), help="Seconds between a session's clicks")
+    parser.add_argument('--ramp-up', type=float, default=5.0,
+                        help="Seconds over which sessions join")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--report', default=None, help="Write the JSON report here")
+    parser.add_argument('--compare', nargs=2, metavar=('BEFORE', 'AFTER'),
+                        help="Compare two saved reports instead of running")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        reports = []
+        for path in args.compare:
+            with open(path) as f:
+                reports.append(json.load(f))
+        compare_reports(*reports)
+        return
+
+    report = load_test(args.app, args.data_dir, args.sessions, args.duration,
+                       tuple(args.think_time), args.ramp_up, args.seed)
+    print_report(report)
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport written to {args.report}")
+
+if __name__ == "__main__":
+    main()
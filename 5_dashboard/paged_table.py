@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""
+Paginated Dashboard Tables
+- Sorting, name search and paging run on the server (FilterIndex.page), and
+  only the visible page is sent to the browser, with the total row count
+- The widgets' state is kept per table, and the page number is clamped when a
+  new filter or search leaves fewer pages
+"""
+
+import math
+
+import streamlit as st
+
+from filters import PAGE_SIZE
+
+DEFAULT_ORDER = "Default"
+
+def paged_table(filters, table, teams=(), roles=(), labels=None, page_size=PAGE_SIZE):
+    """Sortable, searchable table showing one page of `table` for the selection"""
+    labels = labels or {}
+    columns = list(filters.get(table, teams, roles).columns)
+
+    col1, col2, col3 = st.columns([2, 2, 1])
+    with col1:
+        search = st.text_input("Search by name", key=f"{table}_search")
+    with col2:
+        sort_by = st.selectbox("Sort by", [DEFAULT_ORDER] + columns, key=f"{table}_sort",
+                               format_func=lambda c: labels.get(c, c))
+    with col3:
+        order = st.radio("Order", ["Descending", "Ascending"], key=f"{table}_order",
+                         horizontal=True, disabled=sort_by == DEFAULT_ORDER)
+    query = dict(sort_by=None if sort_by == DEFAULT_ORDER else sort_by,
+                 ascending=order == "Ascending", search=search)
+
+    total = filters.count(table, teams, roles, **query)
+    if total == 0:
+        st.info("No rows match.")
+        return
+    pages = math.ceil(total / page_size)
+    page_key = f"{table}_page"
+    if st.session_state.get(page_key, 1) > pages:
+        st.session_state[page_key] = pages
+    page = st.number_input(f"Page (of {pages:,})", min_value=1, max_value=pages, key=page_key)
+
+    rows, total = filters.page(table, teams, roles, page=page - 1, page_size=page_size, **query)
+    st.dataframe(rows.round(2).rename(columns=labels), hide_index=True)
+    first = (page - 1) * page_size + 1
+    st.caption(f"Rows {first:,}-{first + len(rows) - 1:,} of {total:,}")
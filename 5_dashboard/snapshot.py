@@ -0,0 +1,478 @@
+# -*- coding: utf-8 -*-
+"""
+Dashboard Aggregate Snapshot
+- Computes every aggregate the dashboard shows (overview totals, batting and
+  bowling leaderboards, team win rates, head-to-head records, the binned
+  per-innings economy distribution) in one build step
+- Keeps per-(player, team) partial sums with categorical team and role codes,
+  from which filtered leaderboards are re-summed (see filters.py)
+- Writes them as a versioned set of Parquet tables. Each input CSV is tracked
+  by size and content hash: when one changes, only the tables derived from it
+  are rebuilt, and rows appended to a CSV are read alone and added onto the
+  stored partial sums and counts
+- A version holds only the tables it rebuilt; its metadata points every other
+  table at the earlier version that wrote it
+- The app opens the latest snapshot once, reads each table on first use and
+  renders pages without grouping (see watcher.py for live reloads)
+
+Layout:
+    <snapshot_dir>/v<N>/<table>.parquet
+    <snapshot_dir>/v<N>/metadata.json
+    <snapshot_dir>/LATEST
+
+Usage:
+    python snapshot.py --data-dir ../data_collection_and_cleaning_output
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from instrumentation import span
+
+INPUT_FILES = {
+    'matches': 'dim_match_summary.csv',
+    'players': 'dim_players_no_images.csv',
+    'batting': 'fact_batting_summary.csv',
+    'bowling': 'fact_bowling_summary.csv'
+}
+# Tables derived from each input, rebuilt when it changes (players sets the roles)
+DEPENDENT_TABLES = {
+    'matches': ['overview', 'win_rates', 'head_to_head'],
+    'players': ['batting', 'bowling', 'batting_parts', 'bowling_parts', 'players'],
+    'batting': ['overview', 'batting', 'batting_parts'],
+    'bowling': ['overview', 'bowling', 'bowling_parts', 'economy_bins']
+}
+# Bump when an aggregate definition changes so existing snapshots are rebuilt
+SNAPSHOT_FORMAT = 5
+SNAPSHOT_DIR = 'dashboard_snapshot'
+
+# Per-innings economy distribution: fixed-width bins, the last one open-ended
+ECONOMY_BIN_WIDTH = 0.5
+ECONOMY_BINS = 72
+
+# ------------------------------
+# Aggregates
+# ------------------------------
+def _numeric(df, cols):
+    return df.assign(**{c: pd.to_numeric(df[c], errors='coerce') for c in cols})
+
+def overs_to_balls(overs):
+    """Cricket overs notation (3.4 = 3 overs and 4 balls) to balls"""
+    whole = np.floor(overs)
+    return whole * 6 + np.round((overs - whole) * 10)
+
+def _categorize(parts, players):
+    """Attach each player's role and store player, team and role as categoricals"""
+    roles = players.drop_duplicates('name').set_index('name')['playingRole']
+    parts = parts.drop(columns='role', errors='ignore')
+    parts['role'] = parts['player'].astype(object).map(roles)
+    for col in ('player', 'team', 'role'):
+        parts[col] = parts[col].astype('category')
+    return parts
+
+def _add_counts(previous, new, keys):
+    """Add the counts in `new` onto `previous`, matching rows on `keys`"""
+    columns = keys + [c for c in new.columns if c not in keys]
+    combined = pd.concat([frame[columns].astype({k: object for k in keys})
+                          for frame in (previous, new)], ignore_index=True)
+    return combined.groupby(keys).sum().reset_index()
+
+def batting_parts(batting, players, previous=None):
+    """Runs, balls and boundaries per (batter, team), the base of every batting leaderboard
+
+    With `previous` parts, `batting` holds only new rows, which are added on.
+    """
+    batting = _numeric(batting, ['runs', 'balls', '4s', '6s'])
+    parts = batting.groupby(['batsmanName', 'teamInnings'])[['runs', 'balls', '4s', '6s']].sum()
+    parts = parts.reset_index().rename(columns={'batsmanName': 'player', 'teamInnings': 'team'})
+    if previous is not None:
+        parts = _add_counts(previous, parts, ['player', 'team'])
+    return _categorize(parts, players)
+
+def bowling_parts(bowling, players, previous=None):
+    """Wickets, runs conceded and balls per (bowler, team), optionally added onto `previous`"""
+    bowling = _numeric(bowling, ['wickets', 'runs', 'overs'])
+    bowling = bowling.assign(balls=overs_to_balls(bowling['overs']))
+    parts = bowling.groupby(['bowlerName', 'bowlingTeam'])[['wickets', 'runs', 'balls']].sum()
+    parts = parts.reset_index().rename(columns={'bowlerName': 'player', 'bowlingTeam': 'team'})
+    if previous is not None:
+        parts = _add_counts(previous, parts, ['player', 'team'])
+    return _categorize(parts, players)
+
+def _player_sums(parts, columns, keep=None):
+    """Sum `columns` per player over the kept part rows, by categorical code
+
+    Returns (player names, {column: sums}) for players with at least one
+    kept row.
+    """
+    codes = parts['player'].cat.codes.to_numpy()
+    names = parts['player'].cat.categories
+    if keep is not None:
+        codes = codes[keep]
+    present = np.bincount(codes, minlength=len(names)) > 0
+    sums = {}
+    for col in columns:
+        values = parts[col].to_numpy(dtype=float, na_value=0)
+        if keep is not None:
+            values = values[keep]
+        sums[col] = np.bincount(codes, weights=values, minlength=len(names))[present]
+    return names[present], sums
+
+def batting_table(parts, keep=None):
+    """Per-batter totals, strike rate and boundary share, by runs descending"""
+    names, sums = _player_sums(parts, ['runs', 'balls', '4s', '6s'], keep)
+    table = pd.DataFrame({'batsmanName': np.asarray(names, dtype=object)})
+    for col, values in sums.items():
+        table[col] = values.astype('int64')
+    table['strike_rate'] = (table['runs'] / table['balls']) * 100
+    table['boundary_percentage'] = ((table['4s'] + table['6s']) / table['balls']) * 100
+    return table.sort_values('runs', ascending=False, kind='stable').reset_index(drop=True)
+
+def bowling_table(parts, keep=None):
+    """Per-bowler wickets, runs conceded, overs and economy, by wickets descending"""
+    names, sums = _player_sums(parts, ['wickets', 'runs', 'balls'], keep)
+    table = pd.DataFrame({'bowlerName': np.asarray(names, dtype=object)})
+    for col, values in sums.items():
+        table[col] = values.astype('int64')
+    table['overs'] = table['balls'] // 6 + (table['balls'] % 6) / 10
+    table['economy'] = table['runs'] / (table['balls'] / 6)
+    table = table[['bowlerName', 'wickets', 'runs', 'overs', 'balls', 'economy']]
+    return table.sort_values('wickets', ascending=False, kind='stable').reset_index(drop=True)
+
+def win_rate_table(matches, previous=None):
+    """Matches, wins and win rate (%) per team, optionally added onto `previous`
+
+    Ties on win rate are ordered by team name, so an incremental update
+    gives the same table as a full build.
+    """
+    teams = pd.concat([matches['team1'], matches['team2']])
+    played = teams.value_counts(sort=False)
+    wins = matches['winner'].value_counts().reindex(played.index, fill_value=0)
+    table = pd.DataFrame({
+        'Team': played.index,
+        'Matches': played.to_numpy(),
+        'Wins': wins.to_numpy()
+    })
+    if previous is not None:
+        table = _add_counts(previous, table, ['Team'])
+    table['WinRate'] = table['Wins'] / table['Matches'] * 100
+    return table.sort_values(['WinRate', 'Team'], ascending=[False, True],
+                             kind='stable').reset_index(drop=True)
+
+def head_to_head_table(matches, previous=None):
+    """Matches and wins for every pair of teams that met, in both orders"""
+    pairs = pd.concat([
+        pd.DataFrame({'team1': matches['team1'], 'team2': matches['team2'],
+                      'winner': matches['winner']}),
+        pd.DataFrame({'team1': matches['team2'], 'team2': matches['team1'],
+                      'winner': matches['winner']})
+    ])
+    pairs['team1_won'] = pairs['winner'] == pairs['team1']
+    pairs['team2_won'] = pairs['winner'] == pairs['team2']
+    table = pairs.groupby(['team1', 'team2']).agg(
+        matches=('winner', 'size'), team1_wins=('team1_won', 'sum'),
+        team2_wins=('team2_won', 'sum')).reset_index()
+    if previous is not None:
+        table = _add_counts(previous, table, ['team1', 'team2'])
+    return table
+
+def economy_bin_table(bowling, previous=None):
+    """Bowling innings per (team, economy bin), optionally added onto `previous`
+
+    Bin b holds economies in [b, b + 1) * ECONOMY_BIN_WIDTH.
+    """
+    economy = pd.to_numeric(bowling['economy'], errors='coerce')
+    bins = np.clip(np.floor(economy / ECONOMY_BIN_WIDTH), 0, ECONOMY_BINS - 1)
+    table = pd.DataFrame({'team': bowling['bowlingTeam'], 'bin': bins}).dropna()
+    table = table.groupby(['team', 'bin']).size().rename('innings').reset_index()
+    if previous is not None:
+        table = _add_counts(previous, table, ['team', 'bin'])
+    return table.astype({'bin': 'int64', 'innings': 'int64'})
+
+def overview_table(total_matches, batting_stats, bowling_stats):
+    return pd.DataFrame({
+        'total_matches': [int(total_matches)],
+        'total_runs': [batting_stats['runs'].sum()],
+        'total_wickets': [bowling_stats['wickets'].sum()]
+    })
+
+def player_table(players):
+    return players[['name', 'team', 'playingRole']].reset_index(drop=True)
+
+def compute_aggregates(matches, players, batting, bowling):
+    """Every table the dashboard renders, keyed by name"""
+    bat_parts = batting_parts(batting, players)
+    bowl_parts = bowling_parts(bowling, players)
+    batting_stats = batting_table(bat_parts)
+    bowling_stats = bowling_table(bowl_parts)
+    return {
+        'overview': overview_table(len(matches), batting_stats, bowling_stats),
+        'batting': batting_stats,
+        'bowling': bowling_stats,
+        'batting_parts': bat_parts,
+        'bowling_parts': bowl_parts,
+        'win_rates': win_rate_table(matches),
+        'head_to_head': head_to_head_table(matches),
+        'economy_bins': economy_bin_table(bowling),
+        'players': player_table(players)
+    }
+
+# ------------------------------
+# Versioned Storage
+# ------------------------------
+def _hash_bytes(f, digest, size, chunk_size=1 << 20):
+    while size > 0:
+        chunk = f.read(min(chunk_size, size))
+        if not chunk:
+            break
+        digest.update(chunk)
+        size -= len(chunk)
+
+def input_state(path, previous=None):
+    """Size and content hash of an input file, and how it changed since `previous`
+
+    Returns (state, change). change is 'unchanged', 'appended' (the previous
+    content is an unchanged prefix ending in a newline, so only the rows
+    after it are new) or 'rewritten'. The file is hashed in one pass either way.
+    """
+    size = os.path.getsize(path)
+    digest = hashlib.sha256()
+    change = 'rewritten'
+    with open(path, 'rb') as f:
+        if previous is not None and 0 < previous['size'] <= size:
+            _hash_bytes(f, digest, previous['size'] - 1)
+            last = f.read(1)
+            digest.update(last)
+            if digest.copy().hexdigest() == previous['sha256']:
+                if size == previous['size']:
+                    change = 'unchanged'
+                elif last == b'\n':
+                    change = 'appended'
+        _hash_bytes(f, digest, size)
+    state = {'size': size, 'sha256': digest.hexdigest()}
+    if change != 'rewritten':
+        state['rows'] = previous['rows']
+    return state, change
+
+def read_appended(path, offset):
+    """The CSV rows after byte `offset`, parsed with the file's header"""
+    with open(path, 'rb') as f:
+        header = f.readline()
+        f.seek(offset)
+        return pd.read_csv(io.BytesIO(header + f.read()))
+
+def latest_version(snapshot_dir):
+    path = os.path.join(snapshot_dir, 'LATEST')
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return int(f.read().strip())
+
+def read_metadata(snapshot_dir, version=None):
+    version = version if version is not None else latest_version(snapshot_dir)
+    if version is None:
+        return None
+    with open(os.path.join(snapshot_dir, f"v{version}", 'metadata.json')) as f:
+        return json.load(f)
+
+def update_tables(data_dir, previous, changes, states):
+    """Rebuild the tables that depend on changed inputs
+
+    `previous` is the last Snapshot (None for a full build). Appended rows
+    are read alone and added onto its partial sums and counts; rewritten
+    inputs are read in full. Row counts are recorded in `states`.
+    """
+    def read(name, full=False):
+        path = os.path.join(data_dir, INPUT_FILES[name])
+        with span('load', table=name) as info:
+            if not full and previous is not None and changes[name] == 'appended':
+                rows = read_appended(path, previous.metadata['inputs'][name]['size'])
+                states[name]['rows'] += len(rows)
+            else:
+                rows = pd.read_csv(path)
+                states[name]['rows'] = len(rows)
+            info['rows'] = len(rows)
+        return rows
+
+    if previous is None:
+        return compute_aggregates(**{name: read(name) for name in INPUT_FILES})
+
+    stale = {table for name, change in changes.items() if change != 'unchanged'
+             for table in DEPENDENT_TABLES[name]}
+    tables = {}
+    if changes['players'] != 'unchanged':
+        # Player details can be edited in place, so the table is always re-read
+        players = read('players', full=True)
+        tables['players'] = player_table(players)
+    else:
+        players = previous['players']
+
+    for name, build_parts, build_table in (('batting', batting_parts, batting_table),
+                                           ('bowling', bowling_parts, bowling_table)):
+        if name not in stale:
+            continue
+        key = f"{name}_parts"
+        if changes[name] == 'unchanged':
+            # Only the roles changed
+            tables[key] = _categorize(previous[key].copy(), players)
+        else:
+            rows = read(name)
+            appended = changes[name] == 'appended'
+            tables[key] = build_parts(rows, players, previous[key] if appended else None)
+            if name == 'bowling':
+                tables['economy_bins'] = economy_bin_table(
+                    rows, previous['economy_bins'] if appended else None)
+        tables[name] = build_table(tables[key])
+
+    if changes['matches'] != 'unchanged':
+        matches = read('matches')
+        appended = changes['matches'] == 'appended'
+        tables['win_rates'] = win_rate_table(matches, previous['win_rates'] if appended else None)
+        tables['head_to_head'] = head_to_head_table(
+            matches, previous['head_to_head'] if appended else None)
+
+    if 'overview' in stale:
+        current = lambda name: tables[name] if name in tables else previous[name]
+        tables['overview'] = overview_table(states['matches']['rows'], current('batting'),
+                                            current('bowling'))
+    return tables
+
+@span('snapshot')
+def build_snapshot(data_dir='.', snapshot_dir=None, force=False):
+    """Write a new snapshot version holding the tables whose inputs changed
+
+    Returns the snapshot metadata, with 'status' set to 'built', 'updated'
+    (only some tables rebuilt) or 'unchanged', and 'changes' giving each
+    input's change.
+    """
+    snapshot_dir = snapshot_dir or os.path.join(data_dir, SNAPSHOT_DIR)
+    metadata = read_metadata(snapshot_dir)
+    if force or (metadata is not None and metadata.get('format') != SNAPSHOT_FORMAT):
+        metadata = None
+
+    start = time.perf_counter()
+    states, changes = {}, {}
+    with span('fingerprint', tables=len(INPUT_FILES)):
+        for name, path in INPUT_FILES.items():
+            before = metadata['inputs'][name] if metadata is not None else None
+            states[name], changes[name] = input_state(os.path.join(data_dir, path), before)
+    if metadata is not None and set(changes.values()) == {'unchanged'}:
+        metadata.update(status='unchanged', changes=changes)
+        return metadata
+
+    previous = load_snapshot(snapshot_dir) if metadata is not None else None
+    with span('aggregate', incremental=previous is not None):
+        tables = update_tables(data_dir, previous, changes, states)
+
+    version = (latest_version(snapshot_dir) or 0) + 1
+    out_dir = os.path.join(snapshot_dir, f"v{version}")
+    os.makedirs(out_dir, exist_ok=True)
+    with span('write', tables=len(tables)):
+        for name, table in tables.items():
+            table.to_parquet(os.path.join(out_dir, f"{name}.parquet"), index=False)
+    # Tables not rebuilt stay where an earlier version wrote them
+    entries = dict(previous.metadata['tables']) if previous is not None else {}
+    entries.update({name: {'rows': int(len(table)), 'version': version}
+                    for name, table in tables.items()})
+    current = lambda name: tables[name] if name in tables else previous[name]
+    metadata = {
+        'version': version,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'format': SNAPSHOT_FORMAT,
+        'inputs': states,
+        'tables': entries,
+        # Sidebar filter choices, so the app can offer them without reading a table
+        'teams': current('win_rates')['Team'].tolist(),
+        'roles': current('players')['playingRole'].dropna().unique().tolist(),
+        'build_s': round(time.perf_counter() - start, 3)
+    }
+    with open(os.path.join(out_dir, 'metadata.json'), 'w') as f:
+        json.dump(metadata, f, indent=2)
+    latest = os.path.join(snapshot_dir, 'LATEST')
+    with open(latest + '.tmp', 'w') as f:
+        f.write(str(version))
+    os.replace(latest + '.tmp', latest)
+    metadata.update(status='built' if previous is None else 'updated', changes=changes)
+    return metadata
+
+class Snapshot:
+    """Snapshot tables by name, each read from Parquet on first access
+
+    A page that shows only the overview never reads the leaderboards or
+    the partial sums behind the filters. Tables already loaded by an
+    earlier Snapshot are reused when they come from the same version.
+    """
+
+    def __init__(self, snapshot_dir, metadata, previous=None):
+        self.snapshot_dir = snapshot_dir
+        self.metadata = metadata
+        self._tables = {}
+        self._lock = threading.Lock()
+        if previous is not None:
+            for name, table in list(previous._tables.items()):
+                if previous.metadata['tables'][name] == metadata['tables'].get(name):
+                    self._tables[name] = table
+
+    def __getitem__(self, name):
+        if name not in self.metadata['tables']:
+            raise KeyError(name)
+        if name not in self._tables:
+            with self._lock:
+                if name not in self._tables:
+                    version = self.metadata['tables'][name]['version']
+                    self._tables[name] = pd.read_parquet(os.path.join(
+                        self.snapshot_dir, f"v{version}", f"{name}.parquet"))
+        return self._tables[name]
+
+    def __contains__(self, name):
+        return name in self.metadata['tables']
+
+    def loaded(self):
+        return list(self._tables)
+
+def load_snapshot(snapshot_dir, version=None, previous=None):
+    """Open a snapshot version (LATEST by default); tables load lazily
+
+    Pass the Snapshot being replaced as `previous` to keep its loaded
+    tables that did not change.
+    """
+    metadata = read_metadata(snapshot_dir, version)
+    if metadata is None:
+        raise FileNotFoundError(f"No dashboard snapshot in {snapshot_dir}; run snapshot.py")
+    return Snapshot(snapshot_dir, metadata, previous)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the dashboard aggregate snapshot")
+    parser.add_argument('--data-dir', default='.')
+    parser.add_argument('--snapshot-dir', default=None,
+                        help=f"Where snapshot versions are written (default: <data-dir>/{SNAPSHOT_DIR})")
+    parser.add_argument('--force', action='store_true', help="Write a new version even if unchanged")
+    args = parser.parse_args(argv)
+
+    snapshot_dir = args.snapshot_dir or os.path.join(args.data_dir, SNAPSHOT_DIR)
+    metadata = build_snapshot(args.data_dir, snapshot_dir, args.force)
+    timing = f" in {metadata['build_s']:.2f}s" if metadata['status'] != 'unchanged' else ''
+    print(f"\n=== DASHBOARD SNAPSHOT ===\nv{metadata['version']} {metadata['status']}{timing}")
+    print("Inputs: " + ", ".join(f"{name} {change}" for name, change in metadata['changes'].items()))
+    for name, entry in metadata['tables'].items():
+        rebuilt = ' (rebuilt)' if entry['version'] == metadata['version'] else ''
+        print(f"{name:>13}: {entry['rows']:,} rows, v{entry['version']}{rebuilt}")
+
+    start = time.perf_counter()
+    snapshot = load_snapshot(snapshot_dir)
+    for name in metadata['tables']:
+        snapshot[name]
+    print(f"Snapshot load (all tables): {(time.perf_counter() - start) * 1000:.1f} ms")
+
+if __name__ == "__main__":
+    main()
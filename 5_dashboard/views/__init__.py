@@ -0,0 +1,7 @@
+# -*- coding: utf-8 -*-
+"""
+Dashboard pages, one module per page
+
+app.py imports a page module only when that page is first opened, so the
+libraries a page needs (e.g. plotly for charts) are loaded on demand.
+"""
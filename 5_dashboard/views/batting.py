@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""
+Batting Analysis page: top run scorers for the sidebar selection
+"""
+
+import plotly.express as px
+import streamlit as st
+
+from paged_table import paged_table
+
+def display_batting_analysis(filters, selected_team, selected_roles):
+    st.title("Batting Analysis")
+    
+    if filters is None:
+        st.warning("Data not found. Please check your data files.")
+        return
+    
+    # Top run scorers for the sidebar selection (already sorted by runs)
+    st.subheader("Top Run Scorers")
+    top_batsmen = filters.batting(selected_team, selected_roles).head(10)
+    if top_batsmen.empty:
+        st.info("No batters match the selected teams and roles.")
+        return
+    
+    # Bar chart for top run scorers
+    fig = px.bar(
+        top_batsmen, 
+        x='batsmanName', 
+        y='runs',
+        title='Top 10 Run Scorers',
+        labels={'batsmanName': 'Batsman', 'runs': 'Total Runs'},
+        color='runs'
+    )
+    st.plotly_chart(fig, use_container_width=True)
+    
+    # Scatter plot for strike rate vs boundary percentage
+    st.subheader("Strike Rate vs Boundary Percentage")
+    fig = px.scatter(
+        top_batsmen,
+        x='strike_rate',
+        y='boundary_percentage',
+        size='runs',
+        hover_name='batsmanName',
+        title='Strike Rate vs Boundary Percentage',
+        labels={
+            'strike_rate': 'Strike Rate',
+            'boundary_percentage': 'Boundary Percentage (%)',
+            'runs': 'Total Runs'
+        }
+    )
+    st.plotly_chart(fig, use_container_width=True)
+    
+    # Every selected player, one page at a time (sorted and searched on the server)
+    st.subheader("Detailed Batting Statistics")
+    paged_table(filters, 'batting', selected_team, selected_roles, labels={
+        'batsmanName': 'Batsman', 'runs': 'Runs', 'balls': 'Balls', 'strike_rate': 'Strike Rate',
+        'boundary_percentage': 'Boundary %'
+    })
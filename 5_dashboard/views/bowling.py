@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""
+Bowling Analysis page: top wicket takers, economy distribution and wickets
+against economy for the sidebar selection
+"""
+
+import plotly.express as px
+import streamlit as st
+
+from charts import binned_quantiles, histogram, scatter_gl
+from paged_table import paged_table
+from snapshot import ECONOMY_BIN_WIDTH
+
+def display_bowling_analysis(filters, selected_team, selected_roles):
+    st.title("Bowling Analysis")
+    
+    if filters is None:
+        st.warning("Data not found. Please check your data files.")
+        return
+    
+    # Top wicket takers for the sidebar selection (already sorted by wickets)
+    st.subheader("Top Wicket Takers")
+    top_bowlers = filters.bowling(selected_team, selected_roles).head(10)
+    if top_bowlers.empty:
+        st.info("No bowlers match the selected teams and roles.")
+        return
+    
+    # Bar chart for top wicket takers
+    fig = px.bar(
+        top_bowlers,
+        x='bowlerName',
+        y='wickets',
+        title='Top 10 Wicket Takers',
+        labels={'bowlerName': 'Bowler', 'wickets': 'Total Wickets'},
+        color='wickets'
+    )
+    st.plotly_chart(fig, use_container_width=True)
+    
+    # Per-innings economy distribution from the snapshot's binned counts
+    st.subheader("Bowling Economy Analysis")
+    bins = filters.economy_bins(selected_team)
+    if len(bins):
+        q1, median, q3 = binned_quantiles(bins['bin'], bins['innings'], ECONOMY_BIN_WIDTH)
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Innings", f"{int(bins['innings'].sum()):,}")
+        col2.metric("Median Economy", f"{median:.2f}")
+        col3.metric("25th Percentile", f"{q1:.2f}")
+        col4.metric("75th Percentile", f"{q3:.2f}")
+        fig = histogram(bins['bin'], bins['innings'], ECONOMY_BIN_WIDTH,
+                        title='Bowling Economy Rate Distribution (per innings)',
+                        xlabel='Economy Rate', ylabel='Innings')
+        st.plotly_chart(fig, use_container_width=True)
+    
+    # Every selected bowler (downsampled when there are very many)
+    bowlers = filters.bowling(selected_team, selected_roles)
+    fig, shown = scatter_gl(
+        bowlers.dropna(subset=['economy']), x='economy', y='wickets', hover='bowlerName',
+        title='Wickets vs Economy Rate',
+        labels={'economy': 'Economy Rate', 'wickets': 'Total Wickets'}
+    )
+    st.plotly_chart(fig, use_container_width=True)
+    if shown < len(bowlers):
+        st.caption(f"Showing a sample of {shown:,} of {len(bowlers):,} bowlers.")
+    
+    # Every selected player, one page at a time (sorted and searched on the server)
+    st.subheader("Detailed Bowling Statistics")
+    paged_table(filters, 'bowling', selected_team, selected_roles, labels={
+        'bowlerName': 'Bowler', 'wickets': 'Wickets', 'runs': 'Runs Conceded', 'overs': 'Overs',
+        'balls': 'Balls', 'economy': 'Economy'
+    })
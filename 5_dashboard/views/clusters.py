@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""
+Player Clusters page: live cluster scatter plots from the saved assignments,
+with each cluster described from its feature means (the model picks its own k)
+"""
+
+import os
+
+import streamlit as st
+
+from charts import MAX_POINTS, downsample, scatter_gl
+
+# (table, player column, x, y, title) for each panel
+CLUSTER_PANELS = [
+    ('batting', 'batsmanname', 'strike_rate', 'avg_runs', 'Batsmen Clusters'),
+    ('bowling', 'bowlername', 'avg_economy', 'total_wickets', 'Bowler Clusters')
+]
+LABELS = {
+    'strike_rate': 'Strike Rate', 'avg_runs': 'Average Runs', 'sixes': 'Sixes',
+    'avg_economy': 'Average Economy', 'total_wickets': 'Total Wickets', 'cluster': 'Cluster'
+}
+
+# Standardized distance from the all-player mean that counts as high or low
+TRAIT_THRESHOLD = 0.5
+
+def describe_clusters(assigned, player):
+    """One line per cluster naming the features well above or below average"""
+    features = assigned.drop(columns=[player, 'cluster'])
+    means = features.groupby(assigned['cluster']).mean()
+    z = (means - features.mean()) / features.std(ddof=0).replace(0, 1)
+    descriptions = {}
+    for cluster, row in z.iterrows():
+        traits = [f"{'high' if value > 0 else 'low'} {LABELS.get(col, col).lower()}"
+                  for col, value in row.items() if abs(value) >= TRAIT_THRESHOLD]
+        descriptions[cluster] = ', '.join(traits) or "close to average on every feature"
+    return descriptions
+
+# Assignments are re-read when predict.py rewrites them (the mtime is part of
+# the cache key); the profile uses every player, the plot a stratified sample
+@st.cache_data(max_entries=4)
+def load_cluster_points(path, mtime, player, max_points=MAX_POINTS):
+    import pandas as pd
+    assigned = pd.read_parquet(path)
+    profile = assigned.drop(columns=player).groupby('cluster').mean().round(2)
+    profile.insert(0, 'players', assigned.groupby('cluster').size())
+    return (downsample(assigned, max_points, 'cluster'), len(assigned), profile,
+            describe_clusters(assigned, player))
+
+def display_player_clusters(cluster_dir):
+    st.title("Player Clusters Analysis")
+    
+    st.subheader("Player Clustering")
+    columns = st.columns(len(CLUSTER_PANELS))
+    for column, (table, player, x, y, title) in zip(columns, CLUSTER_PANELS):
+        path = os.path.join(cluster_dir, f"{table}_players.parquet")
+        with column:
+            if not os.path.exists(path):
+                st.warning(f"{title}: no cluster assignments found. Run: "
+                           "python 4_predictive_model/predict.py")
+                continue
+            points, total, profile, descriptions = load_cluster_points(
+                path, os.path.getmtime(path), player)
+            fig, shown = scatter_gl(points.astype({'cluster': str}), x, y, color='cluster',
+                                    hover=player, title=title, labels=LABELS)
+            st.plotly_chart(fig, use_container_width=True)
+            if shown < total:
+                st.caption(f"Showing a sample of {shown:,} of {total:,} players.")
+            st.dataframe(profile.rename(columns=LABELS))
+            
+            # Descriptions follow the saved model, whatever number of clusters it chose
+            st.markdown("**Cluster Descriptions**")
+            for cluster, description in descriptions.items():
+                st.markdown(f"**Cluster {cluster}** ({profile.loc[cluster, 'players']} players): "
+                            f"{description}")
@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+"""
+Home/Overview page: headline totals
+"""
+
+import streamlit as st
+
+def display_overview(snapshot):
+    st.title("T20 Cricket Dashboard - Overview")
+    
+    if snapshot is None:
+        st.warning("Data not found. Please check your data files.")
+        return
+    
+    # Key metrics (precomputed in the snapshot)
+    overview = snapshot['overview'].iloc[0]
+    total_matches = int(overview['total_matches'])
+    total_runs = int(overview['total_runs'])
+    total_wickets = int(overview['total_wickets'])
+    
+    # Display metrics in columns
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Total Matches", total_matches)
+    with col2:
+        st.metric("Total Runs", total_runs)
+    with col3:
+        st.metric("Total Wickets", total_wickets)
+    
+    # Additional information
+    st.subheader("About This Dashboard")
+    st.write("""
+    This dashboard provides comprehensive analysis of T20 cricket data, including batting 
+    and bowling statistics, team performance metrics, and player clustering analysis.
+    
+    Use the sidebar to navigate between different sections and apply filters to the data.
+    """)
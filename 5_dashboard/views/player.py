@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""
+Player Profile page: career totals with the biography and photo, which are
+read from the player side store only for the selected player
+"""
+
+import streamlit as st
+
+# One store per server process; rows and thumbnails are read per player
+@st.cache_resource
+def load_player_details(data_dir):
+    from player_store import PlayerDetails
+    try:
+        return PlayerDetails(data_dir)
+    except FileNotFoundError:
+        return None
+
+def display_player_profile(snapshot, filters, data_dir):
+    st.title("Player Profile")
+    
+    if snapshot is None:
+        st.warning("Data not found. Please check your data files.")
+        return
+    
+    players = snapshot['players']
+    player = st.selectbox("Select Player", sorted(players['name'].dropna().unique()))
+    info = players[players['name'] == player].iloc[0]
+    details = load_player_details(data_dir)
+    
+    col1, col2 = st.columns([1, 4])
+    with col1:
+        thumbnail = details.thumbnail(player) if details is not None else None
+        if thumbnail:
+            st.image(thumbnail)
+    with col2:
+        st.subheader(player)
+        st.markdown(f"**Team:** {info['team']}  \n**Role:** {info['playingRole']}")
+        description = details.description(player) if details is not None else None
+        st.write(description or "No biography available.")
+    
+    # Career totals from the leaderboards
+    col1, col2 = st.columns(2)
+    for column, table, key, label in ((col1, 'batting', 'batsmanName', "Batting"),
+                                      (col2, 'bowling', 'bowlerName', "Bowling")):
+        with column:
+            st.subheader(label)
+            board = filters.get(table)
+            row = board[board[key] == player]
+            if row.empty:
+                st.info(f"No {label.lower()} record.")
+            else:
+                st.dataframe(row.drop(columns=key).round(2), hide_index=True)
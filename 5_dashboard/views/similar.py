@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+"""
+Similar Players page: nearest players from the saved similarity index
+"""
+
+import os
+
+import plotly.express as px
+import streamlit as st
+
+# Load the saved player similarity index once per server process
+@st.cache_resource
+def load_similarity_index(path):
+    from similarity import SimilarityIndex
+    if not os.path.exists(path):
+        return None
+    return SimilarityIndex.load(path)
+
+def display_similar_players(index_path):
+    st.title("Similar Players")
+    
+    index = load_similarity_index(index_path)
+    if index is None:
+        st.warning("Similarity index not found. Build it with: "
+                   "python 4_predictive_model/similarity.py --data-dir data_collection_and_cleaning_output")
+        return
+    
+    vectors = index.vectors()
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        player = st.selectbox("Select Player", sorted(vectors.index))
+    with col2:
+        k = st.slider("Number of players", 3, 20, 10)
+    
+    # Nearest players by standardized batting and bowling style
+    similar = index.query(player, k)
+    st.subheader(f"Players most like {player}")
+    table = similar[['rank', 'similar_player', 'distance']].join(
+        vectors, on='similar_player').round(2)
+    st.dataframe(table, hide_index=True)
+    
+    fig = px.bar(
+        similar,
+        x='similar_player',
+        y='distance',
+        title=f'Style Distance from {player} (lower is more similar)',
+        labels={'similar_player': 'Player', 'distance': 'Distance'}
+    )
+    st.plotly_chart(fig, use_container_width=True)
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""
+Team Analysis page: win rates and head-to-head records
+"""
+
+import plotly.express as px
+import streamlit as st
+
+def display_team_analysis(snapshot, filters, selected_team):
+    st.title("Team Analysis")
+    
+    if snapshot is None:
+        st.warning("Match data not found. Please check your data files.")
+        return
+    
+    # Team win rates for the selected teams (precomputed, sorted by win rate)
+    st.subheader("Team Win Rates")
+    
+    results_df = filters.win_rates(selected_team)
+    all_teams = results_df['Team'].tolist()
+    
+    # Bar chart for win rates
+    fig = px.bar(
+        results_df,
+        x='Team',
+        y='WinRate',
+        title='Team Win Rates (%)',
+        labels={'Team': 'Team', 'WinRate': 'Win Rate (%)'},
+        color='WinRate'
+    )
+    st.plotly_chart(fig, use_container_width=True)
+    
+    # Head-to-head analysis
+    st.subheader("Head-to-Head Analysis")
+    
+    # Create selection for two teams
+    col1, col2 = st.columns(2)
+    with col1:
+        team1 = st.selectbox("Select Team 1", all_teams)
+    with col2:
+        team2 = st.selectbox("Select Team 2", all_teams, index=1 if len(all_teams) > 1 else 0)
+    
+    # Look up the precomputed head-to-head record
+    head_to_head = snapshot['head_to_head']
+    record = head_to_head[(head_to_head['team1'] == team1) & (head_to_head['team2'] == team2)]
+    if team1 != team2 and len(record):
+        total_matches = int(record['matches'].iloc[0])
+        team1_wins = int(record['team1_wins'].iloc[0])
+        team2_wins = int(record['team2_wins'].iloc[0])
+    else:
+        total_matches = team1_wins = team2_wins = 0
+    
+    # Display head-to-head metrics
+    st.subheader(f"{team1} vs {team2}")
+    
+    metric_col1, metric_col2, metric_col3 = st.columns(3)
+    with metric_col1:
+        st.metric("Total Matches", total_matches)
+    with metric_col2:
+        st.metric(f"{team1} Wins", team1_wins)
+    with metric_col3:
+        st.metric(f"{team2} Wins", team2_wins)
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""
+Dashboard Data Watcher
+- Polls the input CSVs with os.stat (size and modification time), at most
+  once per poll interval however many sessions are open
+- When one changes, updates the snapshot incrementally (only the tables
+  derived from changed inputs are rebuilt, appended rows are added onto the
+  stored sums) and reloads only those tables; the rest keep their loaded frames
+- Open sessions compare the version they rendered with `version` and rerun
+  when it moves (see app.py)
+
+Usage:
+    python watcher.py --data-dir ../data_collection_and_cleaning_output
+"""
+
+import argparse
+import os
+import threading
+import time
+
+from filters import FilterIndex
+from snapshot import INPUT_FILES, SNAPSHOT_DIR, build_snapshot, load_snapshot
+
+POLL_SECONDS = 5
+
+class DataWatcher:
+    """The current snapshot and filter index, refreshed when the inputs change"""
+
+    def __init__(self, data_dir, snapshot_dir=None, poll_seconds=POLL_SECONDS):
+        self.data_dir = data_dir
+        self.snapshot_dir = snapshot_dir or os.path.join(data_dir, SNAPSHOT_DIR)
+        self.poll_seconds = poll_seconds
+        self.last_update = None
+        self._stats = None
+        self._checked = None
+        self._current = (None, None)
+        self._lock = threading.Lock()
+        self.refresh(force=True)
+
+    def _input_stats(self):
+        stats = {}
+        for name, path in INPUT_FILES.items():
+            info = os.stat(os.path.join(self.data_dir, path))
+            stats[name] = (info.st_size, info.st_mtime_ns)
+        return stats
+
+    def refresh(self, force=False):
+        """Update and reload the snapshot if the inputs changed
+
+        Checks at most once per poll interval unless `force`. Returns True
+        when a new version was loaded.
+        """
+        if not force and self._checked is not None and \
+                time.monotonic() - self._checked < self.poll_seconds:
+            return False
+        with self._lock:
+            if not force and self._checked is not None and \
+                    time.monotonic() - self._checked < self.poll_seconds:
+                return False
+            self._checked = time.monotonic()
+            # Stats are taken before the build, so a write during it is seen next poll
+            stats = self._input_stats()
+            if stats == self._stats:
+                return False
+            metadata = build_snapshot(self.data_dir, self.snapshot_dir)
+            self._stats = stats
+            snapshot = self._current[0]
+            if snapshot is not None and metadata['version'] == snapshot.metadata['version']:
+                return False
+            snapshot = load_snapshot(self.snapshot_dir, previous=snapshot)
+            self._current = (snapshot, FilterIndex(snapshot))
+            self.last_update = metadata
+            return True
+
+    def current(self):
+        """(snapshot, filter index) of the same version"""
+        return self._current
+
+    @property
+    def version(self):
+        return self._current[0].metadata['version']
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Watch the dashboard inputs and update the snapshot")
+    parser.add_argument('--data-dir', default='.')
+    parser.add_argument('--poll-seconds', type=float, default=POLL_SECONDS)
+    args = parser.parse_args(argv)
+
+    watcher = DataWatcher(args.data_dir, poll_seconds=args.poll_seconds)
+    print(f"Watching {os.path.abspath(args.data_dir)} (snapshot v{watcher.version}); Ctrl+C to stop")
+    try:
+        while True:
+            time.sleep(args.poll_seconds)
+            if watcher.refresh():
+                update = watcher.last_update
+                changed = [name for name, change in update['changes'].items() if change != 'unchanged']
+                rebuilt = [name for name, entry in update['tables'].items()
+                           if entry['version'] == update['version']]
+                print(f"v{update['version']} {update['status']} in {update['build_s']:.2f}s: "
+                      f"{', '.join(changed)} changed; rebuilt {', '.join(rebuilt)}")
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
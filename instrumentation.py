@@ -0,0 +1,317 @@
+# -*- coding: utf-8 -*-
+"""
+Pipeline Instrumentation
+- span(name, **attrs) times a stage or sub-step (fetch, wait, parse, write,
+  load, merge, aggregate, fit, render): wall and CPU time, process peak RSS,
+  and optionally peak Python memory (tracemalloc). Spans nest per thread
+- Writes a machine-readable trace (Chrome trace event JSON; open it in
+  Perfetto or chrome://tracing) and an optional flame-graph profile in
+  collapsed-stack format (flamegraph.pl, speedscope), with self time per stack
+- Progress reports long loops by sampling: one line at most every few
+  seconds and a final count, instead of one print per row
+- Off by default, when a span only checks a flag. Every script turns it on
+  from the environment, so no script needs its own flags:
+
+    T20_TRACE=trace.json          write the trace at exit
+    T20_PROFILE=profile.folded    write the flame-graph profile at exit
+    T20_TRACE_MEMORY=1            also measure peak Python memory per span
+
+Usage:
+    T20_TRACE=trace.json python run_analysis.py --data-dir data_collection_and_cleaning_output
+    python instrumentation.py trace.json
+"""
+
+import argparse
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:   # Windows
+    resource = None
+
+TRACE_ENV = 'T20_TRACE'
+PROFILE_ENV = 'T20_PROFILE'
+MEMORY_ENV = 'T20_TRACE_MEMORY'
+# Set to the tracing process's pid; spawned worker processes inherit it and
+# stay untraced, so they never overwrite the trace at exit
+OWNER_ENV = 'T20_TRACE_PID'
+# Long-running processes (dashboard, servers) keep only the latest spans
+MAX_SPANS = 200000
+PROGRESS_INTERVAL = 5.0
+MB = 1024 * 1024
+
+def _peak_rss_mb():
+    """Process peak resident memory so far (None where unavailable)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / MB if sys.platform == 'darwin' else peak / 1024   # bytes on macOS, KB elsewhere
+
+# ------------------------------
+# Spans
+# ------------------------------
+class Tracer:
+    """Finished spans of this process and the open span stack of each thread"""
+
+    def __init__(self):
+        self.enabled = False
+        self.memory = False
+        self.trace_path = None
+        self.profile_path = None
+        self.spans = deque(maxlen=MAX_SPANS)
+        self.origin = time.perf_counter()
+        self._local = threading.local()
+        self._at_exit = False
+
+    def stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+tracer = Tracer()
+
+def enable(trace=None, profile=None, memory=False):
+    """Start recording spans; the trace and profile are written at exit"""
+    tracer.enabled = True
+    tracer.trace_path = trace or tracer.trace_path
+    tracer.profile_path = profile or tracer.profile_path
+    if memory and not tracer.memory:
+        import tracemalloc
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        tracer.memory = True
+    if not tracer._at_exit:
+        atexit.register(flush)
+        tracer._at_exit = True
+
+def enable_from_env():
+    """enable() if any of the T20_TRACE* variables are set"""
+    trace, profile = os.environ.get(TRACE_ENV), os.environ.get(PROFILE_ENV)
+    memory = os.environ.get(MEMORY_ENV, '') not in ('', '0')
+    if not (trace or profile or memory):
+        return
+    if os.environ.setdefault(OWNER_ENV, str(os.getpid())) != str(os.getpid()):
+        return
+    enable(trace, profile, memory)
+
+def _memory_enter(stack):
+    import tracemalloc
+    current, peak = tracemalloc.get_traced_memory()
+    if stack:
+        stack[-1]['mem_peak'] = max(stack[-1]['mem_peak'], peak)
+    tracemalloc.reset_peak()
+    return current
+
+def _memory_exit(frame, stack):
+    import tracemalloc
+    frame['mem_peak'] = max(frame['mem_peak'], tracemalloc.get_traced_memory()[1])
+    if stack:
+        stack[-1]['mem_peak'] = max(stack[-1]['mem_peak'], frame['mem_peak'])
+    return (frame['mem_peak'] - frame['mem_start']) / MB
+
+@contextmanager
+def span(name, **attrs):
+    """Time the enclosed block as `name`, nested under the thread's open span
+
+    Yields the span's attribute dict, so results known only inside the
+    block can be recorded (`info['rows'] = len(frame)`). Also usable as a
+    decorator. Peak memory is the highest Python allocation above the level
+    at entry; with several threads tracing at once it covers all of them.
+    """
+    if not tracer.enabled:
+        yield attrs
+        return
+    stack = tracer.stack()
+    frame = {'name': name, 'child_s': 0.0}
+    if tracer.memory:
+        frame['mem_start'] = frame['mem_peak'] = _memory_enter(stack)
+    path = tuple(f['name'] for f in stack) + (name,)
+    stack.append(frame)
+    start, cpu = time.perf_counter(), time.process_time()
+    try:
+        yield attrs
+    except BaseException as e:
+        attrs['error'] = type(e).__name__
+        raise
+    finally:
+        end = time.perf_counter()
+        stack.pop()
+        record = {'name': name, 'path': path, 'start': start - tracer.origin,
+                  'wall_s': end - start, 'self_s': end - start - frame['child_s'],
+                  'cpu_s': time.process_time() - cpu, 'tid': threading.get_ident(),
+                  'peak_rss_mb': _peak_rss_mb(), 'attrs': attrs}
+        if tracer.memory:
+            record['peak_mb'] = _memory_exit(frame, stack)
+        if stack:
+            stack[-1]['child_s'] += end - start
+        tracer.spans.append(record)
+
+# ------------------------------
+# Output
+# ------------------------------
+def _json_value(value):
+    return value if isinstance(value, (int, float, str, bool, type(None))) else str(value)
+
+def trace_events(spans=None):
+    """Spans as Chrome trace 'complete' events (microseconds)"""
+    pid = os.getpid()
+    events = []
+    for s in list(tracer.spans) if spans is None else spans:
+        args = {k: _json_value(v) for k, v in s['attrs'].items()}
+        args.update(cpu_ms=round(s['cpu_s'] * 1000, 3), peak_rss_mb=s['peak_rss_mb'])
+        if 'peak_mb' in s:
+            args['peak_mb'] = round(s['peak_mb'], 3)
+        events.append({'name': s['name'], 'cat': s['path'][0], 'ph': 'X', 'pid': pid,
+                       'tid': s['tid'], 'ts': round(s['start'] * 1e6, 1),
+                       'dur': round(s['wall_s'] * 1e6, 1), 'args': args})
+    return events
+
+def collapsed_stacks(spans=None):
+    """Self time per span stack in microseconds, as 'a;b;c <us>' lines"""
+    totals = defaultdict(float)
+    for s in list(tracer.spans) if spans is None else spans:
+        totals[';'.join(s['path'])] += max(s['self_s'], 0.0)
+    return [f"{stack} {round(us * 1e6)}" for stack, us in sorted(totals.items())
+            if round(us * 1e6) > 0]
+
+def _write_atomic(path, text):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'w') as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+def write_trace(path):
+    _write_atomic(path, json.dumps({'traceEvents': trace_events(), 'displayTimeUnit': 'ms'}))
+
+def write_profile(path):
+    _write_atomic(path, '\n'.join(collapsed_stacks()) + '\n')
+
+def flush():
+    """Write the trace and profile, if configured"""
+    if tracer.trace_path:
+        write_trace(tracer.trace_path)
+    if tracer.profile_path:
+        write_profile(tracer.profile_path)
+
+def summarize(events):
+    """Totals per span name from trace events: count, wall and CPU time, peaks"""
+    rows = {}
+    for e in events:
+        row = rows.setdefault(e['name'], {'count': 0, 'wall_s': 0.0, 'max_s': 0.0,
+                                          'cpu_s': 0.0, 'peak_mb': None, 'peak_rss_mb': None})
+        row['count'] += 1
+        row['wall_s'] += e['dur'] / 1e6
+        row['max_s'] = max(row['max_s'], e['dur'] / 1e6)
+        row['cpu_s'] += e['args'].get('cpu_ms', 0) / 1000
+        for key in ('peak_mb', 'peak_rss_mb'):
+            value = e['args'].get(key)
+            if value is not None:
+                row[key] = max(row[key] or 0, value)
+    return dict(sorted(rows.items(), key=lambda item: -item[1]['wall_s']))
+
+def print_summary(events=None):
+    rows = summarize(trace_events() if events is None else events)
+    print("\n=== SPAN SUMMARY ===")
+    print(f"{'Span':<24} {'Count':>7} {'Total s':>9} {'Max s':>8} {'CPU s':>8} "
+          f"{'Peak MB':>8} {'RSS MB':>8}")
+    for name, r in rows.items():
+        peak = f"{r['peak_mb']:.1f}" if r['peak_mb'] is not None else '-'
+        rss = f"{r['peak_rss_mb']:.0f}" if r['peak_rss_mb'] is not None else '-'
+        print(f"{name[:24]:<24} {r['count']:>7} {r['wall_s']:>9.3f} {r['max_s']:>8.3f} "
+              f"{r['cpu_s']:>8.3f} {peak:>8} {rss:>8}")
+
+# ------------------------------
+# Progress
+# ------------------------------
+class Progress:
+    """Sampled progress for long loops
+
+    Prints at most once every `interval` seconds (count, rate, ETA when the
+    total is known, and the latest note), then a final line on close.
+    """
+
+    def __init__(self, label, total=None, interval=PROGRESS_INTERVAL, unit='items',
+                 stream=None):
+        self.label, self.total, self.interval, self.unit = label, total, interval, unit
+        self.stream = stream
+        self.count = 0
+        self.start = self._last = time.perf_counter()
+
+    def _print(self, text):
+        print(text, file=self.stream or sys.stdout, flush=True)
+
+    def update(self, n=1, note=None):
+        self.count += n
+        now = time.perf_counter()
+        if now - self._last < self.interval:
+            return
+        self._last = now
+        rate = self.count / (now - self.start)
+        done = f"{self.count:,}"
+        if self.total:
+            done += f"/{self.total:,} ({self.count / self.total:.0%})"
+            if rate > 0:
+                done += f", ETA {(self.total - self.count) / rate:.0f}s"
+        self._print(f"{self.label}: {done} {self.unit} at {rate:,.1f}/s"
+                    + (f" - {note}" if note else ''))
+
+    def close(self, note=None):
+        elapsed = time.perf_counter() - self.start
+        self._print(f"{self.label}: {self.count:,} {self.unit} in {elapsed:.1f}s"
+                    + (f" - {note}" if note else ''))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def progress(iterable, label, total=None, interval=PROGRESS_INTERVAL, unit='items'):
+    """Iterate while reporting sampled progress"""
+    if total is None and hasattr(iterable, '__len__'):
+        total = len(iterable)
+    with Progress(label, total, interval, unit) as p:
+        for item in iterable:
+            yield item
+            p.update()
+
+enable_from_env()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarize a pipeline trace")
+    parser.add_argument('trace', help="Trace JSON written with T20_TRACE")
+    parser.add_argument('--profile', help="Also write a collapsed-stack flame-graph profile")
+    args = parser.parse_args(argv)
+
+    with open(args.trace) as f:
+        events = json.load(f)['traceEvents']
+    print_summary(events)
+    if args.profile:
+        # Rebuild stacks from event nesting per thread: an event is inside the
+        # last open event that ends after it starts
+        spans = []
+        for tid in {e['tid'] for e in events}:
+            open_spans = []
+            for e in sorted((e for e in events if e['tid'] == tid),
+                            key=lambda e: (e['ts'], -e['dur'])):
+                while open_spans and open_spans[-1]['end'] < e['ts'] + e['dur']:
+                    open_spans.pop()
+                path = (open_spans[-1]['path'] if open_spans else ()) + (e['name'],)
+                s = {'path': path, 'end': e['ts'] + e['dur'], 'self_s': e['dur'] / 1e6}
+                if open_spans:
+                    open_spans[-1]['self_s'] -= e['dur'] / 1e6
+                open_spans.append(s)
+                spans.append(s)
+        _write_atomic(args.profile, '\n'.join(collapsed_stacks(spans)) + '\n')
+        print(f"\nProfile written to {args.profile}")
+
+if __name__ == "__main__":
+    main()
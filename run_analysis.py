@@ -0,0 +1,462 @@
+# -*- coding: utf-8 -*-
+"""
+Selective-Stage Analysis Runner
+- Runs any subset of the analysis and modelling stages against a data directory
+- Memoizes each stage result on disk, keyed by input data version and parameters
+- Prints per-stage timings and full tracebacks for failing stages
+- Optionally records a span trace of every stage and sub-step (load, merge,
+  fit, render), with peak memory and a flame-graph profile (instrumentation.py)
+
+Usage:
+    python run_analysis.py --data-dir data_collection_and_cleaning_output
+    python run_analysis.py teams bowling --resamples 2000
+    python run_analysis.py clusters --force
+    python run_analysis.py charts --figures-dir figures
+    python run_analysis.py --trace trace.json --profile profile.folded --trace-memory
+"""
+
+import argparse
+import ast
+import contextlib
+import hashlib
+import importlib.util
+import io
+import json
+import os
+import pickle
+import sys
+import time
+import traceback
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(ROOT, '3_data_analysis_and_visualization'))
+sys.path.insert(0, os.path.join(ROOT, '4_predictive_model'))
+
+import cricket_analysis_1 as basic_analysis
+import cluster_selection
+import cricket_analysis_2 as analysis
+import evaluation
+import figure_pipeline
+import numpy_inference
+import out_of_core
+import predict
+from backends import backend_of
+from figure_pipeline import (player_chart_jobs, render_figures, report_render,
+                             team_chart_jobs)
+from instrumentation import enable, print_summary, span, tracer
+
+DATA_FILES = {
+    'matches': 'dim_match_summary',
+    'players': 'dim_players_no_images',
+    'batting': 'fact_batting_summary',
+    'bowling': 'fact_bowling_summary'
+}
+
+PLAYER_COLUMNS = ['name', 'battingstyle', 'bowlingstyle', 'playingrole']
+
+def data_path(data_dir, table, fmt='csv'):
+    return os.path.join(data_dir, f"{DATA_FILES[table]}.{fmt}")
+
+# ------------------------------
+# Stage Definitions
+# ------------------------------
+# Each stage names the input tables it reads, the stages it depends on and
+# the parameters that affect its result. Stage functions receive a context
+# holding loaded inputs and upstream results, and return their own result.
+# Stages with 'default': False run only when named on the command line.
+
+def _analysis_inputs(ctx):
+    """Loaded and merged tables used by the cricket_analysis scripts"""
+    if 'analysis_inputs' not in ctx:
+        d, fmt, backend = ctx['data_dir'], ctx['format'], ctx['backend']
+        with span('load', tables='matches,players,batting,bowling', backend=backend):
+            matches = analysis.load_match_data(data_path(d, 'matches', fmt), backend)
+            players = analysis.load_player_data(data_path(d, 'players', fmt), backend,
+                                                columns=PLAYER_COLUMNS)
+            batting = analysis.load_batting_data(data_path(d, 'batting', fmt), backend)
+            bowling = analysis.load_bowling_data(data_path(d, 'bowling', fmt), backend)
+        with span('merge'):
+            ctx['analysis_inputs'] = analysis.preprocess_data(matches, players, batting, bowling)
+    return ctx['analysis_inputs']
+
+def _model_inputs(ctx):
+    """Validated batting and bowling tables used by predict.py"""
+    if 'model_inputs' not in ctx:
+        d, fmt, backend = ctx['data_dir'], ctx['format'], ctx['backend']
+        with span('load', tables='batting,bowling', backend=backend):
+            ctx['model_inputs'] = (
+                predict.load_batting_data(data_path(d, 'batting', fmt), backend),
+                predict.load_bowling_data(data_path(d, 'bowling', fmt), backend)
+            )
+    return ctx['model_inputs']
+
+def stage_summary(ctx, params):
+    # cricket_analysis_1 works on pandas frames only
+    matches, batting, bowling = (backend_of(f).collect(f) for f in _analysis_inputs(ctx))
+    return {
+        'team_wins': basic_analysis.analyze_team_performance(matches),
+        'top_batsmen': basic_analysis.analyze_batting(batting),
+        'top_bowlers': basic_analysis.analyze_bowling(bowling)
+    }
+
+def stage_teams(ctx, params):
+    matches, _, _ = _analysis_inputs(ctx)
+    return analysis.analyze_team_performance(matches, ctx['figures'])
+
+def stage_batting(ctx, params):
+    if params['chunksize']:
+        return out_of_core.analyze_batting_out_of_core(
+            data_path(ctx['data_dir'], 'batting', ctx['format']),
+            data_path(ctx['data_dir'], 'players', ctx['format']),
+            chunksize=params['chunksize'], k=params['top_k'])
+    _, batting, _ = _analysis_inputs(ctx)
+    return analysis.analyze_batting_performance(batting, n_resamples=params['resamples'])
+
+def stage_bowling(ctx, params):
+    if params['chunksize']:
+        return out_of_core.analyze_bowling_out_of_core(
+            data_path(ctx['data_dir'], 'bowling', ctx['format']),
+            chunksize=params['chunksize'], k=params['top_k'])
+    _, _, bowling = _analysis_inputs(ctx)
+    return analysis.analyze_bowling_performance(bowling, ctx['figures'],
+                                                n_resamples=params['resamples'],
+                                                k=params['top_k'])
+
+def stage_charts(ctx, params):
+    """Queue one results chart per team and one runs chart per batsman"""
+    matches, batting, _ = (backend_of(f).collect(f) for f in _analysis_inputs(ctx))
+    team_jobs = team_chart_jobs(matches)
+    player_jobs = player_chart_jobs(batting, min_innings=params['chart_min_innings'])
+    ctx['figures'].extend(team_jobs + player_jobs)
+    print(f"Queued {len(team_jobs)} team and {len(player_jobs)} player charts")
+    return {'teams': len(team_jobs), 'players': len(player_jobs)}
+
+def stage_features(ctx, params):
+    batting, bowling = _model_inputs(ctx)
+    return predict.create_features(batting, bowling)
+
+def stage_regression(ctx, params):
+    batting_features, bowling_features = ctx['results']['features']
+    return predict.build_regression_models(batting_features.copy(), bowling_features.copy(),
+                                           model_dir=os.path.join(ctx['data_dir'], 'models'))
+
+def stage_evaluation(ctx, params):
+    batting_features, bowling_features = ctx['results']['features']
+    return evaluation.evaluate_regressions(batting_features, bowling_features,
+                                           n_splits=params['cv_folds'],
+                                           n_repeats=params['cv_repeats'])
+
+def stage_clusters(ctx, params):
+    batting_pred, bowling_pred = ctx['results']['regression']
+    return predict.cluster_players(batting_pred.copy(), bowling_pred.copy(), ctx['figures'],
+                                   k_range=range(2, params['max_k'] + 1),
+                                   model_dir=os.path.join(ctx['data_dir'], 'models'))
+
+STAGES = {
+    'summary': {'func': stage_summary, 'inputs': ['matches', 'players', 'batting', 'bowling'],
+                'deps': [], 'params': [], 'modules': [basic_analysis]},
+    'teams': {'func': stage_teams, 'inputs': ['matches', 'players', 'batting', 'bowling'],
+              'deps': [], 'params': [], 'modules': [analysis]},
+    'batting': {'func': stage_batting, 'inputs': ['matches', 'players', 'batting', 'bowling'],
+                'deps': [], 'params': ['resamples', 'chunksize', 'top_k'],
+                'modules': [analysis, out_of_core]},
+    'bowling': {'func': stage_bowling, 'inputs': ['matches', 'players', 'batting', 'bowling'],
+                'deps': [], 'params': ['resamples', 'chunksize', 'top_k'],
+                'modules': [analysis, out_of_core]},
+    'charts': {'func': stage_charts, 'inputs': ['matches', 'players', 'batting', 'bowling'],
+               'deps': [], 'params': ['chart_min_innings'],
+               'modules': [analysis, figure_pipeline], 'default': False},
+    'features': {'func': stage_features, 'inputs': ['batting', 'bowling'],
+                 'deps': [], 'params': [], 'modules': [predict]},
+    'regression': {'func': stage_regression, 'inputs': [],
+                   'deps': ['features'], 'params': [], 'modules': [predict]},
+    'evaluation': {'func': stage_evaluation, 'inputs': [],
+                   'deps': ['features'], 'params': ['cv_folds', 'cv_repeats'],
+                   'modules': [predict, evaluation]},
+    'clusters': {'func': stage_clusters, 'inputs': [],
+                 'deps': ['regression'], 'params': ['max_k'],
+                 'modules': [predict, cluster_selection, numpy_inference]}
+}
+
+# ------------------------------
+# Memoization
+# ------------------------------
+def file_fingerprint(path, chunk_size=1 << 20):
+    """Content hash of one input file"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _imported_names(path):
+    """Top-level names of every module imported anywhere in a source file"""
+    with open(path, 'rb') as f:
+        tree = ast.parse(f.read(), filename=path)
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                yield alias.name.split('.')[0]
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            yield node.module.split('.')[0]
+
+def _repo_file(name):
+    """Source file of an importable module inside this repository, or None"""
+    module = sys.modules.get(name)
+    if module is not None:
+        path = getattr(module, '__file__', None)
+    else:
+        try:
+            spec = importlib.util.find_spec(name)
+        except (ImportError, ValueError):
+            return None
+        path = spec.origin if spec is not None else None
+    if not path or not path.endswith('.py'):
+        return None
+    path = os.path.abspath(path)
+    if not path.startswith(ROOT + os.sep) or 'site-packages' in path:
+        return None
+    return path
+
+def _module_fingerprint(module):
+    """Hash of a stage module's source and of every repo module it imports
+    (directly, transitively or inside functions), so code edits invalidate the cache"""
+    files, queue = set(), [os.path.abspath(module.__file__)]
+    while queue:
+        path = queue.pop()
+        if path in files:
+            continue
+        files.add(path)
+        queue.extend(f for f in map(_repo_file, _imported_names(path)) if f)
+    digest = hashlib.sha256()
+    for path in sorted(files):
+        digest.update(os.path.relpath(path, ROOT).encode())
+        digest.update(file_fingerprint(path).encode())
+    return digest.hexdigest()
+
+def stage_key(name, params, input_versions, dep_keys):
+    """Cache key for one stage from its inputs, params, code and upstream keys"""
+    stage = STAGES[name]
+    payload = {
+        'stage': name,
+        'params': {p: params[p] for p in stage['params']},
+        'inputs': {t: input_versions[t] for t in stage['inputs']},
+        'deps': {d: dep_keys[d] for d in stage['deps']},
+        'code': [_module_fingerprint(m) for m in stage['modules']]
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+def _cache_path(cache_dir, name, key):
+    return os.path.join(cache_dir, f"{name}-{key[:20]}.pkl")
+
+def load_cached(cache_dir, name, key):
+    """Return a cached stage entry, or None when missing or unreadable"""
+    path = _cache_path(cache_dir, name, key)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+    except Exception:
+        return None
+
+def store_cached(cache_dir, name, key, entry):
+    os.makedirs(cache_dir, exist_ok=True)
+    path = _cache_path(cache_dir, name, key)
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+
+class _Tee(io.TextIOBase):
+    """Write to the console while keeping a copy of the output"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.buffer = io.StringIO()
+
+    def write(self, text):
+        self.stream.write(text)
+        return self.buffer.write(text)
+
+    def flush(self):
+        self.stream.flush()
+
+# ------------------------------
+# Runner
+# ------------------------------
+def resolve_stages(selected):
+    """Expand the selection with dependencies, in definition order"""
+    needed = set()
+
+    def visit(name):
+        if name in needed:
+            return
+        for dep in STAGES[name]['deps']:
+            visit(dep)
+        needed.add(name)
+
+    for name in selected:
+        visit(name)
+    return [name for name in STAGES if name in needed]
+
+def run_stages(selected, data_dir='.', params=None, cache_dir=None,
+               use_cache=True, figures_dir=None, render=True,
+               backend='pandas', fmt='csv'):
+    """Run the selected stages and return (results, timings)
+
+    Backends produce identical results, so the backend is not part of the
+    cache key; the input format is, through the file content hashes.
+    """
+    params = params or {}
+    cache_dir = cache_dir or os.path.join(data_dir, '.analysis_cache')
+    figures_dir = figures_dir or data_dir
+    order = resolve_stages(selected)
+
+    needed_inputs = {t for name in order for t in STAGES[name]['inputs']}
+    with span('fingerprint', tables=len(needed_inputs)):
+        input_versions = {t: file_fingerprint(data_path(data_dir, t, fmt))
+                          for t in needed_inputs}
+
+    ctx = {'data_dir': data_dir, 'format': fmt, 'backend': backend,
+           'results': {}, 'figures': []}
+    keys = {}
+    timings = []
+    failed = set()
+
+    for name in order:
+        start = time.perf_counter()
+        if any(dep in failed for dep in STAGES[name]['deps']):
+            failed.add(name)
+            timings.append((name, 'skipped', 0.0))
+            continue
+
+        keys[name] = stage_key(name, params, input_versions, keys)
+        with span(name) as info:
+            entry = load_cached(cache_dir, name, keys[name]) if use_cache else None
+            if entry is not None:
+                sys.stdout.write(entry['output'])
+                status = 'cached'
+            else:
+                n_figures = len(ctx['figures'])
+                tee = _Tee(sys.stdout)
+                try:
+                    with contextlib.redirect_stdout(tee):
+                        result = STAGES[name]['func'](ctx, params)
+                except Exception:
+                    print(f"\nERROR in stage '{name}':")
+                    traceback.print_exc()
+                    # Figures queued before the failure are not rendered
+                    del ctx['figures'][n_figures:]
+                    failed.add(name)
+                    info['status'] = 'failed'
+                    timings.append((name, 'failed', time.perf_counter() - start))
+                    continue
+                entry = {
+                    'result': result,
+                    'output': tee.buffer.getvalue(),
+                    'figures': ctx['figures'][n_figures:]
+                }
+                del ctx['figures'][n_figures:]
+                with span('write', cache=True):
+                    store_cached(cache_dir, name, keys[name], entry)
+                status = 'ran'
+            info['status'] = status
+
+        ctx['results'][name] = entry['result']
+        ctx['figures'].extend(entry['figures'])
+        timings.append((name, status, time.perf_counter() - start))
+
+    if render and ctx['figures']:
+        start = time.perf_counter()
+        print("\nRendering figures...")
+        report_render(render_figures(ctx['figures'], output_dir=figures_dir))
+        timings.append(('figures', 'ran', time.perf_counter() - start))
+
+    return ctx['results'], timings
+
+def print_timings(timings):
+    print("\n=== STAGE TIMINGS ===")
+    for name, status, seconds in timings:
+        print(f"{name:>12}  {status:<8} {seconds:8.3f}s")
+    print(f"{'total':>12}  {'':<8} {sum(t for _, _, t in timings):8.3f}s")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run selected T20 analysis stages")
+    parser.add_argument('stages', nargs='*', metavar='stage',
+                        help="Stages to run (default: all but 'charts'). "
+                             "Dependencies are added automatically.")
+    parser.add_argument('--data-dir', default='.',
+                        help="Directory containing the cleaned CSV files")
+    parser.add_argument('--cache-dir', default=None,
+                        help="Result cache directory (default: <data-dir>/.analysis_cache)")
+    parser.add_argument('--figures-dir', default=None,
+                        help="Where to write figures (default: <data-dir>)")
+    parser.add_argument('--resamples', type=int, default=10000,
+                        help="Bootstrap/permutation resamples for batting and bowling")
+    parser.add_argument('--chunksize', type=int, default=0,
+                        help="Stream batting/bowling fact tables in chunks of this many rows "
+                             "(out-of-core mode; 0 = load in memory)")
+    parser.add_argument('--top-k', type=int, default=20,
+                        help="Rows shown in ranked tables")
+    parser.add_argument('--cv-folds', type=int, default=5,
+                        help="Folds for the evaluation stage's cross-validation")
+    parser.add_argument('--cv-repeats', type=int, default=1,
+                        help="Repeats of the k-fold split in the evaluation stage")
+    parser.add_argument('--chart-min-innings', type=int, default=2,
+                        help="Innings a batsman needs for a per-player chart (charts stage)")
+    parser.add_argument('--max-k', type=int, default=8,
+                        help="Largest number of clusters tried by the clusters stage")
+    parser.add_argument('--backend', choices=['pandas', 'polars'], default='pandas',
+                        help="DataFrame engine for loading and aggregation")
+    parser.add_argument('--format', choices=['csv', 'parquet'], default='csv',
+                        help="Input file format (see backends.convert_to_parquet)")
+    parser.add_argument('--force', action='store_true', help="Ignore cached results")
+    parser.add_argument('--no-figures', action='store_true', help="Skip figure rendering")
+    parser.add_argument('--list', action='store_true', help="List stages and exit")
+    parser.add_argument('--trace', default=None,
+                        help="Write a span trace (Chrome trace JSON) of the run to this file")
+    parser.add_argument('--profile', default=None,
+                        help="Write a collapsed-stack flame-graph profile to this file")
+    parser.add_argument('--trace-memory', action='store_true',
+                        help="Also record peak Python memory per span (slower)")
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.stages if name not in STAGES]
+    if unknown:
+        parser.error(f"unknown stage(s): {', '.join(unknown)} (choose from {', '.join(STAGES)})")
+    return args
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.list:
+        for name, stage in STAGES.items():
+            deps = f" (needs: {', '.join(stage['deps'])})" if stage['deps'] else ''
+            optional = " (only when named)" if not stage.get('default', True) else ''
+            print(f"{name}{deps}{optional}")
+        return 0
+
+    if args.trace or args.profile or args.trace_memory:
+        enable(args.trace, args.profile, args.trace_memory)
+    selected = args.stages or [name for name, stage in STAGES.items()
+                               if stage.get('default', True)]
+    _, timings = run_stages(
+        selected,
+        data_dir=args.data_dir,
+        params={'resamples': args.resamples, 'chunksize': args.chunksize,
+                'top_k': args.top_k, 'max_k': args.max_k,
+                'chart_min_innings': args.chart_min_innings,
+                'cv_folds': args.cv_folds, 'cv_repeats': args.cv_repeats},
+        cache_dir=args.cache_dir,
+        use_cache=not args.force,
+        figures_dir=args.figures_dir,
+        render=not args.no_figures,
+        backend=args.backend,
+        fmt=args.format
+    )
+    print_timings(timings)
+    if tracer.enabled:
+        print_summary()
+    return 1 if any(status == 'failed' for _, status, _ in timings) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())